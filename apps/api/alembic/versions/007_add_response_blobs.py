@@ -0,0 +1,43 @@
+"""Add content-addressed blobs table and raw response references on scans
+
+Revision ID: 007_add_response_blobs
+Revises: 006_add_monitoring_and_alerts
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_response_blobs'
+down_revision = '006_add_monitoring_and_alerts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('compression', sa.String(length=16), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('stored_size', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    
+    op.add_column('scans', sa.Column('response_headers_sha256', sa.String(length=64), nullable=True))
+    op.add_column('scans', sa.Column('response_body_sha256', sa.String(length=64), nullable=True))
+    op.create_foreign_key('fk_scans_response_headers_sha256', 'scans', 'blobs', ['response_headers_sha256'], ['sha256'])
+    op.create_foreign_key('fk_scans_response_body_sha256', 'scans', 'blobs', ['response_body_sha256'], ['sha256'])
+
+
+def downgrade():
+    op.drop_constraint('fk_scans_response_body_sha256', 'scans', type_='foreignkey')
+    op.drop_constraint('fk_scans_response_headers_sha256', 'scans', type_='foreignkey')
+    op.drop_column('scans', 'response_body_sha256')
+    op.drop_column('scans', 'response_headers_sha256')
+    
+    op.drop_table('blobs')
@@ -0,0 +1,68 @@
+"""Add scan job queue and scan worker registry
+
+Revision ID: 008_add_scan_jobs_and_workers
+Revises: 007_add_response_blobs
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_add_scan_jobs_and_workers'
+down_revision = '007_add_response_blobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scan_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('host', sa.String(), nullable=False),
+        sa.Column('host_hash', sa.BigInteger(), nullable=False),
+        sa.Column('priority', sa.String(), nullable=False, server_default='bulk'),
+        sa.Column('status', sa.Enum('pending', 'running', 'done', 'failed', name='scanjobstatus'), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=True),
+        sa.Column('monitoring_config_id', sa.Integer(), nullable=True),
+        sa.Column('scan_id', sa.Integer(), nullable=True),
+        sa.Column('worker_id', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.ForeignKeyConstraint(['monitoring_config_id'], ['monitoring_configs.id'], ),
+        sa.ForeignKeyConstraint(['scan_id'], ['scans.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scan_jobs_id'), 'scan_jobs', ['id'], unique=False)
+    op.create_index('ix_scan_jobs_status_host_hash', 'scan_jobs', ['status', 'host_hash'], unique=False)
+    
+    op.create_table(
+        'scan_workers',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('hostname', sa.String(), nullable=False),
+        sa.Column('pid', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('scans_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scans_failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scans_per_minute', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('owned_fraction', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scan_workers_heartbeat_at'), 'scan_workers', ['heartbeat_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_scan_workers_heartbeat_at'), table_name='scan_workers')
+    op.drop_table('scan_workers')
+    
+    op.drop_index('ix_scan_jobs_status_host_hash', table_name='scan_jobs')
+    op.drop_index(op.f('ix_scan_jobs_id'), table_name='scan_jobs')
+    op.drop_table('scan_jobs')
+    sa.Enum(name='scanjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,50 @@
+"""Add denormalized latest-scan summary to sites
+
+Revision ID: 009_add_site_latest_scan_summary
+Revises: 008_add_scan_jobs_and_workers
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '009_add_site_latest_scan_summary'
+down_revision = '008_add_scan_jobs_and_workers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    risk_level = postgresql.ENUM('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO', name='risklevel', create_type=False)
+    op.add_column('sites', sa.Column('latest_scan_id', sa.Integer(), nullable=True))
+    op.add_column('sites', sa.Column('latest_scan_score', sa.Float(), nullable=True))
+    op.add_column('sites', sa.Column('latest_scan_risk_level', risk_level, nullable=True))
+    op.add_column('sites', sa.Column('latest_scan_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_sites_created_at'), 'sites', ['created_at'], unique=False)
+
+    # Backfill from each site's most recent scan
+    op.execute("""
+        UPDATE sites
+        SET latest_scan_id = latest.id,
+            latest_scan_score = latest.overall_score,
+            latest_scan_risk_level = latest.risk_level,
+            latest_scan_at = latest.created_at
+        FROM (
+            SELECT DISTINCT ON (site_id) id, site_id, overall_score, risk_level, created_at
+            FROM scans
+            WHERE site_id IS NOT NULL
+            ORDER BY site_id, created_at DESC, id DESC
+        ) AS latest
+        WHERE sites.id = latest.site_id
+    """)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_sites_created_at'), table_name='sites')
+    op.drop_column('sites', 'latest_scan_at')
+    op.drop_column('sites', 'latest_scan_risk_level')
+    op.drop_column('sites', 'latest_scan_score')
+    op.drop_column('sites', 'latest_scan_id')
@@ -0,0 +1,40 @@
+"""Add composite indexes for keyset pagination of sites, scans and alerts
+
+Revision ID: 010_add_listing_keyset_indexes
+Revises: 009_add_site_latest_scan_summary
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_listing_keyset_indexes'
+down_revision = '009_add_site_latest_scan_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (created_at, id) covers the plain created_at ordering index from 009
+    op.drop_index(op.f('ix_sites_created_at'), table_name='sites')
+    op.create_index('ix_sites_created_at_id', 'sites', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sites_latest_risk_created_at_id', 'sites', ['latest_scan_risk_level', 'created_at', 'id'], unique=False)
+
+    op.create_index('ix_scans_site_created_at_id', 'scans', ['site_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_scans_site_risk_created_at_id', 'scans', ['site_id', 'risk_level', 'created_at', 'id'], unique=False)
+
+    op.create_index('ix_alerts_created_at_id', 'alerts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_alerts_type_created_at_id', 'alerts', ['alert_type', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_alerts_type_created_at_id', table_name='alerts')
+    op.drop_index('ix_alerts_created_at_id', table_name='alerts')
+
+    op.drop_index('ix_scans_site_risk_created_at_id', table_name='scans')
+    op.drop_index('ix_scans_site_created_at_id', table_name='scans')
+
+    op.drop_index('ix_sites_latest_risk_created_at_id', table_name='sites')
+    op.drop_index('ix_sites_created_at_id', table_name='sites')
+    op.create_index(op.f('ix_sites_created_at'), 'sites', ['created_at'], unique=False)
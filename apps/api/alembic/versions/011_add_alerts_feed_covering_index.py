@@ -0,0 +1,32 @@
+"""Replace the alerts keyset index with a newest-first covering index
+
+Revision ID: 011_alerts_feed_covering_index
+Revises: 010_add_listing_keyset_indexes
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_alerts_feed_covering_index'
+down_revision = '010_add_listing_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_alerts_created_at_desc_id',
+        'alerts',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_include=['site_id', 'scan_id', 'alert_type']
+    )
+    op.drop_index('ix_alerts_created_at_id', table_name='alerts')
+
+
+def downgrade():
+    op.create_index('ix_alerts_created_at_id', 'alerts', ['created_at', 'id'], unique=False)
+    op.drop_index('ix_alerts_created_at_desc_id', table_name='alerts')
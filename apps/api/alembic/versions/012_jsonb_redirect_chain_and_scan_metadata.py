@@ -0,0 +1,78 @@
+"""Store redirect_chain as JSONB and add indexed scan_metadata
+
+Revision ID: 012_jsonb_scan_metadata
+Revises: 011_alerts_feed_covering_index
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '012_jsonb_scan_metadata'
+down_revision = '011_alerts_feed_covering_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    
+    if bind.dialect.name != 'postgresql':
+        # SQLite's JSON type is TEXT underneath: the JSON strings written so far
+        # already read back as lists, so only the new column is needed
+        op.add_column('scans', sa.Column('scan_metadata', sa.JSON(), nullable=True))
+        op.create_index('ix_scans_scan_metadata', 'scans', ['scan_metadata'], unique=False)
+        return
+    
+    # redirect_chain was written with json.dumps into a JSON column, so rows hold
+    # a JSON *string* wrapping the array; unwrap those while converting to JSONB
+    op.execute("""
+        ALTER TABLE scans ALTER COLUMN redirect_chain TYPE jsonb USING (
+            CASE
+                WHEN redirect_chain IS NULL THEN NULL
+                WHEN jsonb_typeof(redirect_chain::text::jsonb) = 'string'
+                    THEN (redirect_chain::text::jsonb #>> '{}')::jsonb
+                ELSE redirect_chain::text::jsonb
+            END
+        )
+    """)
+    
+    op.add_column('scans', sa.Column('scan_metadata', postgresql.JSONB(), nullable=True))
+    
+    # Backfill what can be derived from stored columns; per-hop status and
+    # timings only exist for scans recorded from now on
+    op.execute("""
+        UPDATE scans SET scan_metadata = jsonb_build_object(
+            'final_host', lower(substring(final_url from '^[A-Za-z][A-Za-z0-9+.-]*://(?:[^@/]*@)?([^:/?#]+)')),
+            'hop_count', GREATEST(COALESCE(jsonb_array_length(redirect_chain), 1) - 1, 0),
+            'hops', COALESCE(
+                (SELECT jsonb_agg(jsonb_build_object('url', hop) ORDER BY ordinality)
+                 FROM jsonb_array_elements_text(redirect_chain) WITH ORDINALITY AS chain(hop, ordinality)),
+                '[]'::jsonb
+            ),
+            'timings', '{}'::jsonb
+        )
+        WHERE final_url IS NOT NULL
+          AND (redirect_chain IS NULL OR jsonb_typeof(redirect_chain) = 'array')
+    """)
+    
+    op.create_index(
+        'ix_scans_scan_metadata',
+        'scans',
+        ['scan_metadata'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'scan_metadata': 'jsonb_path_ops'}
+    )
+
+
+def downgrade():
+    op.drop_index('ix_scans_scan_metadata', table_name='scans')
+    op.drop_column('scans', 'scan_metadata')
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        # Earlier code reads either a list or a JSON string, so plain JSON arrays are fine
+        op.execute("ALTER TABLE scans ALTER COLUMN redirect_chain TYPE json USING redirect_chain::json")
@@ -0,0 +1,162 @@
+"""Range-partition scans, findings and alerts by month on created_at
+
+Revision ID: 013_partition_scan_tables
+Revises: 012_jsonb_scan_metadata
+Create Date: 2026-10-19 16:00:00.000000
+
+Postgres only. Each table is rebuilt as a partitioned table with one
+partition per calendar month (UTC) plus a default partition, and the rows
+are copied across. Partition names follow `<table>_yYYYYmMM`, which
+app.services.partition_manager relies on when it creates future months
+and detaches expired ones.
+
+Postgres requires the partition key in every unique constraint, so the
+primary keys become (id, created_at) and foreign keys *to* scans are
+dropped; scan ids still come from the same sequence and stay unique.
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_partition_scan_tables'
+down_revision = '012_jsonb_scan_metadata'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# Secondary indexes to rebuild on each table (as of 012)
+INDEXES = {
+    'scans': [
+        "CREATE INDEX ix_scans_id ON scans (id)",
+        "CREATE INDEX ix_scans_user_id ON scans (user_id)",
+        "CREATE INDEX ix_scans_url ON scans (url)",
+        "CREATE INDEX ix_scans_site_id ON scans (site_id)",
+        "CREATE INDEX ix_scans_site_created_at_id ON scans (site_id, created_at, id)",
+        "CREATE INDEX ix_scans_site_risk_created_at_id ON scans (site_id, risk_level, created_at, id)",
+        "CREATE INDEX ix_scans_scan_metadata ON scans USING gin (scan_metadata jsonb_path_ops)",
+    ],
+    'findings': [
+        "CREATE INDEX ix_findings_id ON findings (id)",
+        "CREATE INDEX ix_findings_scan_id ON findings (scan_id)",
+    ],
+    'alerts': [
+        "CREATE INDEX ix_alerts_id ON alerts (id)",
+        "CREATE INDEX ix_alerts_site_id ON alerts (site_id)",
+        "CREATE INDEX ix_alerts_scan_id ON alerts (scan_id)",
+        "CREATE INDEX ix_alerts_type_created_at_id ON alerts (alert_type, created_at, id)",
+        "CREATE INDEX ix_alerts_created_at_desc_id ON alerts (created_at DESC, id DESC) INCLUDE (site_id, scan_id, alert_type)",
+    ],
+}
+
+# Foreign keys from each table to unpartitioned tables (LIKE doesn't copy them)
+OUTBOUND_FKS = {
+    'scans': [
+        "ALTER TABLE scans ADD CONSTRAINT scans_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)",
+        "ALTER TABLE scans ADD CONSTRAINT fk_scans_site_id FOREIGN KEY (site_id) REFERENCES sites (id)",
+        "ALTER TABLE scans ADD CONSTRAINT fk_scans_response_headers_sha256 FOREIGN KEY (response_headers_sha256) REFERENCES blobs (sha256)",
+        "ALTER TABLE scans ADD CONSTRAINT fk_scans_response_body_sha256 FOREIGN KEY (response_body_sha256) REFERENCES blobs (sha256)",
+    ],
+    'findings': [],
+    'alerts': [
+        "ALTER TABLE alerts ADD CONSTRAINT alerts_site_id_fkey FOREIGN KEY (site_id) REFERENCES sites (id)",
+    ],
+}
+
+# Foreign keys that point at scans.id
+INBOUND_SCAN_FKS = [
+    ('findings', 'findings_scan_id_fkey'),
+    ('alerts', 'alerts_scan_id_fkey'),
+    ('shared_report_links', 'shared_report_links_scan_id_fkey'),
+    ('scan_jobs', 'scan_jobs_scan_id_fkey'),
+]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def _rebuild(table: str, partitioned: bool, first_month: date = None, last_month: date = None):
+    """Swap `table` for a copy that is (or isn't) range-partitioned, keeping rows, sequence and indexes"""
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    # The primary key keeps its name (and its index's) through the rename; free it for the new table
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+
+    if partitioned:
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+        month = first_month
+        while month <= last_month:
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{_month_bound(month)}') TO ('{_month_bound(_add_months(month, 1))}')"
+            )
+            month = _add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    # The id sequence is owned by the old table's column; move it before dropping
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {old} CASCADE")
+
+    for statement in INDEXES[table] + OUTBOUND_FKS[table]:
+        op.execute(statement)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Other databases keep plain tables; findings just gains created_at
+        # (SQLite can't ADD COLUMN with a CURRENT_TIMESTAMP default)
+        op.add_column('findings', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+        return
+
+    # Findings are partitioned by the time they were written, which is their scan's
+    op.add_column('findings', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+    op.execute("UPDATE findings SET created_at = scans.created_at FROM scans WHERE scans.id = findings.scan_id")
+    for table in ('scans', 'findings', 'alerts'):
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+
+    for table, constraint in INBOUND_SCAN_FKS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}")
+
+    oldest = bind.execute(sa.text(
+        "SELECT min(created_at) FROM (SELECT min(created_at) AS created_at FROM scans "
+        "UNION ALL SELECT min(created_at) FROM alerts) AS oldest"
+    )).scalar()
+    today = datetime.now(timezone.utc).date()
+    first_month = (oldest.astimezone(timezone.utc).date() if oldest else today).replace(day=1)
+    last_month = _add_months(today.replace(day=1), MONTHS_AHEAD)
+
+    for table in ('scans', 'findings', 'alerts'):
+        _rebuild(table, partitioned=True, first_month=first_month, last_month=last_month)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_column('findings', 'created_at')
+        return
+
+    for table in ('scans', 'findings', 'alerts'):
+        _rebuild(table, partitioned=False)
+
+    # NOT VALID: rows whose scans were in since-detached partitions would fail the check
+    for table, constraint in INBOUND_SCAN_FKS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} FOREIGN KEY (scan_id) REFERENCES scans (id) NOT VALID")
+    op.drop_column('findings', 'created_at')
@@ -0,0 +1,51 @@
+"""Add scan_rollups and per-site retention policy
+
+Revision ID: 014_add_scan_rollups
+Revises: 013_partition_scan_tables
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014_add_scan_rollups'
+down_revision = '013_partition_scan_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sites', sa.Column('retention_policy', sa.String(), nullable=True))
+    
+    op.create_table(
+        'scan_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.Enum('DAILY', 'WEEKLY', name='rollupgranularity'), nullable=False),
+        sa.Column('period_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('scan_count', sa.Integer(), nullable=False),
+        sa.Column('scored_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('score_min', sa.Float(), nullable=True),
+        sa.Column('score_max', sa.Float(), nullable=True),
+        sa.Column('critical_count', sa.Integer(), nullable=False),
+        sa.Column('high_count', sa.Integer(), nullable=False),
+        sa.Column('medium_count', sa.Integer(), nullable=False),
+        sa.Column('low_count', sa.Integer(), nullable=False),
+        sa.Column('info_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('site_id', 'granularity', 'period_start', name='uq_scan_rollups_site_period')
+    )
+    op.create_index(op.f('ix_scan_rollups_id'), 'scan_rollups', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_scan_rollups_id'), table_name='scan_rollups')
+    op.drop_table('scan_rollups')
+    op.execute('DROP TYPE IF EXISTS rollupgranularity')
+    op.drop_column('sites', 'retention_policy')
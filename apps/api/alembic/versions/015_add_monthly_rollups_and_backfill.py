@@ -0,0 +1,76 @@
+"""Add monthly scan rollups and backfill rollups from existing scans
+
+Revision ID: 015_backfill_scan_rollups
+Revises: 014_add_scan_rollups
+Create Date: 2026-10-19 18:00:00.000000
+
+From here on every site scan updates its daily, weekly and monthly rollup
+as it is written. This backfills all three from the scans already stored.
+It assumes the retention engine hasn't compacted anything yet, which holds
+when 014 and 015 are deployed together.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '015_backfill_scan_rollups'
+down_revision = '014_add_scan_rollups'
+branch_labels = None
+depends_on = None
+
+GRANULARITIES = {'DAILY': 'day', 'WEEKLY': 'week', 'MONTHLY': 'month'}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite keeps the enum as a VARCHAR; dev databases fill rollups as new scans arrive
+        return
+    
+    # A new enum value has to be committed before it can be used
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE rollupgranularity ADD VALUE IF NOT EXISTS 'MONTHLY'")
+    
+    for granularity, unit in GRANULARITIES.items():
+        # date_trunc on the UTC wall clock: weeks start on Monday, matching app.services.rollups
+        op.execute(f"""
+            INSERT INTO scan_rollups (
+                site_id, granularity, period_start, scan_count, scored_count, score_sum, score_min, score_max,
+                critical_count, high_count, medium_count, low_count, info_count
+            )
+            SELECT
+                scans.site_id,
+                '{granularity}',
+                date_trunc('{unit}', scans.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                count(*),
+                count(scans.overall_score),
+                coalesce(sum(scans.overall_score), 0),
+                min(scans.overall_score),
+                max(scans.overall_score),
+                coalesce(sum(counts.critical), 0),
+                coalesce(sum(counts.high), 0),
+                coalesce(sum(counts.medium), 0),
+                coalesce(sum(counts.low), 0),
+                coalesce(sum(counts.info), 0)
+            FROM scans
+            LEFT JOIN (
+                SELECT
+                    scan_id,
+                    count(*) FILTER (WHERE severity = 'CRITICAL') AS critical,
+                    count(*) FILTER (WHERE severity = 'HIGH') AS high,
+                    count(*) FILTER (WHERE severity = 'MEDIUM') AS medium,
+                    count(*) FILTER (WHERE severity = 'LOW') AS low,
+                    count(*) FILTER (WHERE severity = 'INFO') AS info
+                FROM findings
+                GROUP BY scan_id
+            ) AS counts ON counts.scan_id = scans.id
+            WHERE scans.site_id IS NOT NULL
+            GROUP BY 1, 3
+            ON CONFLICT (site_id, granularity, period_start) DO NOTHING
+        """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Postgres can't drop an enum value; monthly rows go and the value stays unused
+    op.execute("DELETE FROM scan_rollups WHERE granularity = 'MONTHLY'")
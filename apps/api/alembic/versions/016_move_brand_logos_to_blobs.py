@@ -0,0 +1,117 @@
+"""Move brand logos from base64 text into the blob store
+
+Revision ID: 016_brand_logo_blobs
+Revises: 015_backfill_scan_rollups
+Create Date: 2026-10-19 20:00:00.000000
+
+Each brand_profiles.logo_base64 value is decoded once and stored as a
+content-addressed blob (identical logos share one), referenced by
+logo_sha256 with its media type. Values that don't decode are dropped
+with a warning; they never rendered in PDFs either.
+"""
+import base64
+import binascii
+import gzip
+import hashlib
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '016_brand_logo_blobs'
+down_revision = '015_backfill_scan_rollups'
+branch_labels = None
+depends_on = None
+
+DATA_URI = re.compile(r"^data:(?P<type>[\w.+-]+/[\w.+-]+)(;[\w=-]+)*;base64,", re.IGNORECASE)
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def _decode(value):
+    declared = None
+    match = DATA_URI.match(value)
+    if match:
+        declared = match.group("type").lower()
+        value = value[match.end():]
+    data = base64.b64decode("".join(value.split()), validate=True)
+
+    content_type = next((ctype for signature, ctype in SIGNATURES if data.startswith(signature)), None)
+    if content_type is None and data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        content_type = "image/webp"
+    if content_type is None and b"<svg" in data[:1024].lower():
+        content_type = "image/svg+xml"
+    # The PDF renderer used to label every logo image/png
+    return data, content_type or declared or "image/png"
+
+
+def upgrade():
+    with op.batch_alter_table('brand_profiles') as batch:
+        batch.add_column(sa.Column('logo_sha256', sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column('logo_content_type', sa.String(length=64), nullable=True))
+        batch.create_foreign_key('fk_brand_profiles_logo_sha256', 'blobs', ['logo_sha256'], ['sha256'])
+
+    bind = op.get_bind()
+    brands = bind.execute(sa.text(
+        "SELECT id, logo_base64 FROM brand_profiles WHERE logo_base64 IS NOT NULL AND logo_base64 <> ''"
+    )).fetchall()
+    for brand_id, logo_base64 in brands:
+        try:
+            data, content_type = _decode(logo_base64)
+        except (binascii.Error, ValueError):
+            print(f"Warning: brand profile {brand_id} logo is not valid base64; dropping it")
+            continue
+
+        digest = hashlib.sha256(data).hexdigest()
+        exists = bind.execute(sa.text("SELECT 1 FROM blobs WHERE sha256 = :digest"), {"digest": digest}).scalar()
+        if not exists:
+            compressed = gzip.compress(data, compresslevel=6)
+            compression, stored = ("gzip", compressed) if len(compressed) < len(data) else ("identity", data)
+            bind.execute(
+                sa.text(
+                    "INSERT INTO blobs (sha256, compression, size, stored_size, data) "
+                    "VALUES (:digest, :compression, :size, :stored_size, :data)"
+                ).bindparams(sa.bindparam("data", type_=sa.LargeBinary)),
+                {"digest": digest, "compression": compression, "size": len(data), "stored_size": len(stored), "data": stored}
+            )
+        bind.execute(
+            sa.text("UPDATE brand_profiles SET logo_sha256 = :digest, logo_content_type = :content_type WHERE id = :id"),
+            {"digest": digest, "content_type": content_type, "id": brand_id}
+        )
+
+    with op.batch_alter_table('brand_profiles') as batch:
+        batch.drop_column('logo_base64')
+
+
+def downgrade():
+    with op.batch_alter_table('brand_profiles') as batch:
+        batch.add_column(sa.Column('logo_base64', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    logos = bind.execute(sa.text(
+        "SELECT brand_profiles.id, blobs.compression, blobs.data "
+        "FROM brand_profiles JOIN blobs ON blobs.sha256 = brand_profiles.logo_sha256"
+    )).fetchall()
+    for brand_id, compression, stored in logos:
+        if compression == "gzip":
+            data = gzip.decompress(stored)
+        elif compression == "identity":
+            data = bytes(stored)
+        else:
+            print(f"Warning: brand profile {brand_id} logo is {compression}-compressed; not restoring it")
+            continue
+        bind.execute(
+            sa.text("UPDATE brand_profiles SET logo_base64 = :logo WHERE id = :id"),
+            {"logo": base64.b64encode(data).decode("ascii"), "id": brand_id}
+        )
+
+    with op.batch_alter_table('brand_profiles') as batch:
+        batch.drop_constraint('fk_brand_profiles_logo_sha256', type_='foreignkey')
+        batch.drop_column('logo_content_type')
+        batch.drop_column('logo_sha256')
@@ -0,0 +1,65 @@
+"""Add portfolio aggregate views and the refresh log
+
+Revision ID: 017_portfolio_stats_views
+Revises: 016_brand_logo_blobs
+Create Date: 2026-10-19 21:00:00.000000
+
+Materialized views on Postgres (refreshed CONCURRENTLY, hence the unique
+indexes); plain tables rebuilt by app.services.portfolio_stats elsewhere.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '017_portfolio_stats_views'
+down_revision = '016_brand_logo_blobs'
+branch_labels = None
+depends_on = None
+
+VIEWS = {
+    'portfolio_risk_stats': (
+        "SELECT COALESCE(CAST(latest_scan_risk_level AS VARCHAR), 'unscanned') AS risk_level, "
+        "COUNT(*) AS site_count, "
+        "COUNT(latest_scan_score) AS scored_count, "
+        "COALESCE(SUM(latest_scan_score), 0) AS score_sum "
+        "FROM sites GROUP BY 1",
+        "risk_level",
+    ),
+    'portfolio_top_findings': (
+        "SELECT findings.title AS title, "
+        "CAST(findings.severity AS VARCHAR) AS severity, "
+        "CAST(findings.category AS VARCHAR) AS category, "
+        "COUNT(DISTINCT sites.id) AS site_count, "
+        "COUNT(*) AS finding_count "
+        "FROM sites JOIN findings ON findings.scan_id = sites.latest_scan_id "
+        "GROUP BY findings.title, findings.severity, findings.category",
+        "title, severity, category",
+    ),
+}
+
+
+def _kind():
+    return 'MATERIALIZED VIEW' if op.get_bind().dialect.name == 'postgresql' else 'TABLE'
+
+
+def upgrade():
+    op.create_table(
+        'materialized_view_refreshes',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration_ms', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    
+    kind = _kind()
+    for name, (query, key) in VIEWS.items():
+        op.execute(f"CREATE {kind} {name} AS {query}")
+        op.execute(f"CREATE UNIQUE INDEX ux_{name} ON {name} ({key})")
+
+
+def downgrade():
+    kind = _kind()
+    for name in VIEWS:
+        op.execute(f"DROP {kind} IF EXISTS {name}")
+    op.drop_table('materialized_view_refreshes')
@@ -0,0 +1,79 @@
+"""Add full-text search indexes over findings and sites
+
+Revision ID: 018_fulltext_search
+Revises: 017_portfolio_stats_views
+Create Date: 2026-10-19 22:00:00.000000
+
+Postgres: generated tsvector columns with GIN indexes (adding the column
+rewrites findings once). SQLite: external-content FTS5 tables kept in
+sync by triggers, built from the existing rows.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '018_fulltext_search'
+down_revision = '017_portfolio_stats_views'
+branch_labels = None
+depends_on = None
+
+# table -> (indexed columns, text search configuration, tsvector document).
+# A frozen copy of app.db.fulltext as of this revision; all DDL is IF NOT
+# EXISTS, so tables create_all has already indexed are left as they are.
+INDEXES = {
+    'findings': (
+        ('title', 'description', 'recommendation'),
+        'english',
+        "coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(recommendation, '')",
+    ),
+    'sites': (
+        ('domain', 'display_name'),
+        'simple',
+        "domain || ' ' || translate(domain, '.-', '  ') || ' ' || coalesce(display_name, '')",
+    ),
+}
+
+
+def _sqlite_statements(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert_new = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+        # Index the rows that are already there
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table, (columns, config, document) in INDEXES.items():
+        if dialect == 'postgresql':
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('{config}', {document})) STORED"
+            )
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+        elif dialect == 'sqlite':
+            for statement in _sqlite_statements(table, columns):
+                op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table in INDEXES:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        elif dialect == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
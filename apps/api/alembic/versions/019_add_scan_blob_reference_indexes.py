@@ -0,0 +1,40 @@
+"""Index the blob digests on scans
+
+Revision ID: 019_scan_blob_ref_indexes
+Revises: 018_fulltext_search
+Create Date: 2026-10-19 23:00:00.000000
+
+Retention looks up whether any scan still references a blob before
+deleting it, and Postgres checks the foreign keys on every blob delete;
+both used to read all of scans. Partial, since failed scans and those
+from before 007 have no stored response.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '019_scan_blob_ref_indexes'
+down_revision = '018_fulltext_search'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('response_headers_sha256', 'response_body_sha256')
+
+
+def upgrade():
+    for column in COLUMNS:
+        where = sa.text(f'{column} IS NOT NULL')
+        op.create_index(
+            f'ix_scans_{column}',
+            'scans',
+            [column],
+            unique=False,
+            postgresql_where=where,
+            sqlite_where=where
+        )
+
+
+def downgrade():
+    for column in COLUMNS:
+        op.drop_index(f'ix_scans_{column}', table_name='scans')
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.db.database import get_db
 from app.models.brand_profile import BrandProfile
 from app.schemas.brand_profile import BrandProfileCreate, BrandProfileResponse
+from app.services.blob_store import BlobStore
+from app.services.brand_logos import store_logo
 
 router = APIRouter()
 
@@ -16,17 +20,26 @@ router = APIRouter()
 @router.post("", response_model=BrandProfileResponse, status_code=201)
 async def create_brand_profile(
     brand_data: BrandProfileCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new brand profile"""
     # If this is set as default, unset other defaults
     is_default = getattr(brand_data, 'is_default', False)
+    
+    logo_sha256 = logo_content_type = None
+    if brand_data.logo_base64:
+        try:
+            logo_sha256, logo_content_type = await store_logo(db, brand_data.logo_base64)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     if is_default:
-        db.query(BrandProfile).filter(BrandProfile.is_default == True).update({"is_default": False})
+        await db.execute(update(BrandProfile).where(BrandProfile.is_default == True).values(is_default=False))
     
     brand = BrandProfile(
         name=brand_data.name,
-        logo_base64=brand_data.logo_base64,
+        logo_sha256=logo_sha256,
+        logo_content_type=logo_content_type,
         primary_color=brand_data.primary_color,
         accent_color=brand_data.accent_color,
         footer_text=brand_data.footer_text,
@@ -34,24 +47,60 @@ async def create_brand_profile(
     )
     
     db.add(brand)
-    db.commit()
-    db.refresh(brand)
+    await db.commit()
+    await db.refresh(brand)
     
     return brand
 
 
 @router.get("", response_model=List[BrandProfileResponse])
-async def list_brand_profiles(db: Session = Depends(get_db)):
+async def list_brand_profiles(db: AsyncSession = Depends(get_db)):
     """List all brand profiles"""
-    brands = db.query(BrandProfile).order_by(BrandProfile.created_at.desc()).all()
+    brands = (await db.scalars(select(BrandProfile).order_by(BrandProfile.created_at.desc()))).all()
     return brands
 
 
 @router.get("/{brand_id}", response_model=BrandProfileResponse)
-async def get_brand_profile(brand_id: int, db: Session = Depends(get_db)):
+async def get_brand_profile(brand_id: int, db: AsyncSession = Depends(get_db)):
     """Get a brand profile by ID"""
-    brand = db.query(BrandProfile).filter(BrandProfile.id == brand_id).first()
+    brand = await db.get(BrandProfile, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand profile not found")
     return brand
 
+
+
+@router.get("/{brand_id}/logo")
+async def get_brand_logo(
+    brand_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Serve a brand's logo image (ETag is the content digest, so unchanged logos revalidate with a 304)"""
+    row = (await db.execute(
+        select(BrandProfile.logo_sha256, BrandProfile.logo_content_type).where(BrandProfile.id == brand_id)
+    )).first()
+    if not row or not row.logo_sha256:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    
+    etag = f'"{row.logo_sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        # SVG logos can carry scripts; never let one run as a page on the API origin
+        "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    
+    blob = await BlobStore(db).get(row.logo_sha256)
+    if not blob:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    return StreamingResponse(
+        BlobStore.iter_decompressed(blob),
+        media_type=row.logo_content_type,
+        headers={**headers, "Content-Length": str(blob.size)}
+    )
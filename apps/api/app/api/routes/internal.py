@@ -4,12 +4,28 @@ Internal API endpoints for system operations.
 These endpoints are protected and should only be accessible
 from trusted sources (e.g., cron jobs, internal services).
 """
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 
-from app.db.database import get_db
+from app.db.database import get_db, pool_metrics, replica_router
+from app.db.slow_queries import SORT_KEYS, query_log
+from app.db.types import json_contains
 from app.services.monitoring_service import MonitoringService
+from app.services.partition_manager import PartitionManager
+from app.services.retention import RetentionEngine
+from app.services.scan_dispatcher import scan_dispatcher, ScanPriority
+from app.services.scan_ingestion import scan_ingestion
+from app.services.scan_queue import enqueue_scan
+from app.services.scan_worker import ScanWorkerService
+from app.services.scheduler import refresh_portfolio_stats
+from app.models.scan import Scan
+from app.models.scan_job import ScanJob
+from app.models.scan_worker import ScanWorker
+from app.schemas.scan import ScanMetadataMatch
+from app.schemas.scan_job import ScanJobEnqueueRequest, ScanWorkerResponse, ScanWorkersOverview
 from app.core.config import settings
 
 router = APIRouter()
@@ -30,7 +46,8 @@ def verify_internal_request(authorization: Optional[str] = Header(None)):
 
 @router.post("/internal/run-monitoring")
 async def run_monitoring(
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     _authorized: bool = Depends(verify_internal_request)
 ):
     """
@@ -41,7 +58,17 @@ async def run_monitoring(
     """
     try:
         monitoring_service = MonitoringService()
+        if settings.SCAN_WORKERS_ENABLED:
+            jobs = await monitoring_service.enqueue_due_scans(db)
+            return {
+                "message": "Monitoring scans queued for workers",
+                "scans_queued": len(jobs),
+                "job_ids": [job.id for job in jobs]
+            }
+        
         scans_run = await monitoring_service.process_all_monitoring_configs(db)
+        if scans_run:
+            background_tasks.add_task(refresh_portfolio_stats)
         
         return {
             "message": "Monitoring run completed",
@@ -54,3 +81,196 @@ async def run_monitoring(
             detail=f"Error running monitoring: {str(e)}"
         )
 
+
+
+@router.post("/internal/partitions/maintain")
+async def maintain_partitions(
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """
+    Create upcoming monthly partitions and detach expired ones.
+    
+    Call daily (e.g. via cron); safe to repeat.
+    """
+    try:
+        return await PartitionManager().maintain(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error maintaining partitions: {str(e)}"
+        )
+
+
+@router.post("/internal/retention/run")
+async def run_retention(
+    max_batches: Optional[int] = Query(50, ge=1, description="Stop after this many batches; call again to continue"),
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """
+    Compact scan history past each site's retention policy into rollups.
+    
+    Returns rows and estimated bytes reclaimed; `complete` is false when
+    max_batches was reached and another call should follow.
+    """
+    try:
+        report = await RetentionEngine().run(db, max_batches=max_batches)
+        return report.to_dict()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error running retention: {str(e)}"
+        )
+
+
+@router.post("/internal/portfolio/refresh")
+async def refresh_portfolio(_authorized: bool = Depends(verify_internal_request)):
+    """
+    Recompute the portfolio aggregates behind GET /portfolio/stats.
+    
+    Monitoring runs do this themselves; call it (e.g. via cron) when scan
+    workers run monitoring scans instead.
+    """
+    result = await refresh_portfolio_stats()
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=f"Error refreshing portfolio stats: {result['error']}")
+    return result
+
+
+@router.get("/internal/scan-lanes")
+async def get_scan_lanes(_authorized: bool = Depends(verify_internal_request)):
+    """Current in-flight and queued scans per priority lane"""
+    return scan_dispatcher.stats()
+
+
+@router.get("/internal/metrics")
+async def get_metrics(_authorized: bool = Depends(verify_internal_request)):
+    """Database pool usage (checkouts, wait times, overflow), replica health, scan lane occupancy and ingestion backlog"""
+    return {
+        "db_pool": {name: metrics.snapshot() for name, metrics in pool_metrics.items()},
+        "db_replicas": replica_router.stats(),
+        "scan_lanes": scan_dispatcher.stats(),
+        "scan_ingestion": scan_ingestion.stats(),
+    }
+
+
+@router.get("/internal/query-log")
+async def get_query_log(
+    sort: str = Query("total_ms", description=f"One of: {', '.join(SORT_KEYS)}"),
+    limit: int = Query(25, ge=1, le=500),
+    explain: int = Query(0, ge=0, le=20, description="EXPLAIN the slowest sample of this many of the top statements"),
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """Per-fingerprint statement stats for this process (count, total, p95, max), optionally with query plans"""
+    try:
+        entries = query_log.top(sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    statements = []
+    for entry in entries:
+        item = entry.to_dict()
+        if len(statements) < explain and entry.slowest:
+            try:
+                item["plan"] = await query_log.explain(db, entry.slowest)
+            except Exception as e:
+                item["plan_error"] = str(e)
+        statements.append(item)
+    
+    return {
+        "slow_query_ms": query_log.slow_ms,
+        "fingerprints": len(query_log.entries),
+        "evicted": query_log.evicted,
+        "statements": statements,
+    }
+
+
+@router.delete("/internal/query-log", status_code=204)
+async def reset_query_log(_authorized: bool = Depends(verify_internal_request)):
+    """Start collecting statement stats afresh (e.g. before load-testing a change)"""
+    query_log.reset()
+
+
+@router.post("/internal/scan-jobs", status_code=202)
+async def enqueue_scan_jobs(
+    request: ScanJobEnqueueRequest,
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """Queue URLs for scan workers (e.g. bulk backfills)"""
+    try:
+        jobs = [enqueue_scan(db, url, priority=ScanPriority(request.priority)) for url in request.urls]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    return {"scans_queued": len(jobs), "job_ids": [job.id for job in jobs]}
+
+
+@router.get("/internal/workers", response_model=ScanWorkersOverview)
+async def list_scan_workers(
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """Registered scan workers with their throughput, plus queue depth by status"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ScanWorkerService.WORKER_TTL)
+    workers = (await db.scalars(select(ScanWorker).order_by(ScanWorker.started_at))).all()
+    queue = {
+        status.value: count
+        for status, count in await db.execute(
+            select(ScanJob.status, func.count(ScanJob.id)).group_by(ScanJob.status)
+        )
+    }
+    
+    def is_live(worker: ScanWorker) -> bool:
+        heartbeat = worker.heartbeat_at
+        if heartbeat.tzinfo is None:
+            heartbeat = heartbeat.replace(tzinfo=timezone.utc)
+        return heartbeat >= cutoff
+    
+    return ScanWorkersOverview(
+        workers=[
+            ScanWorkerResponse(
+                id=worker.id,
+                hostname=worker.hostname,
+                pid=worker.pid,
+                started_at=worker.started_at,
+                heartbeat_at=worker.heartbeat_at,
+                live=is_live(worker),
+                scans_completed=worker.scans_completed,
+                scans_failed=worker.scans_failed,
+                scans_per_minute=worker.scans_per_minute,
+                owned_fraction=worker.owned_fraction
+            )
+            for worker in workers
+        ],
+        queue=queue
+    )
+
+
+@router.get("/internal/scans", response_model=List[ScanMetadataMatch])
+async def query_scans_by_metadata(
+    final_host: Optional[str] = None,
+    hop_count: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    _authorized: bool = Depends(verify_internal_request)
+):
+    """Most recent scans whose metadata matches, e.g. every scan that ended up on a given host"""
+    document = {}
+    if final_host is not None:
+        document["final_host"] = final_host.lower()
+    if hop_count is not None:
+        document["hop_count"] = hop_count
+    if not document:
+        raise HTTPException(status_code=400, detail="Pass final_host and/or hop_count")
+    
+    stmt = (
+        select(Scan)
+        .where(json_contains(Scan.scan_metadata, document, db.get_bind().dialect.name))
+        .order_by(Scan.created_at.desc(), Scan.id.desc())
+        .limit(limit)
+    )
+    return (await db.scalars(stmt)).all()
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.monitoring_config import MonitoringConfig
-from app.models.alert import Alert
+from app.core.pagination import keyset_paginate, finish_page
+from app.models.alert import Alert, AlertType
 from app.models.site import Site
 from app.schemas.monitoring import MonitoringConfigCreate, MonitoringConfigUpdate, MonitoringConfigResponse
-from app.schemas.alert import AlertResponse, AlertGroupedResponse
+from app.schemas.alert import AlertGroupedResponse
 from app.services.scheduler import schedule_monitoring_task
 
 router = APIRouter()
@@ -18,17 +20,17 @@ router = APIRouter()
 async def create_monitoring_config(
     site_id: int,
     config_data: MonitoringConfigCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create or update monitoring config for a site"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+    site = await db.get(Site, site_id)
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
     # Check if config already exists
-    existing_config = db.query(MonitoringConfig).filter(
+    existing_config = await db.scalar(select(MonitoringConfig).where(
         MonitoringConfig.site_id == site_id
-    ).first()
+    ))
     
     if existing_config:
         # Update existing config
@@ -36,8 +38,8 @@ async def create_monitoring_config(
             existing_config.frequency = config_data.frequency
         if config_data.enabled is not None:
             existing_config.enabled = config_data.enabled
-        db.commit()
-        db.refresh(existing_config)
+        await db.commit()
+        await db.refresh(existing_config)
         return existing_config
     else:
         # Create new config
@@ -47,20 +49,20 @@ async def create_monitoring_config(
             enabled=config_data.enabled
         )
         db.add(config)
-        db.commit()
-        db.refresh(config)
+        await db.commit()
+        await db.refresh(config)
         return config
 
 
 @router.get("/sites/{site_id}/monitoring", response_model=MonitoringConfigResponse)
 async def get_monitoring_config(
     site_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get monitoring config for a site"""
-    config = db.query(MonitoringConfig).filter(
+    config = await db.scalar(select(MonitoringConfig).where(
         MonitoringConfig.site_id == site_id
-    ).first()
+    ))
     
     if not config:
         raise HTTPException(
@@ -75,12 +77,12 @@ async def get_monitoring_config(
 async def update_monitoring_config(
     site_id: int,
     config_data: MonitoringConfigUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update monitoring config for a site"""
-    config = db.query(MonitoringConfig).filter(
+    config = await db.scalar(select(MonitoringConfig).where(
         MonitoringConfig.site_id == site_id
-    ).first()
+    ))
     
     if not config:
         raise HTTPException(status_code=404, detail="Monitoring config not found")
@@ -90,45 +92,73 @@ async def update_monitoring_config(
     if config_data.enabled is not None:
         config.enabled = config_data.enabled
     
-    db.commit()
-    db.refresh(config)
+    await db.commit()
+    await db.refresh(config)
     return config
 
 
 @router.get("/alerts", response_model=List[AlertGroupedResponse])
 async def get_alerts(
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only alerts created after this watermark"),
+    alert_type: Optional[AlertType] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get recent alerts grouped by site"""
-    alerts = db.query(Alert).order_by(
-        desc(Alert.created_at)
-    ).limit(limit).all()
+    """Get recent alerts grouped by site (pages over alerts; next page cursor in X-Next-Cursor)
     
-    # Group by site
-    grouped: dict[int, AlertGroupedResponse] = {}
-    
-    for alert in alerts:
-        if alert.site_id not in grouped:
-            site = alert.site
-            grouped[alert.site_id] = AlertGroupedResponse(
-                site_id=alert.site_id,
-                site_domain=site.domain,
-                site_display_name=site.display_name,
-                alerts=[]
-            )
-        
-        alert_response = AlertResponse(
-            id=alert.id,
-            site_id=alert.site_id,
-            scan_id=alert.scan_id,
-            alert_type=alert.alert_type,
-            message=alert.message,
-            created_at=alert.created_at,
-            site_domain=alert.site.domain,
-            site_display_name=alert.site.display_name
+    Alerts and the site fields they need come back from one joined query, so
+    the cost doesn't grow with the number of sites. Clients polling for new
+    alerts pass the newest created_at they have seen as `since`.
+    """
+    stmt = (
+        select(
+            Alert.id,
+            Alert.site_id,
+            Alert.scan_id,
+            Alert.alert_type,
+            Alert.message,
+            Alert.created_at,
+            Site.domain,
+            Site.display_name
         )
-        grouped[alert.site_id].alerts.append(alert_response)
+        .join(Site, Site.id == Alert.site_id)
+    )
+    if since:
+        stmt = stmt.where(Alert.created_at > since)
+    if alert_type:
+        stmt = stmt.where(Alert.alert_type == alert_type)
+    if created_after:
+        stmt = stmt.where(Alert.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Alert.created_at < created_before)
+    
+    rows = (await db.execute(keyset_paginate(stmt, Alert.created_at, Alert.id, cursor, limit))).all()
+    
+    # Group by site in one pass; dict insertion order keeps the newest site first
+    grouped: dict[int, dict] = {}
+    for row in finish_page(rows, limit, response):
+        group = grouped.get(row.site_id)
+        if group is None:
+            group = grouped[row.site_id] = {
+                "site_id": row.site_id,
+                "site_domain": row.domain,
+                "site_display_name": row.display_name,
+                "alerts": []
+            }
+        group["alerts"].append({
+            "id": row.id,
+            "site_id": row.site_id,
+            "scan_id": row.scan_id,
+            "alert_type": row.alert_type,
+            "message": row.message,
+            "created_at": row.created_at,
+            "site_domain": row.domain,
+            "site_display_name": row.display_name
+        })
     
     return list(grouped.values())
 
@@ -136,7 +166,7 @@ async def get_alerts(
 @router.post("/monitoring/run")
 async def trigger_monitoring(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Manually trigger monitoring task (for testing or cron jobs)"""
     schedule_monitoring_task(background_tasks)
@@ -0,0 +1,31 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_read_db
+from app.schemas.portfolio import PortfolioStatsResponse
+from app.services.portfolio_stats import portfolio_stats
+from app.services.scheduler import refresh_portfolio_stats
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=PortfolioStatsResponse)
+async def get_portfolio_stats(
+    background_tasks: BackgroundTasks,
+    top_findings: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Average score, sites per risk level and most common findings across all sites.
+    
+    Served from precomputed aggregates; refreshed_at and staleness_seconds
+    say how current they are. Stale aggregates are still returned, with a
+    refresh scheduled in the background.
+    """
+    snapshot = await portfolio_stats.read(db, top_findings)
+    if portfolio_stats.is_stale(snapshot) and not portfolio_stats.refreshing:
+        background_tasks.add_task(refresh_portfolio_stats)
+        snapshot.refresh_scheduled = True
+    return PortfolioStatsResponse(**asdict(snapshot))
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import OperationalError, DatabaseError
 from typing import List, Dict, Optional
 from collections import Counter
-import json
 
-from app.db.database import get_db
-from app.models.scan import Scan, RiskLevel
-from app.models.finding import Finding, FindingCategory, FindingSeverity
+from app.db.database import get_db, get_scan_read_db, read_or_primary, recent_scan_writes
+from app.models.scan import Scan
+from app.models.finding import FindingCategory, FindingSeverity
 from app.models.brand_profile import BrandProfile
 from app.models.shared_report_link import SharedReportLink
-from app.models.site import Site
 from urllib.parse import urlparse
 from app.schemas.scan import (
     ScanCreateRequest,
@@ -20,6 +21,10 @@ from app.schemas.scan import (
 from app.schemas.explanation import ExplanationResponse
 from app.schemas.shared_report_link import ShareReportRequest, ShareReportResponse
 from app.services.scanner import ScannerService
+from app.services.scan_persistence import apply_scan_result, load_scan
+from app.services.scan_dispatcher import scan_dispatcher, ScanPriority
+from app.services.site_registry import site_registry
+from app.services.blob_store import BlobStore
 from app.services.llm_client import get_llm_client
 from app.services.pdf_generator import PDFGenerator
 from app.core.config import settings
@@ -45,56 +50,26 @@ def extract_domain_from_url(url: str) -> str:
 @router.post("", response_model=ScanCreateResponse)
 async def create_scan(
     request: ScanCreateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new scan for the given URL"""
     try:
-        # Extract domain and find or create site
-        domain = extract_domain_from_url(request.url)
-        site = None
+        # Run the scan first so no database connection is held while we wait on the network
+        scanner = ScannerService()
+        async with scan_dispatcher.slot(ScanPriority.INTERACTIVE):
+            scan_result = await scanner.scan_url(request.url)
         
-        if domain:
-            # Try to find existing site
-            site = db.query(Site).filter(Site.domain == domain).first()
-            
-            # If not found, auto-create site
-            if not site:
-                site = Site(
-                    domain=domain,
-                    display_name=domain  # Default to domain as display name
-                )
-                db.add(site)
-                db.flush()
+        # Find or create the site (one upsert, or no query once the domain is cached)
+        domain = extract_domain_from_url(request.url)
+        site_id = await site_registry.site_id_for(db, domain) if domain else None
         
         # Create scan record
-        scan = Scan(url=request.url, user_id=None, site_id=site.id if site else None)
+        scan = Scan(url=request.url, user_id=None, site_id=site_id)
         db.add(scan)
-        db.flush()  # Get scan.id
-        
-        # Run scan
-        scanner = ScannerService()
-        scan_result = await scanner.scan_url(request.url)
-        
-        # Update scan with metadata
-        scan.normalized_url = scan_result.normalized_url
-        scan.final_url = scan_result.final_url
-        # Store redirect_chain as JSON string for SQLite compatibility
-        scan.redirect_chain = json.dumps(scan_result.redirect_chain) if scan_result.redirect_chain else None
-        scan.response_status = scan_result.response_status
-        scan.overall_score = scan_result.overall_score
-        scan.risk_level = RiskLevel(scan_result.risk_level) if scan_result.risk_level else None
+        await db.flush()  # Get scan.id
         
-        # Create findings
-        for finding_data in scan_result.findings:
-            finding = Finding(
-                scan_id=scan.id,
-                category=finding_data["category"],
-                severity=finding_data["severity"],
-                title=finding_data["title"],
-                description=finding_data["description"],
-                recommendation=finding_data.get("recommendation")
-            )
-            db.add(finding)
+        # Record metadata, raw response and findings
+        await apply_scan_result(db, scan, scan_result)
         
         # Count findings by severity
         severity_counts = Counter(f["severity"].value for f in scan_result.findings)
@@ -106,8 +81,9 @@ async def create_scan(
             "info": severity_counts.get(FindingSeverity.INFO.value, 0),
         }
         
-        db.commit()
-        db.refresh(scan)
+        await db.commit()
+        # The client usually fetches the report next; read it from the primary until replicas catch up
+        recent_scan_writes.mark(scan.id)
         
         return ScanCreateResponse(
             scan_id=scan.id,
@@ -119,7 +95,7 @@ async def create_scan(
         )
     except (OperationalError, DatabaseError) as e:
         # Database connection error
-        db.rollback()
+        await db.rollback()
         import traceback
         print(f"Database error creating scan: {e}")
         print(traceback.format_exc())
@@ -129,7 +105,7 @@ async def create_scan(
         )
     except Exception as e:
         # Rollback on error
-        db.rollback()
+        await db.rollback()
         # Log the error for debugging
         import traceback
         print(f"Error creating scan: {e}")
@@ -141,26 +117,45 @@ async def create_scan(
 
 
 @router.get("/{scan_id}", response_model=ScanSchema)
-async def get_scan(scan_id: int, db: Session = Depends(get_db)):
+async def get_scan(scan_id: int, db: AsyncSession = Depends(get_scan_read_db)):
     """Get a scan report by ID"""
-    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    scan = await read_or_primary(db, load_scan, scan_id)
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
-    # Convert redirect_chain from JSON string to list if needed
-    if isinstance(scan.redirect_chain, str):
-        try:
-            scan.redirect_chain = json.loads(scan.redirect_chain)
-        except:
-            scan.redirect_chain = None
-    
     return scan
 
 
+@router.get("/{scan_id}/raw/{part}")
+async def get_scan_raw_response(scan_id: int, part: str, db: AsyncSession = Depends(get_db)):
+    """Stream the raw response headers or body captured during a scan"""
+    if part not in ("headers", "body"):
+        raise HTTPException(status_code=404, detail="Unknown raw response part")
+    
+    scan = await db.get(Scan, scan_id)
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    digest = scan.response_headers_sha256 if part == "headers" else scan.response_body_sha256
+    blob = await BlobStore(db).get(digest) if digest else None
+    if not blob:
+        raise HTTPException(status_code=404, detail="Raw response not stored for this scan")
+    
+    media_type = "application/json" if part == "headers" else "text/plain; charset=utf-8"
+    return StreamingResponse(
+        BlobStore.iter_decompressed(blob),
+        media_type=media_type,
+        headers={
+            "Content-Length": str(blob.size),
+            "ETag": f'"{blob.sha256}"'
+        }
+    )
+
+
 @router.get("/{scan_id}/explain", response_model=ExplanationResponse)
-async def explain_scan(scan_id: int, db: Session = Depends(get_db)):
+async def explain_scan(scan_id: int, db: AsyncSession = Depends(get_scan_read_db)):
     """Generate AI explanation for a scan report"""
-    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    scan = await read_or_primary(db, load_scan, scan_id)
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
@@ -194,10 +189,10 @@ async def get_scan_pdf(
     scan_id: int,
     mode: Optional[str] = Query(None, description="PDF mode: 'branded' or default"),
     brand_id: Optional[int] = Query(None, description="Brand profile ID for branded PDF"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_scan_read_db)
 ):
     """Generate PDF report for a scan"""
-    scan = db.query(Scan).filter(Scan.id == scan_id).first()
+    scan = await read_or_primary(db, load_scan, scan_id)
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
@@ -215,11 +210,12 @@ async def get_scan_pdf(
                 detail="brand_id is required for branded PDF mode"
             )
         
-        brand = db.query(BrandProfile).filter(BrandProfile.id == brand_id).first()
+        brand = await db.get(BrandProfile, brand_id, options=[selectinload(BrandProfile.logo)])
         if not brand:
             raise HTTPException(status_code=404, detail="Brand profile not found")
         
-        pdf_bytes = PDFGenerator.generate_pdf(scan, brand)
+        # Rendering is CPU-bound; keep it off the event loop
+        pdf_bytes = await run_in_threadpool(PDFGenerator.generate_pdf, scan, brand)
         
         # Generate filename
         from urllib.parse import urlparse
@@ -235,7 +231,7 @@ async def get_scan_pdf(
         )
     else:
         # Neutral/default PDF
-        pdf_bytes = PDFGenerator.generate_pdf(scan)
+        pdf_bytes = await run_in_threadpool(PDFGenerator.generate_pdf, scan)
         
         from urllib.parse import urlparse
         domain = urlparse(scan.url).netloc.replace('.', '-') if scan.url else 'unknown'
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_values, encode_values
+from app.db.database import get_read_db
+from app.schemas.search import SearchHit
+from app.services.search import search
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[SearchHit])
+async def search_findings_and_sites(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256, description='Words to match, e.g. "nginx 1.14"'),
+    history: bool = Query(False, description="Search findings of every stored scan, not just each site's latest"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over finding text and site domains/names, best matches first.
+    
+    Every word must match (stemmed, so "revealing" finds "reveals").
+    When more hits exist, the X-Next-Cursor header holds the cursor for the next page.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query is empty")
+    
+    after = None
+    if cursor:
+        try:
+            rank, kind, hit_id = decode_values(cursor)
+            after = (float(rank), str(kind), int(hit_id))
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    
+    hits = await search(db, q, limit, after=after, history=history)
+    page = hits[:limit]
+    if len(hits) > limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_values([last["rank"], last["kind"], last["id"]])
+    return page
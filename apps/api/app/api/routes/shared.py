@@ -1,25 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from uuid import UUID
-import json
 
-from app.db.database import get_db
+from app.db.database import get_read_db, read_or_primary
 from app.models.shared_report_link import SharedReportLink
-from app.models.scan import Scan
 from app.schemas.scan import ScanSchema
+from app.services.scan_persistence import load_scan
 
 router = APIRouter()
 
 
+async def find_shared_link(db: AsyncSession, token: UUID):
+    return await db.scalar(select(SharedReportLink).where(SharedReportLink.token == token))
+
+
 @router.get("/{token}", response_model=ScanSchema)
-async def get_shared_report(token: UUID, db: Session = Depends(get_db)):
+async def get_shared_report(token: UUID, db: AsyncSession = Depends(get_read_db)):
     """
     Get a scan report via shared link token.
     Read-only access - no premium fields exposed.
     """
     # Look up shared link
-    shared_link = db.query(SharedReportLink).filter(SharedReportLink.token == token).first()
+    shared_link = await read_or_primary(db, find_shared_link, token)
     
     if not shared_link:
         raise HTTPException(status_code=404, detail="Shared report link not found")
@@ -32,17 +36,10 @@ async def get_shared_report(token: UUID, db: Session = Depends(get_db)):
         )
     
     # Get scan
-    scan = db.query(Scan).filter(Scan.id == shared_link.scan_id).first()
+    scan = await read_or_primary(db, load_scan, shared_link.scan_id)
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
-    # Convert redirect_chain from JSON string to list if needed
-    if isinstance(scan.redirect_chain, str):
-        try:
-            scan.redirect_chain = json.loads(scan.redirect_chain)
-        except:
-            scan.redirect_chain = None
-    
     # TODO: Add rate limiting here (e.g., max requests per token per hour)
     # TODO: Add analytics tracking for shared link views
     
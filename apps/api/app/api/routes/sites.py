@@ -1,24 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+import re
 
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.pagination import keyset_paginate, finish_page
+from app.db.database import get_db, get_read_db, get_read_sessionmaker
 from app.models.site import Site
-from app.models.scan import Scan
-from app.schemas.site import SiteCreate, SiteResponse, SiteListResponse
+from app.models.scan import Scan, RiskLevel
+from app.models.scan_rollup import RollupGranularity, ScanRollup
+from app.schemas.history import HistoryBucket, ScoreHistoryResponse
+from app.schemas.site import SiteCreate, SiteResponse, SiteListResponse, SiteRetentionUpdate, SiteRetentionResponse
+from app.services.retention import RETENTION_POLICIES
+from app.services.rollups import period_start
+from app.services.site_export import EXPORT_FORMATS, stream_site_export
 
 router = APIRouter()
 
+HISTORY_GRANULARITY = {
+    HistoryBucket.DAY: RollupGranularity.DAILY,
+    HistoryBucket.WEEK: RollupGranularity.WEEKLY,
+    HistoryBucket.MONTH: RollupGranularity.MONTHLY,
+}
+
+
+def site_summary(site: Site, response_model=SiteResponse):
+    """Build a site response from the denormalized latest-scan columns"""
+    return response_model(
+        id=site.id,
+        domain=site.domain,
+        display_name=site.display_name,
+        created_at=site.created_at,
+        latest_scan_score=site.latest_scan_score,
+        latest_scan_date=site.latest_scan_at,
+        latest_scan_risk_level=site.latest_scan_risk_level.value if site.latest_scan_risk_level else None
+    )
+
 
 @router.post("", response_model=SiteResponse, status_code=201)
 async def create_site(
     site_data: SiteCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new site"""
     # Check if site already exists
-    existing_site = db.query(Site).filter(Site.domain == site_data.domain).first()
+    existing_site = await db.scalar(select(Site).where(Site.domain == site_data.domain))
     if existing_site:
         raise HTTPException(
             status_code=409,
@@ -31,92 +61,102 @@ async def create_site(
     )
     
     db.add(site)
-    db.commit()
-    db.refresh(site)
-    
-    # Get latest scan info
-    latest_scan = db.query(Scan).filter(
-        Scan.site_id == site.id
-    ).order_by(desc(Scan.created_at)).first()
-    
-    response = SiteResponse(
-        id=site.id,
-        domain=site.domain,
-        display_name=site.display_name,
-        created_at=site.created_at,
-        latest_scan_score=latest_scan.overall_score if latest_scan else None,
-        latest_scan_date=latest_scan.created_at if latest_scan else None,
-        latest_scan_risk_level=latest_scan.risk_level.value if latest_scan and latest_scan.risk_level else None
-    )
+    await db.commit()
+    await db.refresh(site)
     
-    return response
+    return site_summary(site)
 
 
 @router.get("", response_model=List[SiteListResponse])
-async def list_sites(db: Session = Depends(get_db)):
-    """List all sites with their latest scan information"""
-    sites = db.query(Site).order_by(desc(Site.created_at)).all()
-    
-    result = []
-    for site in sites:
-        # Get latest scan for this site
-        latest_scan = db.query(Scan).filter(
-            Scan.site_id == site.id
-        ).order_by(desc(Scan.created_at)).first()
-        
-        result.append(SiteListResponse(
-            id=site.id,
-            domain=site.domain,
-            display_name=site.display_name,
-            created_at=site.created_at,
-            latest_scan_score=latest_scan.overall_score if latest_scan else None,
-            latest_scan_date=latest_scan.created_at if latest_scan else None,
-            latest_scan_risk_level=latest_scan.risk_level.value if latest_scan and latest_scan.risk_level else None
-        ))
+async def list_sites(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    risk_level: Optional[RiskLevel] = Query(None, description="Latest scan risk level"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List sites with their latest scan information, newest first (next page cursor in X-Next-Cursor)"""
+    # Single query: latest-scan fields live on the site row (see record_latest_scan)
+    stmt = select(Site)
+    if risk_level:
+        stmt = stmt.where(Site.latest_scan_risk_level == risk_level)
+    if created_after:
+        stmt = stmt.where(Site.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Site.created_at < created_before)
     
-    return result
+    sites = (await db.scalars(keyset_paginate(stmt, Site.created_at, Site.id, cursor, limit))).all()
+    return [site_summary(site, SiteListResponse) for site in finish_page(sites, limit, response)]
 
 
 @router.get("/{site_id}", response_model=SiteResponse)
-async def get_site(site_id: int, db: Session = Depends(get_db)):
+async def get_site(site_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a site by ID"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+    site = await db.get(Site, site_id)
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
-    # Get latest scan info
-    latest_scan = db.query(Scan).filter(
-        Scan.site_id == site.id
-    ).order_by(desc(Scan.created_at)).first()
+    return site_summary(site)
+
+
+@router.put("/{site_id}/retention", response_model=SiteRetentionResponse)
+async def set_site_retention(
+    site_id: int,
+    retention: SiteRetentionUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Choose how long a site keeps full scan detail before it is compacted into rollups"""
+    site = await db.get(Site, site_id)
+    if not site:
+        raise HTTPException(status_code=404, detail="Site not found")
+    if retention.policy is not None and retention.policy not in RETENTION_POLICIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown retention policy. Choose one of: {', '.join(RETENTION_POLICIES)}"
+        )
     
-    return SiteResponse(
-        id=site.id,
-        domain=site.domain,
-        display_name=site.display_name,
-        created_at=site.created_at,
-        latest_scan_score=latest_scan.overall_score if latest_scan else None,
-        latest_scan_date=latest_scan.created_at if latest_scan else None,
-        latest_scan_risk_level=latest_scan.risk_level.value if latest_scan and latest_scan.risk_level else None
+    site.retention_policy = retention.policy
+    await db.commit()
+    
+    policy = RETENTION_POLICIES[retention.policy or settings.RETENTION_DEFAULT_POLICY]
+    return SiteRetentionResponse(
+        site_id=site.id,
+        retention_policy=policy.name,
+        full_detail_days=policy.full_detail_days,
+        daily_rollup_days=policy.daily_rollup_days
     )
 
 
 @router.get("/{site_id}/scans", response_model=List[dict])
 async def get_site_scans(
     site_id: int,
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(10, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    risk_level: Optional[RiskLevel] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get recent scans for a site"""
-    site = db.query(Site).filter(Site.id == site_id).first()
+    """Get recent scans for a site, newest first (next page cursor in X-Next-Cursor)"""
+    site = await db.get(Site, site_id)
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
-    scans = db.query(Scan).filter(
-        Scan.site_id == site_id
-    ).order_by(desc(Scan.created_at)).limit(limit).all()
+    stmt = select(Scan).where(Scan.site_id == site_id)
+    if risk_level:
+        stmt = stmt.where(Scan.risk_level == risk_level)
+    if created_after:
+        stmt = stmt.where(Scan.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Scan.created_at < created_before)
+    
+    scans = (await db.scalars(keyset_paginate(stmt, Scan.created_at, Scan.id, cursor, limit))).all()
     
     result = []
-    for scan in scans:
+    for scan in finish_page(scans, limit, response):
         result.append({
             "id": scan.id,
             "url": scan.url,
@@ -127,3 +167,64 @@ async def get_site_scans(
     
     return result
 
+
+@router.get("/{site_id}/export")
+async def export_site_scans(
+    site_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (scan per line) or csv (finding per row)"),
+    gzip: bool = Query(False, description="Gzip-compress the download"),
+    read_sessions: async_sessionmaker = Depends(get_read_sessionmaker)
+):
+    """
+    Download a site's full scan history with findings, oldest first.
+    
+    Streamed straight from a database cursor, so there is no row cap and
+    the download starts immediately. The stream opens its own session from
+    the same (replica or primary) sessionmaker, as it runs after this
+    endpoint has returned.
+    """
+    async with read_sessions() as db:
+        site = await db.get(Site, site_id)
+    if not site:
+        raise HTTPException(status_code=404, detail="Site not found")
+    
+    filename = f"{re.sub(r'[^A-Za-z0-9.-]', '_', site.domain)}-scans.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        stream_site_export(read_sessions, site_id, format, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/{site_id}/history", response_model=ScoreHistoryResponse)
+async def get_site_history(
+    site_id: int,
+    bucket: HistoryBucket = HistoryBucket.DAY,
+    from_: Optional[datetime] = Query(None, alias="from", description="Include the bucket containing this time onwards"),
+    to: Optional[datetime] = Query(None, description="Include buckets starting before this time"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Score trend for a site: min/max/avg score and finding counts per day, week or month.
+    
+    Served from rollups kept up to date as scans are written, so even years
+    of history is one indexed range read. Daily buckets only go back as far
+    as the site's retention policy keeps them.
+    """
+    site = await db.get(Site, site_id)
+    if not site:
+        raise HTTPException(status_code=404, detail="Site not found")
+    
+    granularity = HISTORY_GRANULARITY[bucket]
+    stmt = select(ScanRollup).where(ScanRollup.site_id == site_id, ScanRollup.granularity == granularity)
+    if from_:
+        stmt = stmt.where(ScanRollup.period_start >= period_start(from_, granularity))
+    if to:
+        stmt = stmt.where(ScanRollup.period_start < to)
+    
+    rollups = (await db.scalars(stmt.order_by(ScanRollup.period_start))).all()
+    return ScoreHistoryResponse(site_id=site_id, bucket=bucket, points=rollups)
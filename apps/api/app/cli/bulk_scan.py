@@ -0,0 +1,263 @@
+"""
+Bulk offline scanner: read domains, write one NDJSON line per result.
+
+Used to pre-qualify large prospect lists without touching the API or the
+database. Input is streamed line by line and results are written as soon
+as each scan finishes, so memory stays flat regardless of list size.
+
+Usage:
+    python -m app.cli.bulk_scan domains.txt -o results.ndjson \\
+        --concurrency 100 --per-host 2 --checkpoint scan.ckpt
+
+    cat domains.txt | python -m app.cli.bulk_scan - > results.ndjson
+
+Interrupted runs can be resumed by re-running with the same --checkpoint:
+already-completed input lines are skipped and output is appended. A scan
+that finished after the last checkpoint save may be emitted twice.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, IO, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.metrics import LatencyReservoir
+from app.services.scanner import ScannerService, ScanResult
+
+
+class Checkpoint:
+    """
+    Tracks completed inputs compactly, by their position among the domain
+    lines (blank and comment lines aren't counted).
+
+    Stores a low-water mark (every line below it is done) plus the set of
+    done lines above it, which is bounded by the number of in-flight scans.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.watermark = 0
+        self.done: Set[int] = set()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.watermark = state.get("watermark", 0)
+            self.done = set(state.get("done", []))
+
+    @property
+    def resumed(self) -> bool:
+        return self.watermark > 0 or bool(self.done)
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    def mark_done(self, index: int) -> None:
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"watermark": self.watermark, "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+
+class HostLimiter:
+    """Per-host concurrency limit; semaphores are dropped once a host goes idle"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores: Dict[str, Tuple[asyncio.Semaphore, int]] = {}
+
+    async def acquire(self, host: str) -> None:
+        semaphore, users = self._semaphores.get(host, (asyncio.Semaphore(self.limit), 0))
+        self._semaphores[host] = (semaphore, users + 1)
+        await semaphore.acquire()
+
+    def release(self, host: str) -> None:
+        semaphore, users = self._semaphores[host]
+        semaphore.release()
+        if users <= 1:
+            del self._semaphores[host]
+        else:
+            self._semaphores[host] = (semaphore, users - 1)
+
+
+def result_to_record(domain: str, result: ScanResult, duration_ms: float) -> Dict:
+    """Flatten a ScanResult into a JSON-serializable NDJSON record"""
+    error = None
+    findings = []
+    for finding in result.findings:
+        if finding["title"] == "Scan Error":
+            error = finding["description"]
+            continue
+        findings.append({
+            "category": finding["category"].value,
+            "severity": finding["severity"].value,
+            "title": finding["title"],
+        })
+
+    return {
+        "input": domain,
+        "url": result.normalized_url or None,
+        "final_url": result.final_url or None,
+        "status": result.response_status,
+        "redirect_chain": result.redirect_chain,
+        "overall_score": result.overall_score,
+        "risk_level": result.risk_level,
+        "findings": findings,
+        "duration_ms": round(duration_ms, 1),
+        "error": error,
+    }
+
+
+def host_key(scanner: ScannerService, domain: str) -> str:
+    """Host used for per-host limiting"""
+    try:
+        return urlparse(scanner.normalize_url(domain)).netloc.lower()
+    except ValueError:
+        return domain.lower()
+
+
+async def run_bulk_scan(
+    input_file: IO[str],
+    output_file: IO[str],
+    concurrency: int = 50,
+    per_host: int = 2,
+    checkpoint: Optional[Checkpoint] = None,
+    checkpoint_every: int = 100,
+) -> Dict:
+    """Scan every domain in input_file and return a throughput/latency summary"""
+    checkpoint = checkpoint or Checkpoint(None)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    host_limiter = HostLimiter(per_host)
+    latencies = LatencyReservoir()
+    counts = {"scanned": 0, "failed": 0, "skipped": 0}
+    loop = asyncio.get_running_loop()
+
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        scanner = ScannerService(client=client)
+
+        async def produce():
+            index = 0
+            while True:
+                # readline in a thread so a slow stdin pipe doesn't stall in-flight scans
+                line = await loop.run_in_executor(None, input_file.readline)
+                if not line:
+                    break
+                domain = line.strip()
+                if not domain or domain.startswith("#"):
+                    continue  # not numbered, so they can't hold the checkpoint watermark back
+                if checkpoint.is_done(index):
+                    counts["skipped"] += 1
+                else:
+                    await queue.put((index, domain))
+                index += 1
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, domain = item
+                host = host_key(scanner, domain)
+
+                await host_limiter.acquire(host)
+                try:
+                    started = time.perf_counter()
+                    result = await scanner.scan_url(domain)
+                    duration_ms = (time.perf_counter() - started) * 1000
+                finally:
+                    host_limiter.release(host)
+
+                record = result_to_record(domain, result, duration_ms)
+                output_file.write(json.dumps(record) + "\n")
+                latencies.record(duration_ms)
+                counts["scanned"] += 1
+                if record["error"]:
+                    counts["failed"] += 1
+
+                checkpoint.mark_done(index)
+                if counts["scanned"] % checkpoint_every == 0:
+                    output_file.flush()
+                    checkpoint.save()
+
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+        finally:
+            output_file.flush()
+            checkpoint.save()
+        elapsed = time.perf_counter() - started
+
+    return {
+        **counts,
+        "elapsed_seconds": round(elapsed, 2),
+        "scans_per_second": round(counts["scanned"] / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": latencies.summary(),
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    latency = summary["latency_ms"]
+    return (
+        f"Scanned {summary['scanned']} ({summary['failed']} failed, {summary['skipped']} skipped from checkpoint) "
+        f"in {summary['elapsed_seconds']}s - {summary['scans_per_second']} scans/sec\n"
+        f"Latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-scan domains to NDJSON without the API or database")
+    parser.add_argument("input", help="File with one domain or URL per line, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Maximum scans in flight")
+    parser.add_argument("--per-host", type=int, default=2, help="Maximum concurrent scans per host")
+    parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted run")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Save checkpoint every N results")
+    args = parser.parse_args(argv)
+
+    checkpoint = Checkpoint(args.checkpoint)
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    if args.output == "-":
+        output_file = sys.stdout
+    else:
+        output_file = open(args.output, "a" if checkpoint.resumed else "w")
+
+    try:
+        summary = asyncio.run(run_bulk_scan(
+            input_file,
+            output_file,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            checkpoint=checkpoint,
+            checkpoint_every=args.checkpoint_every,
+        ))
+    except KeyboardInterrupt:
+        print(f"Interrupted; progress saved to {args.checkpoint}" if args.checkpoint else "Interrupted", file=sys.stderr)
+        return 130
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    print(format_summary(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Export scans and findings to partitioned Parquet/Arrow files for analytics.
+
+Each run picks up where the previous one left off (the watermark is kept
+in the output directory), so it can run from cron.
+
+Usage:
+    python -m app.cli.export_analytics /data/elephantfly-export
+    python -m app.cli.export_analytics /data/export --format arrow --batch-size 10000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from app.services.analytics_export import FORMATS, AnalyticsExporter
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Incrementally export scans and findings to columnar files")
+    parser.add_argument("output", help="Directory for the partitioned dataset and its watermark")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet", help="File format (default: parquet)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows fetched per cursor batch and per row group")
+    parser.add_argument(
+        "--settle-seconds", type=int, default=300,
+        help="Leave scans younger than this for the next run (must exceed the longest write transaction)"
+    )
+    args = parser.parse_args(argv)
+
+    exporter = AnalyticsExporter(
+        args.output,
+        file_format=args.format,
+        batch_size=args.batch_size,
+        settle_seconds=args.settle_seconds
+    )
+    report = asyncio.run(exporter.run())
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Scan worker process entry point.
+
+Run one per node (or several per node); workers discover each other
+through the scan_workers table and split hosts between them.
+
+Usage:
+    python -m app.cli.scan_worker --concurrency 20
+"""
+import argparse
+import asyncio
+import signal
+import sys
+
+from app.services.scan_worker import ScanWorkerService
+
+
+async def _run(concurrency: int, poll_interval: float) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = ScanWorkerService(concurrency=concurrency, poll_interval=poll_interval)
+    await worker.run(stop)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a scan worker that claims jobs from its host-hash shard")
+    parser.add_argument("--concurrency", type=int, default=20, help="Maximum scans in flight on this worker")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the shard is empty")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_run(args.concurrency, args.poll_interval))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,30 @@ import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    
+    # Database connection pool (per engine, per process; ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before erroring
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_WAIT_WARN_MS: float = 250.0  # warn when a checkout waits longer than this
+    DB_REQUEST_QUERY_WARN: int = 25  # warn when one request runs more statements than this
+    DB_REQUEST_TIME_WARN_MS: float = 500.0  # ... or spends longer than this in the database
+    DB_SLOW_QUERY_MS: float = 100.0  # log statements slower than this and keep a sample to EXPLAIN
+    DB_QUERY_LOG_SIZE: int = 500  # statement fingerprints tracked per process
+    
+    # Read replicas for read-only endpoints (comma-separated URLs; empty reads from the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind than this are skipped
+    REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # seconds between lag checks per replica
+    REPLICA_STICKY_SECONDS: float = 30.0  # reads of a just-created scan stay on the primary this long
+    
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """Parse DATABASE_REPLICA_URLS from comma-separated string"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_RELOAD: bool = True
@@ -24,6 +48,38 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     DEEPSEEK_API_KEY: str = ""
     
+    # Domain -> site id cache in front of site auto-creation (entries per process)
+    SITE_ID_CACHE_SIZE: int = 10000
+    
+    # Scan execution lanes (interactive scans keep SCAN_MAX_CONCURRENCY minus the other lanes in reserve)
+    SCAN_MAX_CONCURRENCY: int = 32
+    SCAN_INTERACTIVE_CONCURRENCY: int = 16
+    SCAN_MONITORING_CONCURRENCY: int = 12
+    SCAN_BULK_CONCURRENCY: int = 4
+    
+    # Distributed scan workers (python -m app.cli.scan_worker); when enabled,
+    # monitoring runs enqueue scan jobs instead of scanning in the API process
+    SCAN_WORKERS_ENABLED: bool = False
+    
+    # Write-behind ingestion of monitoring/worker scan results (app.services.scan_ingestion)
+    INGEST_BATCH_SIZE: int = 50  # scans committed per transaction
+    INGEST_FLUSH_INTERVAL: float = 0.5  # seconds a partial batch waits for more results
+    INGEST_MAX_PENDING: int = 1000  # results buffered in memory before producers wait
+    
+    # Portfolio aggregate views (app.services.portfolio_stats): reads of older data trigger a refresh
+    PORTFOLIO_STATS_MAX_AGE: int = 900  # seconds
+    
+    # Monthly partitions of scans/findings/alerts (PostgreSQL only)
+    PARTITION_MONTHS_AHEAD: int = 3  # empty partitions kept ready beyond the current month
+    PARTITION_RETENTION_MONTHS: int = 0  # detach partitions older than this (unless they hold retained scans); 0 keeps everything
+    
+    # Scan history retention (see app.services.retention)
+    RETENTION_DEFAULT_POLICY: str = "standard"
+    RETENTION_BATCH_SIZE: int = 200  # scans (or daily rollups) compacted per transaction
+    
+    # Raw response storage
+    BLOB_COMPRESSION: str = "gzip"  # "gzip" or "zstd" (requires the zstandard package)
+    
     # Premium features
     ENABLE_BRANDED_PDF: str = "false"  # Set to "true" to enable branded PDFs
     
@@ -0,0 +1,95 @@
+"""
+Lightweight in-process metrics primitives.
+
+These are deliberately dependency-free so they can be used from the API,
+CLI tools and benchmarks alike.
+"""
+import math
+import random
+from typing import Dict, List, Optional
+
+
+class LatencyReservoir:
+    """
+    Bounded uniform sample of observations for percentile estimates.
+
+    Uses reservoir sampling (Algorithm R) so memory stays constant no
+    matter how many values are recorded; count/total/max are exact.
+    """
+
+    def __init__(self, size: int = 10000, seed: Optional[int] = None):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.max: Optional[float] = None
+        self._sample: List[float] = []
+        self._random = random.Random(seed)
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if len(self._sample) < self.size:
+            self._sample.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self.size:
+                self._sample[slot] = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100) over the sample"""
+        if not self._sample:
+            return None
+        ordered = sorted(self._sample)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Count, mean, p50/p95/p99 and max, rounded for display"""
+        def _round(value: Optional[float]) -> Optional[float]:
+            return round(value, 2) if value is not None else None
+
+        return {
+            "count": self.count,
+            "mean": _round(self.total / self.count) if self.count else None,
+            "p50": _round(self.percentile(50)),
+            "p95": _round(self.percentile(95)),
+            "p99": _round(self.percentile(99)),
+            "max": _round(self.max),
+        }
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (cumulative, Prometheus-style).
+
+    Cheap enough to update on every observation, e.g. per connection
+    checkout, where keeping a sample would be wasteful.
+    """
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Cumulative counts per upper bound, plus count and sum"""
+        buckets: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            buckets[f"{bound:g}"] = running
+        buckets["+Inf"] = self.count
+        return {"buckets": buckets, "count": self.count, "sum": round(self.total, 2)}
@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination on (created_at, id), newest first.
+
+Listings fetch one row past the page size to learn whether another page
+exists and hand back an opaque cursor for the last row returned. The
+cursor goes in the X-Next-Cursor response header so list bodies keep
+their existing shape. Unlike OFFSET, each page is a single index range
+scan regardless of depth.
+
+On partitioned tables (scans and alerts on Postgres) only cursor pages
+are pruned, to the partitions at or before the cursor's created_at. A
+first page has no bound, so it still reads the newest rows of every
+partition and merges them.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_values(values: list) -> str:
+    """Opaque cursor for the sort key of the last row returned"""
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_values(cursor: str) -> list:
+    """Sort key from encode_values; raises HTTP 400 for anything that isn't a cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return encode_values([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor from encode_cursor; raises HTTP 400 for anything else"""
+    try:
+        created_at, row_id = decode_values(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def keyset_paginate(stmt: Select, created_at_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """Order newest first, resume after `cursor` and fetch limit + 1 rows"""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # The plain created_at bound is implied by the tuple comparison, but the
+        # planner only prunes partitions (and seeks indexes) on simple predicates
+        stmt = stmt.where(
+            created_at_column <= created_at,
+            tuple_(created_at_column, id_column) < tuple_(created_at, row_id)
+        )
+    return stmt.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def finish_page(rows: Sequence[T], limit: int, response: Response) -> List[T]:
+    """Trim the look-ahead row and set X-Next-Cursor when there is another page"""
+    page = list(rows[:limit])
+    if len(rows) > limit and page:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return page
@@ -1,19 +1,118 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    PoolMetrics,
+    instrument_engine,
+)
+from app.db.query_stats import instrument_queries
+from app.db.replicas import RecentWrites, Replica, ReplicaRouter
 
-engine = create_engine(settings.DATABASE_URL)
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)"""
+    if url.startswith(("postgresql://", "postgres://")):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+def pool_options(url: str, async_engine: bool = False) -> dict:
+    """Pool settings from DB_POOL_*; SQLite keeps SQLAlchemy's default pool"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+# Per-request statement counts (X-DB-Queries / X-DB-Time) for every engine
+instrument_queries()
+
+# Sync engine for schema management and scripts; request handling uses the async engine
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, async_engine=True)
+)
+# expire_on_commit=False: attributes stay readable after commit without an implicit (blocking) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# Pool metrics per engine, exposed on GET /internal/metrics
+pool_metrics = {
+    "api": instrument_engine(async_engine.sync_engine, PoolMetrics("api", settings.DB_POOL_WAIT_WARN_MS)),
+    "sync": instrument_engine(engine, PoolMetrics("sync", settings.DB_POOL_WAIT_WARN_MS)),
+}
+
+# Read replicas (see app.db.replicas); empty unless DATABASE_REPLICA_URLS is set
+replicas = []
+for index, url in enumerate(settings.database_replica_urls_list, start=1):
+    replica_engine = create_async_engine(async_database_url(url), **pool_options(url, async_engine=True))
+    replicas.append(Replica.for_engine(f"replica{index}", replica_engine))
+    pool_metrics[f"replica{index}"] = instrument_engine(
+        replica_engine.sync_engine, PoolMetrics(f"replica{index}", settings.DB_POOL_WAIT_WARN_MS)
+    )
+replica_router = ReplicaRouter(replicas, settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_INTERVAL)
+# Scan ids created by this process recently; reads of these stay on the primary
+recent_scan_writes = RecentWrites(settings.REPLICA_STICKY_SECONDS)
+
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+
+async def get_read_sessionmaker():
+    """
+    Session factory for read-only work that outlives the endpoint (a streamed
+    response body opens its own session with it): a healthy replica's when
+    there is one, else the primary's
+    """
+    replica = await replica_router.choose()
+    return replica.sessionmaker if replica else AsyncSessionLocal
+
+
+async def get_read_db():
+    """Session for read-only endpoints: a healthy replica when there is one, else the primary"""
+    async with (await get_read_sessionmaker())() as db:
+        yield db
+
+
+async def get_scan_read_db(scan_id: int):
+    """get_read_db, except a scan this process just created is read from the primary"""
+    if scan_id in recent_scan_writes:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    async for db in get_read_db():
+        yield db
+
+
+async def read_or_primary(db: AsyncSession, load, *args):
+    """
+    Run `load(db, *args)`; when it finds nothing on a replica, run it again on the primary.
+    
+    Covers rows written moments ago (possibly by another process) that the replica hasn't replayed yet.
+    """
+    result = await load(db, *args)
+    if result is None and db.info.get("replica"):
+        async with AsyncSessionLocal() as primary:
+            result = await load(primary, *args)
+    return result
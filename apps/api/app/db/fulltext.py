@@ -0,0 +1,93 @@
+"""
+Full-text search indexes over findings and sites.
+
+On Postgres each table gets a stored generated tsvector column,
+search_vector, with a GIN index, so the index is current after every
+write without triggers or application code. Findings use the english
+configuration (stemming, stop words). Sites use 'simple' over the domain,
+the domain split at dots and dashes, and the display name, so "example"
+finds www.example.com.
+
+SQLite has no tsvector; there each table gets an external-content FTS5
+table (<table>_fts, porter stemming) kept in sync by insert, update and
+delete triggers.
+
+The DDL runs whenever create_all creates the tables (see register());
+migration 018 added it to existing databases (with its own frozen copy, so
+changing an index here needs a new migration).
+"""
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from sqlalchemy import Table, event
+
+
+@dataclass(frozen=True)
+class FullTextIndex:
+    table: str
+    columns: Tuple[str, ...]  # indexed text columns (the FTS5 table's columns)
+    pg_config: str
+    pg_document: str  # SQL expression the tsvector is built from
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+    def create_statements(self, dialect: str) -> List[str]:
+        if dialect == "postgresql":
+            return [
+                f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('{self.pg_config}', {self.pg_document})) STORED",
+                f"CREATE INDEX IF NOT EXISTS ix_{self.table}_search_vector ON {self.table} USING GIN (search_vector)",
+            ]
+        if dialect != "sqlite":
+            return []
+
+        columns = ", ".join(self.columns)
+        new = ", ".join(f"new.{column}" for column in self.columns)
+        old = ", ".join(f"old.{column}" for column in self.columns)
+        delete_old = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+        )
+        insert_new = f"INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"{columns}, content='{self.table}', content_rowid='id', tokenize='porter unicode61')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_insert AFTER INSERT ON {self.table} BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_delete AFTER DELETE ON {self.table} BEGIN {delete_old} END",
+            # Only when indexed text changes (sites are updated with every scan)
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts_table}_update AFTER UPDATE OF {columns} ON {self.table} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+
+    def drop_statements(self, dialect: str) -> List[str]:
+        # The Postgres column and index go with the table; the FTS5 table outlives it
+        return [f"DROP TABLE IF EXISTS {self.fts_table}"] if dialect == "sqlite" else []
+
+
+FINDINGS_INDEX = FullTextIndex(
+    table="findings",
+    columns=("title", "description", "recommendation"),
+    pg_config="english",
+    pg_document="coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(recommendation, '')",
+)
+
+SITES_INDEX = FullTextIndex(
+    table="sites",
+    columns=("domain", "display_name"),
+    pg_config="simple",
+    pg_document="domain || ' ' || translate(domain, '.-', '  ') || ' ' || coalesce(display_name, '')",
+)
+
+
+def register(table: Table, index: FullTextIndex) -> None:
+    """Create/drop `index` whenever metadata.create_all/drop_all creates/drops `table`"""
+    @event.listens_for(table, "after_create")
+    def _create(target, connection, **kw):
+        for statement in index.create_statements(connection.dialect.name):
+            connection.exec_driver_sql(statement)
+
+    @event.listens_for(table, "before_drop")
+    def _drop(target, connection, **kw):
+        for statement in index.drop_statements(connection.dialect.name):
+            connection.exec_driver_sql(statement)
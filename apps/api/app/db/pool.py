@@ -0,0 +1,150 @@
+"""
+Connection pool instrumentation.
+
+The API (async) and script (sync) engines use QueuePool subclasses that
+time every checkout, so pool saturation shows up as wait time and overflow
+events instead of as unexplained request latency. Counts come from pool
+events; see GET /internal/metrics.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.metrics import Histogram
+
+
+class PoolMetrics:
+    """Checkout counts, wait-time histogram and overflow events for one engine's pool"""
+
+    WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+    WARN_INTERVAL = 10.0  # seconds between repeated slow-checkout warnings
+
+    def __init__(self, name: str, warn_threshold_ms: float):
+        self.name = name
+        self.warn_threshold_ms = warn_threshold_ms
+        self.wait_ms = Histogram(self.WAIT_BUCKETS_MS)
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.connections_opened = 0
+        self.invalidations = 0
+        self.overflow_events = 0
+        self.checkout_timeouts = 0
+        self.slow_checkouts = 0
+        self.pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self._last_warning = 0.0
+        self._suppressed = 0
+
+    def record_checkout_wait(self, wait_ms: float, overflowed: bool) -> None:
+        with self._lock:
+            self.wait_ms.observe(wait_ms)
+            if overflowed:
+                self.overflow_events += 1
+            if wait_ms < self.warn_threshold_ms:
+                return
+            self.slow_checkouts += 1
+            now = time.monotonic()
+            if now - self._last_warning < self.WARN_INTERVAL:
+                self._suppressed += 1
+                return
+            suppressed, self._suppressed = self._suppressed, 0
+            self._last_warning = now
+
+        extra = f" ({suppressed} more since last warning)" if suppressed else ""
+        print(
+            f"Warning: {self.name} DB pool checkout waited {wait_ms:.0f}ms "
+            f"(threshold {self.warn_threshold_ms:.0f}ms, {self.checked_out} checked out){extra}"
+        )
+
+    def snapshot(self) -> Dict[str, object]:
+        pool = self.pool
+        status = {}
+        if isinstance(pool, QueuePool):
+            status = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        return {
+            "pool": type(pool).__name__ if pool is not None else None,
+            **status,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "connections_opened": self.connections_opened,
+            "invalidations": self.invalidations,
+            "overflow_events": self.overflow_events,
+            "checkout_timeouts": self.checkout_timeouts,
+            "slow_checkouts": self.slow_checkouts,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+
+class _TimedCheckoutMixin:
+    """Times QueuePool._do_get, which is where callers block when the pool is exhausted"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            if self.metrics:
+                overflowed = self._overflow > overflow_before and self._overflow > 0
+                self.metrics.record_checkout_wait((time.perf_counter() - start) * 1000, overflowed)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine: Engine, metrics: PoolMetrics) -> PoolMetrics:
+    """Attach pool event listeners (and checkout timing when the pool supports it)"""
+    metrics.pool = engine.pool
+    if isinstance(engine.pool, _TimedCheckoutMixin):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connections_opened += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics._lock:
+            metrics.checked_out += 1
+            metrics.peak_checked_out = max(metrics.peak_checked_out, metrics.checked_out)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.checked_out = max(metrics.checked_out - 1, 0)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    return metrics
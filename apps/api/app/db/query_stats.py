@@ -0,0 +1,118 @@
+"""
+Per-request SQL statement counts and database time.
+
+Cursor execute events on every engine are attributed to the request being
+served (tracked in a context variable, which SQLAlchemy carries into the
+greenlets its async engines run statements in). QueryStatsMiddleware
+reports the totals as X-DB-Queries / X-DB-Time (milliseconds) response
+headers and warns about requests over DB_REQUEST_QUERY_WARN statements or
+DB_REQUEST_TIME_WARN_MS of database time, which is how N+1 loops show up.
+
+Statements are also aggregated by fingerprint in the slow query log
+(app.db.slow_queries).
+
+Tests use capture_queries() (via the `query_budget` fixture) to pin how
+many statements an endpoint may issue.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.slow_queries import query_log
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+QUERY_TIME_HEADER = "X-DB-Time"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    time_ms: float = 0.0
+    keep_statements: bool = False
+    statements: List[str] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.time_ms += elapsed_ms
+        if self.keep_statements:
+            self.statements.append(statement)
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+# Process-wide captures (tests); these see statements from every thread and task
+_captures: List[QueryStats] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    elapsed_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    for capture in _captures:
+        capture.record(statement, elapsed_ms)
+    query_log.record(statement, parameters, elapsed_ms, conn.dialect.paramstyle, executemany)
+
+
+def instrument_queries() -> None:
+    """Count statements on every engine, including ones created later (idempotent)"""
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect every statement executed in this process while the block runs"""
+    stats = QueryStats(keep_statements=True)
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+class QueryStatsMiddleware:
+    """Add X-DB-Queries / X-DB-Time headers and warn about query-heavy requests"""
+
+    def __init__(self, app, query_warn: Optional[int] = None, time_warn_ms: Optional[float] = None):
+        self.app = app
+        self.query_warn = settings.DB_REQUEST_QUERY_WARN if query_warn is None else query_warn
+        self.time_warn_ms = settings.DB_REQUEST_TIME_WARN_MS if time_warn_ms is None else time_warn_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                headers.append((QUERY_TIME_HEADER.lower().encode(), f"{stats.time_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
+            if stats.count > self.query_warn or stats.time_ms > self.time_warn_ms:
+                print(
+                    f"Warning: {scope['method']} {scope['path']} ran {stats.count} queries "
+                    f"in {stats.time_ms:.0f}ms (thresholds {self.query_warn} queries, {self.time_warn_ms:.0f}ms)"
+                )
@@ -0,0 +1,137 @@
+"""
+Read replica routing.
+
+Read-only endpoints take their session from get_read_db instead of get_db.
+When DATABASE_REPLICA_URLS is set, those sessions go to a replica chosen
+round-robin among the ones whose replay lag is under
+REPLICA_MAX_LAG_SECONDS. Lag is measured at most once every
+REPLICA_LAG_CHECK_INTERVAL seconds per replica; a replica that can't be
+reached counts as lagging until its next check. With no replica
+configured, or none healthy, reads go to the primary.
+
+Read-your-writes: a client that has just created a scan reads it back
+straight away, before a replica may have replayed it. create_scan marks
+the new scan id in RecentWrites for REPLICA_STICKY_SECONDS and reads of a
+marked id stay on the primary. Marks are per process, so lookups that find
+nothing on a replica are also retried once on the primary.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Zero when the replica has replayed everything it has received, so an idle
+# primary doesn't make its replicas look stale
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker
+    lag_seconds: Optional[float] = None  # None until checked, or when the last check failed
+    checked_at: float = 0.0  # time.monotonic() of the last check
+    error: Optional[str] = None
+
+    @classmethod
+    def for_engine(cls, name: str, engine: AsyncEngine) -> "Replica":
+        sessions = async_sessionmaker(
+            engine, class_=AsyncSession, autoflush=False, expire_on_commit=False, info={"replica": name}
+        )
+        return cls(name=name, engine=engine, sessionmaker=sessions)
+
+
+class ReplicaRouter:
+    """Pick a replica that is caught up enough to serve a read, or None for the primary"""
+
+    CHECK_TIMEOUT = 2.0  # seconds; a slower lag check marks the replica unhealthy
+
+    def __init__(self, replicas: List[Replica], max_lag_seconds: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._next = itertools.count()
+        self.replica_reads = 0
+        self.primary_fallbacks = 0  # reads sent to the primary because no replica was healthy
+
+    async def measure_lag(self, replica: Replica) -> float:
+        """Seconds of replay lag on `replica` (0 for databases without streaming replication)"""
+        async with replica.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float(await conn.scalar(REPLICA_LAG_SQL))
+
+    async def refresh(self, replica: Replica) -> None:
+        replica.checked_at = time.monotonic()  # set first so concurrent requests don't all re-check
+        try:
+            replica.lag_seconds = await asyncio.wait_for(self.measure_lag(replica), self.CHECK_TIMEOUT)
+            replica.error = None
+        except Exception as e:
+            if replica.error is None:
+                print(f"Warning: read replica {replica.name} unavailable, reading from primary: {e!r}")
+            replica.lag_seconds = None
+            replica.error = repr(e)
+
+    def is_healthy(self, replica: Replica) -> bool:
+        return replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds
+
+    async def choose(self) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if time.monotonic() - replica.checked_at >= self.check_interval:
+                await self.refresh(replica)
+            if self.is_healthy(replica):
+                self.replica_reads += 1
+                return replica
+        self.primary_fallbacks += 1
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": {
+                replica.name: {
+                    "healthy": self.is_healthy(replica),
+                    "lag_seconds": replica.lag_seconds,
+                    "error": replica.error,
+                }
+                for replica in self.replicas
+            },
+        }
+
+
+class RecentWrites:
+    """Keys written by this process in the last `ttl` seconds"""
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: Hashable) -> None:
+        now = self.clock()
+        with self._lock:
+            self._expires[key] = now + self.ttl
+            if len(self._expires) > 1024:
+                self._expires = {k: expires for k, expires in self._expires.items() if expires > now}
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires = self._expires.get(key)
+        return expires is not None and expires > self.clock()
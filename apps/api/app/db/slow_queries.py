@@ -0,0 +1,162 @@
+"""
+In-process statement statistics and slow query log.
+
+Every statement the API runs is reduced to a fingerprint (literals and
+bind parameters replaced with `?`, IN lists and multi-row VALUES
+collapsed) and aggregated per fingerprint: count, total/max time and a
+sampled p95. The table is bounded at DB_QUERY_LOG_SIZE fingerprints; when
+it is full the one with the least total time makes room. Statements over
+DB_SLOW_QUERY_MS are logged and the slowest SELECT per fingerprint is kept
+with its parameters so it can be EXPLAINed later.
+
+Roughly pg_stat_statements for this process, for environments where that
+extension isn't available. See GET /internal/query-log.
+"""
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import LatencyReservoir
+
+SORT_KEYS = ("total_ms", "max_ms", "p95_ms", "count")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals stripped, so `id = 1` and `id = 2` aggregate together"""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_ROWS.sub(r"VALUES \1, ...", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class SlowSample:
+    statement: str
+    parameters: Any  # None unless the statement can be EXPLAINed (SELECTs only)
+    paramstyle: str
+    elapsed_ms: float
+    at: datetime
+
+
+@dataclass
+class FingerprintStats:
+    fingerprint: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_count: int = 0
+    slowest: Optional[SlowSample] = None
+    timings: LatencyReservoir = field(default_factory=lambda: LatencyReservoir(size=256))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p95_ms": round(self.timings.percentile(95) or 0.0, 2),
+            "max_ms": round(self.max_ms, 2),
+            "slow_count": self.slow_count,
+            "slowest_at": self.slowest.at.isoformat() if self.slowest else None,
+        }
+
+
+class QueryLog:
+    """Bounded per-fingerprint statement statistics"""
+
+    WARN_INTERVAL = 10.0  # seconds between repeated slow query warnings
+
+    def __init__(self, max_fingerprints: Optional[int] = None, slow_ms: Optional[float] = None):
+        self.max_fingerprints = max_fingerprints or settings.DB_QUERY_LOG_SIZE
+        self.slow_ms = settings.DB_SLOW_QUERY_MS if slow_ms is None else slow_ms
+        self.entries: Dict[str, FingerprintStats] = {}
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._last_warning = 0.0
+        self._suppressed = 0
+
+    def record(self, statement: str, parameters: Any, elapsed_ms: float, paramstyle: str, executemany: bool = False) -> None:
+        key = fingerprint(statement)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if len(self.entries) >= self.max_fingerprints:
+                    del self.entries[min(self.entries.values(), key=lambda e: e.total_ms).fingerprint]
+                    self.evicted += 1
+                entry = self.entries[key] = FingerprintStats(key)
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.timings.record(elapsed_ms)
+            if not slow:
+                return
+            entry.slow_count += 1
+            if entry.slowest is None or elapsed_ms > entry.slowest.elapsed_ms:
+                explainable = not executemany and _EXPLAINABLE.match(statement)
+                entry.slowest = SlowSample(
+                    statement=statement,
+                    parameters=parameters if explainable else None,
+                    paramstyle=paramstyle,
+                    elapsed_ms=elapsed_ms,
+                    at=datetime.now(timezone.utc)
+                )
+            now = time.monotonic()
+            if now - self._last_warning < self.WARN_INTERVAL:
+                self._suppressed += 1
+                return
+            suppressed, self._suppressed = self._suppressed, 0
+            self._last_warning = now
+
+        extra = f" ({suppressed} more since last warning)" if suppressed else ""
+        print(f"Warning: slow query ({elapsed_ms:.0f}ms, threshold {self.slow_ms:.0f}ms): {key[:500]}{extra}")
+
+    def top(self, sort: str = "total_ms", limit: int = 25) -> List[FingerprintStats]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+        with self._lock:
+            entries = list(self.entries.values())
+        if sort == "p95_ms":
+            return sorted(entries, key=lambda e: e.timings.percentile(95) or 0.0, reverse=True)[:limit]
+        return sorted(entries, key=lambda e: getattr(e, sort), reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.evicted = 0
+
+    @staticmethod
+    async def explain(db: AsyncSession, sample: SlowSample) -> List[str]:
+        """Query plan for a captured sample (plain EXPLAIN; the statement isn't run)"""
+        if sample.parameters is None:
+            raise ValueError("only SELECT samples are kept for EXPLAIN")
+        conn = await db.connection()
+        if conn.dialect.paramstyle != sample.paramstyle:
+            raise ValueError("sample was captured through a different driver")
+        prefix = "EXPLAIN " if conn.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+        try:
+            result = await conn.exec_driver_sql(prefix + sample.statement, sample.parameters)
+            return [str(row[-1]) for row in result]
+        finally:
+            await db.rollback()
+
+
+query_log = QueryLog()
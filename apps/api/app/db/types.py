@@ -0,0 +1,38 @@
+"""
+Dialect-aware column types.
+
+Postgres gets JSONB, so documents are stored parsed, can be indexed with
+GIN and queried with containment (@>). SQLite and anything else fall back
+to the generic JSON type. Either way the ORM hands back Python lists and
+dicts, never JSON strings.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import JSON, and_, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+def json_contains(column, document: Dict[str, Any], dialect_name: str) -> ColumnElement:
+    """
+    Match rows whose JSON document contains every top-level key/value in `document`.
+    
+    On Postgres this is `column @> document`, which a GIN (jsonb_path_ops)
+    index can answer; elsewhere it compares the extracted values one by one.
+    """
+    if dialect_name == "postgresql":
+        return column.op("@>")(cast(document, JSONB))
+    
+    clauses = []
+    for key, value in document.items():
+        if isinstance(value, bool):
+            clauses.append(column[key].as_boolean() == value)
+        elif isinstance(value, int):
+            clauses.append(column[key].as_integer() == value)
+        elif isinstance(value, float):
+            clauses.append(column[key].as_float() == value)
+        else:
+            clauses.append(column[key].as_string() == value)
+    return and_(*clauses)
@@ -6,6 +6,11 @@ from app.models.shared_report_link import SharedReportLink
 from app.models.site import Site
 from app.models.monitoring_config import MonitoringConfig, MonitoringFrequency
 from app.models.alert import Alert, AlertType
+from app.models.blob import Blob
+from app.models.scan_job import ScanJob, ScanJobStatus
+from app.models.scan_worker import ScanWorker
+from app.models.scan_rollup import ScanRollup, RollupGranularity
+from app.models.materialized_view_refresh import MaterializedViewRefresh
 
-__all__ = ["User", "Scan", "Finding", "BrandProfile", "SharedReportLink", "Site", "MonitoringConfig", "MonitoringFrequency", "Alert", "AlertType"]
+__all__ = ["User", "Scan", "Finding", "BrandProfile", "SharedReportLink", "Site", "MonitoringConfig", "MonitoringFrequency", "Alert", "AlertType", "Blob", "ScanJob", "ScanJobStatus", "ScanWorker", "ScanRollup", "RollupGranularity", "MaterializedViewRefresh"]
 
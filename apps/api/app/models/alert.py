@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,4 +23,17 @@ class Alert(Base):
     
     site = relationship("Site", back_populates="alerts")
     scan = relationship("Scan", back_populates="alerts")
+    
+    # Keyset pagination on (created_at, id), optionally by alert type. The
+    # feed index is newest-first and carries the join/grouping columns so
+    # Postgres can walk it without visiting the heap for anything but message.
+    __table_args__ = (
+        Index(
+            "ix_alerts_created_at_desc_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_include=["site_id", "scan_id", "alert_type"]
+        ),
+        Index("ix_alerts_type_created_at_id", "alert_type", "created_at", "id"),
+    )
 
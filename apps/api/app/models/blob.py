@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    
+    sha256 = Column(String(64), primary_key=True)  # Hex digest of the uncompressed bytes
+    compression = Column(String(16), nullable=False)  # "gzip", "zstd" or "identity"
+    size = Column(Integer, nullable=False)  # Uncompressed size in bytes
+    stored_size = Column(Integer, nullable=False)  # Compressed size in bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -8,10 +9,14 @@ class BrandProfile(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    logo_base64 = Column(Text, nullable=True)  # Base64 encoded image
+    # Logo bytes live in the blob store (deduplicated); served by GET /brands/{id}/logo
+    logo_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True)
+    logo_content_type = Column(String(64), nullable=True)
     primary_color = Column(String, nullable=False, default="#2563eb")  # Hex color
     accent_color = Column(String, nullable=False, default="#10b981")  # Hex color
     footer_text = Column(Text, nullable=True)
     is_default = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-
+    
+    # Never loaded implicitly so listings can't pull image bytes; use selectinload(BrandProfile.logo)
+    logo = relationship("Blob", lazy="raise")
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 import enum
 from app.db.database import Base
+from app.db.fulltext import FINDINGS_INDEX, register as register_fulltext
 
 
 class FindingCategory(str, enum.Enum):
@@ -29,6 +31,10 @@ class Finding(Base):
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     recommendation = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # Partition key on Postgres
     
     scan = relationship("Scan", back_populates="findings")
 
+
+# search_vector (Postgres) / findings_fts (SQLite), see app.db.fulltext
+register_fulltext(Finding.__table__, FINDINGS_INDEX)
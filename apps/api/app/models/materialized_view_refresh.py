@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime, Float
+from app.db.database import Base
+
+
+class MaterializedViewRefresh(Base):
+    """When a set of precomputed aggregate views was last refreshed, and how long that took"""
+    __tablename__ = "materialized_view_refreshes"
+    
+    name = Column(String, primary_key=True)  # e.g. "portfolio_stats" (see app.services.portfolio_stats)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+    duration_ms = Column(Float, nullable=False)
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum as SQLEnum, JSON, Text
-from sqlalchemy.dialects.postgresql import JSON as PostgresJSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from app.db.database import Base
+from app.db.types import JSONDocument
 
 
 class RiskLevel(str, enum.Enum):
@@ -23,15 +23,44 @@ class Scan(Base):
     url = Column(String, nullable=False, index=True)
     normalized_url = Column(String, nullable=True)
     final_url = Column(String, nullable=True)
-    redirect_chain = Column(Text, nullable=True)  # List of URLs (stored as JSON string for SQLite compatibility)
+    redirect_chain = Column(JSONDocument, nullable=True)  # List of URLs
     response_status = Column(Integer, nullable=True)
+    scan_metadata = Column(JSONDocument, nullable=True)  # final_host, hop_count, hops, timings
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     overall_score = Column(Float, nullable=True)
     risk_level = Column(SQLEnum(RiskLevel), nullable=True)
+    response_headers_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True)  # Raw headers (canonical JSON)
+    response_body_sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True)  # Raw body (UTF-8)
     
     user = relationship("User", back_populates="scans")
     site = relationship("Site", back_populates="scans")
     findings = relationship("Finding", back_populates="scan", cascade="all, delete-orphan")
     shared_links = relationship("SharedReportLink", back_populates="scan", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="scan", cascade="all, delete-orphan")
+    
+    # Keyset pagination of a site's scans on (created_at, id), optionally by risk level
+    __table_args__ = (
+        Index("ix_scans_site_created_at_id", "site_id", "created_at", "id"),
+        Index("ix_scans_site_risk_created_at_id", "site_id", "risk_level", "created_at", "id"),
+        # Containment queries on metadata, e.g. by final host or hop count
+        Index(
+            "ix_scans_scan_metadata",
+            "scan_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"scan_metadata": "jsonb_path_ops"}
+        ),
+        # Orphan checks when retention deletes blobs (and Postgres's foreign key checks on those deletes)
+        Index(
+            "ix_scans_response_headers_sha256",
+            "response_headers_sha256",
+            postgresql_where=response_headers_sha256.is_not(None),
+            sqlite_where=response_headers_sha256.is_not(None)
+        ),
+        Index(
+            "ix_scans_response_body_sha256",
+            "response_body_sha256",
+            postgresql_where=response_body_sha256.is_not(None),
+            sqlite_where=response_body_sha256.is_not(None)
+        ),
+    )
 
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+import enum
+from app.db.database import Base
+
+
+class ScanJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ScanJob(Base):
+    __tablename__ = "scan_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, nullable=False)
+    host = Column(String, nullable=False)
+    host_hash = Column(BigInteger, nullable=False)  # Position on the worker hash ring (0..2^32-1)
+    priority = Column(String, nullable=False, default="bulk")  # ScanPriority value
+    status = Column(SQLEnum(ScanJobStatus), nullable=False, default=ScanJobStatus.PENDING)
+    site_id = Column(Integer, ForeignKey("sites.id"), nullable=True)
+    monitoring_config_id = Column(Integer, ForeignKey("monitoring_configs.id"), nullable=True)
+    scan_id = Column(Integer, ForeignKey("scans.id"), nullable=True)
+    worker_id = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_scan_jobs_status_host_hash", "status", "host_hash"),
+    )
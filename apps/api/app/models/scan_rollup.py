@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+from app.db.database import Base
+
+
+class RollupGranularity(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class ScanRollup(Base):
+    """
+    Score and finding-severity totals for a site's scans over one day, week or month.
+    
+    Maintained as each scan is written (app.services.rollups) and outlives the
+    scans themselves once retention compacts them. Everything is stored as
+    sums/extremes so adding a scan is a single upsert.
+    """
+    __tablename__ = "scan_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    site_id = Column(Integer, ForeignKey("sites.id"), nullable=False)
+    granularity = Column(SQLEnum(RollupGranularity), nullable=False)
+    period_start = Column(DateTime(timezone=True), nullable=False)  # midnight UTC; Monday / 1st for weekly / monthly
+    scan_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)  # scans with an overall_score
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_min = Column(Float, nullable=True)
+    score_max = Column(Float, nullable=True)
+    critical_count = Column(Integer, nullable=False, default=0)
+    high_count = Column(Integer, nullable=False, default=0)
+    medium_count = Column(Integer, nullable=False, default=0)
+    low_count = Column(Integer, nullable=False, default=0)
+    info_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    site = relationship("Site")
+    
+    # Also the index history reads use: one site, one granularity, a period_start range
+    __table_args__ = (
+        UniqueConstraint("site_id", "granularity", "period_start", name="uq_scan_rollups_site_period"),
+    )
+    
+    @property
+    def score_avg(self):
+        return round(self.score_sum / self.scored_count, 1) if self.scored_count else None
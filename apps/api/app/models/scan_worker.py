@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class ScanWorker(Base):
+    __tablename__ = "scan_workers"
+    
+    id = Column(String, primary_key=True)  # hostname:pid:random suffix
+    hostname = Column(String, nullable=False)
+    pid = Column(Integer, nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    scans_completed = Column(Integer, nullable=False, default=0)
+    scans_failed = Column(Integer, nullable=False, default=0)
+    scans_per_minute = Column(Float, nullable=False, default=0.0)  # Over the last heartbeat window
+    owned_fraction = Column(Float, nullable=False, default=0.0)  # Share of the hash ring this worker owns
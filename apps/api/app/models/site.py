@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Float, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.fulltext import SITES_INDEX, register as register_fulltext
+from app.models.scan import RiskLevel
 
 
 class Site(Base):
@@ -12,7 +14,26 @@ class Site(Base):
     display_name = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Latest scan summary, denormalized so listing sites needs no per-site scan lookup.
+    # Kept current by record_latest_scan() in the same transaction that stores a scan.
+    latest_scan_id = Column(Integer, nullable=True)  # no FK: scans already reference sites
+    latest_scan_score = Column(Float, nullable=True)
+    latest_scan_risk_level = Column(SQLEnum(RiskLevel), nullable=True)
+    latest_scan_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Name of a policy in app.services.retention.RETENTION_POLICIES; NULL uses RETENTION_DEFAULT_POLICY
+    retention_policy = Column(String, nullable=True)
+    
     scans = relationship("Scan", back_populates="site", cascade="all, delete-orphan")
     monitoring_config = relationship("MonitoringConfig", back_populates="site", uselist=False, cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="site", cascade="all, delete-orphan")
+    
+    # Keyset pagination on (created_at, id), optionally filtered by latest risk level
+    __table_args__ = (
+        Index("ix_sites_created_at_id", "created_at", "id"),
+        Index("ix_sites_latest_risk_created_at_id", "latest_scan_risk_level", "created_at", "id"),
+    )
+
 
+# search_vector (Postgres) / sites_fts (SQLite), see app.db.fulltext
+register_fulltext(Site.__table__, SITES_INDEX)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, computed_field, field_validator
 from typing import Optional
 from datetime import datetime
 import re
@@ -6,7 +6,7 @@ import re
 
 class BrandProfileCreate(BaseModel):
     name: str
-    logo_base64: Optional[str] = None
+    logo_base64: Optional[str] = None  # raw base64 or a data: URI; stored decoded
     primary_color: str = "#2563eb"
     accent_color: str = "#10b981"
     footer_text: Optional[str] = None
@@ -32,13 +32,19 @@ class BrandProfileCreate(BaseModel):
 class BrandProfileResponse(BaseModel):
     id: int
     name: str
-    logo_base64: Optional[str] = None
+    logo_sha256: Optional[str] = None
     primary_color: str
     accent_color: str
     footer_text: Optional[str] = None
     is_default: bool
     created_at: datetime
     
+    @computed_field
+    @property
+    def logo_url(self) -> Optional[str]:
+        """Path of the logo image; the version parameter changes whenever the logo does"""
+        return f"/brands/{self.id}/logo?v={self.logo_sha256[:16]}" if self.logo_sha256 else None
+    
     class Config:
         from_attributes = True
 
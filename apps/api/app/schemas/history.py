@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+import enum
+
+
+class HistoryBucket(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class ScoreHistoryPoint(BaseModel):
+    """Scores and finding counts for one site over one bucket"""
+    period_start: datetime
+    scan_count: int
+    score_min: Optional[float] = None
+    score_max: Optional[float] = None
+    score_avg: Optional[float] = None
+    critical_count: int
+    high_count: int
+    medium_count: int
+    low_count: int
+    info_count: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ScoreHistoryResponse(BaseModel):
+    site_id: int
+    bucket: HistoryBucket
+    points: List[ScoreHistoryPoint]
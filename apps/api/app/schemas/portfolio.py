@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class PortfolioFinding(BaseModel):
+    """A finding on the latest scan of one or more sites"""
+    title: str
+    severity: str
+    category: str
+    site_count: int
+    finding_count: int
+
+
+class PortfolioStatsResponse(BaseModel):
+    total_sites: int
+    scanned_sites: int
+    average_score: Optional[float] = None  # over each site's latest scored scan
+    sites_by_risk_level: Dict[str, int]  # latest-scan risk level, plus "unscanned"
+    top_findings: List[PortfolioFinding]
+    refreshed_at: Optional[datetime] = None  # None until the aggregates are first computed
+    refresh_duration_ms: Optional[float] = None
+    staleness_seconds: Optional[float] = None
+    refresh_scheduled: bool = False
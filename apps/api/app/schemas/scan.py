@@ -25,22 +25,24 @@ class ScanSchema(BaseModel):
     final_url: Optional[str] = None
     redirect_chain: Optional[List[str]] = None
     response_status: Optional[int] = None
+    scan_metadata: Optional[Dict] = None
     created_at: datetime
     overall_score: Optional[float] = None
     risk_level: Optional[RiskLevel] = None
     findings: List[FindingSchema] = []
     
-    @classmethod
-    def from_orm(cls, obj):
-        """Custom from_orm to handle redirect_chain JSON string"""
-        import json
-        data = super().from_orm(obj)
-        if isinstance(data.redirect_chain, str):
-            try:
-                data.redirect_chain = json.loads(data.redirect_chain)
-            except:
-                data.redirect_chain = None
-        return data
+    class Config:
+        from_attributes = True
+
+
+class ScanMetadataMatch(BaseModel):
+    """A scan found by a metadata query"""
+    id: int
+    site_id: Optional[int] = None
+    url: str
+    final_url: Optional[str] = None
+    created_at: datetime
+    scan_metadata: Optional[Dict] = None
     
     class Config:
         from_attributes = True
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
+from datetime import datetime
+
+
+class ScanJobEnqueueRequest(BaseModel):
+    urls: List[str]
+    priority: str = "bulk"
+    
+    @field_validator('priority')
+    @classmethod
+    def validate_priority(cls, v: str) -> str:
+        if v not in ("interactive", "monitoring", "bulk"):
+            raise ValueError("priority must be one of: interactive, monitoring, bulk")
+        return v
+
+
+class ScanWorkerResponse(BaseModel):
+    id: str
+    hostname: str
+    pid: int
+    started_at: Optional[datetime] = None
+    heartbeat_at: datetime
+    live: bool
+    scans_completed: int
+    scans_failed: int
+    scans_per_minute: float
+    owned_fraction: float
+    
+    class Config:
+        from_attributes = True
+
+
+class ScanWorkersOverview(BaseModel):
+    workers: List[ScanWorkerResponse]
+    queue: dict
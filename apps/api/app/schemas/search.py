@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+import enum
+
+
+class SearchHitKind(str, enum.Enum):
+    FINDING = "finding"
+    SITE = "site"
+
+
+class SearchHit(BaseModel):
+    """A finding or site matching the query; higher rank is a better match"""
+    kind: SearchHitKind
+    id: int
+    rank: float
+    site_id: Optional[int] = None  # None for a finding of a scan without a site (history searches)
+    domain: Optional[str] = None
+    scan_id: Optional[int] = None
+    title: str  # finding title, or the site's display name
+    severity: Optional[str] = None
+    description: Optional[str] = None
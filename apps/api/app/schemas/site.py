@@ -61,3 +61,15 @@ class SiteListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class SiteRetentionUpdate(BaseModel):
+    """Retention policy name (see app.services.retention); null reverts to the default"""
+    policy: Optional[str] = None
+
+
+class SiteRetentionResponse(BaseModel):
+    site_id: int
+    retention_policy: str
+    full_detail_days: Optional[int] = None
+    daily_rollup_days: Optional[int] = None
@@ -0,0 +1,296 @@
+"""
+Incremental columnar export of scans and findings for analytics.
+
+Writes Hive-style partitioned Parquet (or Arrow IPC) files under a local
+directory, ready for pyarrow.dataset, pandas, DuckDB or Spark:
+
+    <output>/scans/month=2026-10/part-<run>-<n>.parquet
+    <output>/findings/month=2026-10/category=security/part-<run>-<n>.parquet
+
+Rows are read with a server-side cursor (yield_per) and written out one
+row group at a time, so memory is bounded by the row group size times the
+number of open partition files (at most MAX_OPEN_FILES, least recently
+used closed first), not by the number of rows exported.
+
+Each run only exports scans with an id above the watermark saved by the
+previous one (<output>/_export_state.json), plus the findings of those
+scans (findings are written together with their scan and never later).
+Scans younger than `settle_seconds` are left for the next run, so a row
+whose transaction hasn't committed yet can't be skipped over; the settle
+time must exceed the longest scan-writing transaction. Files are written
+under a .tmp name and renamed before the watermark advances; an
+interrupted run leaves the watermark alone and its .tmp files are
+removed by the next run.
+"""
+import json
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import AsyncSessionLocal
+from app.models.finding import Finding
+from app.models.scan import Scan
+
+STATE_FILE = "_export_state.json"
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MAX_OPEN_FILES = 64
+
+SCAN_COLUMNS = [
+    Scan.id, Scan.site_id, Scan.user_id, Scan.url, Scan.normalized_url, Scan.final_url,
+    Scan.response_status, Scan.overall_score, Scan.risk_level, Scan.scan_metadata, Scan.created_at,
+]
+FINDING_COLUMNS = [
+    Finding.id, Finding.scan_id, Scan.site_id, Finding.category, Finding.severity,
+    Finding.title, Finding.description, Finding.recommendation, Scan.created_at.label("scan_created_at"),
+]
+
+
+def _schemas():
+    timestamp = pa.timestamp("us", tz="UTC")
+    scans = pa.schema([
+        ("id", pa.int64()), ("site_id", pa.int64()), ("user_id", pa.int64()),
+        ("url", pa.string()), ("normalized_url", pa.string()), ("final_url", pa.string()),
+        ("response_status", pa.int32()), ("overall_score", pa.float64()), ("risk_level", pa.string()),
+        ("scan_metadata", pa.string()),  # JSON text
+        ("created_at", timestamp),
+    ])
+    findings = pa.schema([
+        ("id", pa.int64()), ("scan_id", pa.int64()), ("site_id", pa.int64()),
+        ("category", pa.string()), ("severity", pa.string()),
+        ("title", pa.string()), ("description", pa.string()), ("recommendation", pa.string()),
+        ("scan_created_at", timestamp),
+    ])
+    return scans, findings
+
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+    return moment
+
+
+def _month(moment: Optional[datetime]) -> str:
+    return f"{moment:%Y-%m}" if moment is not None else "unknown"
+
+
+@dataclass
+class ExportReport:
+    from_scan_id: int
+    to_scan_id: int
+    scans: int = 0
+    findings: int = 0
+    files: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class PartitionedWriter:
+    """Buffers rows per partition and writes them to that partition's file a row group at a time"""
+
+    def __init__(self, root: str, schema, file_format: str, run_id: str, row_group_size: int):
+        self.root = root
+        self.schema = schema
+        self.file_format = file_format
+        self.run_id = run_id
+        self.row_group_size = row_group_size
+        self.buffers: Dict[Tuple[str, ...], Dict[str, list]] = {}
+        self.writers: "OrderedDict[Tuple[str, ...], Tuple[object, str]]" = OrderedDict()
+        self.finished: List[str] = []  # .tmp paths of closed files
+        self._sequence = 0
+
+    def add(self, partition: Tuple[Tuple[str, str], ...], row: Dict) -> None:
+        if partition not in self.buffers and len(self.buffers) >= MAX_OPEN_FILES:
+            self._write(next(iter(self.buffers)))  # bound buffered rows as well as open files
+        buffer = self.buffers.setdefault(partition, {name: [] for name in self.schema.names})
+        for name in self.schema.names:
+            buffer[name].append(row[name])
+        if len(buffer["id"]) >= self.row_group_size:
+            self._write(partition)
+
+    def _write(self, partition) -> None:
+        buffer = self.buffers.pop(partition, None)
+        if not buffer or not buffer["id"]:
+            return
+        table = pa.Table.from_pydict(buffer, schema=self.schema)
+        writer, _ = self._writer(partition)
+        writer.write_table(table)
+
+    def _writer(self, partition):
+        if partition in self.writers:
+            self.writers.move_to_end(partition)
+            return self.writers[partition]
+        if len(self.writers) >= MAX_OPEN_FILES:
+            self._close(next(iter(self.writers)))
+
+        directory = os.path.join(self.root, *(f"{key}={value}" for key, value in partition))
+        os.makedirs(directory, exist_ok=True)
+        self._sequence += 1
+        path = os.path.join(directory, f"part-{self.run_id}-{self._sequence:04d}{FORMATS[self.file_format]}.tmp")
+        if self.file_format == "parquet":
+            writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(path, self.schema)
+        self.writers[partition] = (writer, path)
+        return self.writers[partition]
+
+    def _close(self, partition) -> None:
+        writer, path = self.writers.pop(partition)
+        writer.close()
+        self.finished.append(path)
+
+    def close(self) -> List[str]:
+        """Write every buffered row and close all files; returns their .tmp paths"""
+        for partition in list(self.buffers):
+            self._write(partition)
+        for partition in list(self.writers):
+            self._close(partition)
+        return self.finished
+
+
+class AnalyticsExporter:
+    """Exports scans and findings newer than the saved watermark to partitioned columnar files"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        file_format: str = "parquet",
+        batch_size: int = 5000,
+        settle_seconds: int = 300,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unknown format '{file_format}'; use one of: {', '.join(FORMATS)}")
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+        self.session_factory = session_factory
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.output_dir, STATE_FILE)
+
+    def watermark(self) -> int:
+        """Highest scan id already exported (0 before the first run)"""
+        if not os.path.exists(self.state_path):
+            return 0
+        with open(self.state_path) as f:
+            return json.load(f).get("scan_id", 0)
+
+    def _save_watermark(self, scan_id: int) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"scan_id": scan_id, "exported_at": datetime.now(timezone.utc).isoformat()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _remove_stale_files(self) -> None:
+        """.tmp files left behind by an interrupted run"""
+        for directory, _, files in os.walk(self.output_dir):
+            for name in files:
+                if name.endswith(".tmp") and name != f"{STATE_FILE}.tmp":
+                    os.remove(os.path.join(directory, name))
+
+    async def run(self, now: Optional[datetime] = None) -> ExportReport:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._remove_stale_files()
+
+        start = self.watermark()
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.settle_seconds)
+        run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        scan_schema, finding_schema = _schemas()
+        report = ExportReport(from_scan_id=start, to_scan_id=start)
+
+        async with self.session_factory() as db:
+            scans = PartitionedWriter(
+                os.path.join(self.output_dir, "scans"), scan_schema, self.file_format, run_id, self.batch_size
+            )
+            try:
+                await self._export_scans(db, scans, report, start, cutoff)
+            finally:
+                paths = scans.close()
+
+            findings = PartitionedWriter(
+                os.path.join(self.output_dir, "findings"), finding_schema, self.file_format, run_id, self.batch_size
+            )
+            try:
+                if report.to_scan_id > start:
+                    await self._export_findings(db, findings, report, start, report.to_scan_id)
+            finally:
+                paths += findings.close()
+
+        # Publish the files, then move the watermark past them
+        for path in paths:
+            final_path = path[:-len(".tmp")]
+            os.replace(path, final_path)
+            report.files.append(os.path.relpath(final_path, self.output_dir))
+        if report.to_scan_id > start:
+            self._save_watermark(report.to_scan_id)
+        return report
+
+    async def _export_scans(self, db: AsyncSession, writer: PartitionedWriter, report: ExportReport,
+                            start: int, cutoff: datetime) -> None:
+        stmt = (
+            select(*SCAN_COLUMNS)
+            .where(Scan.id > start)
+            .order_by(Scan.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            for row in rows:
+                created_at = _utc(row.created_at)
+                if created_at is not None and created_at > cutoff:
+                    # Stop at the first unsettled scan so no earlier id can still be uncommitted
+                    await result.close()
+                    return
+                writer.add((("month", _month(created_at)),), {
+                    "id": row.id,
+                    "site_id": row.site_id,
+                    "user_id": row.user_id,
+                    "url": row.url,
+                    "normalized_url": row.normalized_url,
+                    "final_url": row.final_url,
+                    "response_status": row.response_status,
+                    "overall_score": row.overall_score,
+                    "risk_level": row.risk_level.value if row.risk_level else None,
+                    "scan_metadata": json.dumps(row.scan_metadata) if row.scan_metadata is not None else None,
+                    "created_at": created_at,
+                })
+                report.scans += 1
+                report.to_scan_id = row.id
+
+    async def _export_findings(self, db: AsyncSession, writer: PartitionedWriter, report: ExportReport,
+                               start: int, end: int) -> None:
+        stmt = (
+            select(*FINDING_COLUMNS)
+            .join(Scan, Scan.id == Finding.scan_id)
+            .where(Finding.scan_id > start, Finding.scan_id <= end)
+            .order_by(Finding.scan_id, Finding.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            for row in rows:
+                scan_created_at = _utc(row.scan_created_at)
+                category = row.category.value
+                writer.add((("month", _month(scan_created_at)), ("category", category)), {
+                    "id": row.id,
+                    "scan_id": row.scan_id,
+                    "site_id": row.site_id,
+                    "category": category,
+                    "severity": row.severity.value,
+                    "title": row.title,
+                    "description": row.description,
+                    "recommendation": row.recommendation,
+                    "scan_created_at": scan_created_at,
+                })
+                report.findings += 1
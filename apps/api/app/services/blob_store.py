@@ -0,0 +1,155 @@
+"""
+Content-addressed blob storage for raw scan data.
+
+Blobs are keyed by the SHA-256 of their uncompressed bytes, so identical
+payloads (e.g. the same header set or homepage body across rescans) are
+stored exactly once. Data is compressed with gzip by default, or zstd when
+BLOB_COMPRESSION=zstd and the optional zstandard package is installed.
+
+Because blobs are shared, whoever deletes a referencing row (e.g. scan
+retention) hands the digests it dropped to delete_unreferenced(), which
+removes only the ones nothing else points at.
+"""
+import gzip
+import hashlib
+import json
+import zlib
+from typing import Collection, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.blob import Blob
+from app.models.brand_profile import BrandProfile
+from app.models.scan import Scan
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+# Every column that holds a blob digest
+BLOB_REFERENCES = (Scan.response_headers_sha256, Scan.response_body_sha256, BrandProfile.logo_sha256)
+
+
+class BlobStore:
+    """Store and retrieve deduplicated, compressed blobs"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, db: AsyncSession, compression: Optional[str] = None):
+        self.db = db
+        self.compression = compression or settings.BLOB_COMPRESSION
+        if self.compression == "zstd" and zstandard is None:
+            # Fall back rather than fail scans when the optional dependency is missing
+            self.compression = "gzip"
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """SHA-256 hex digest used as the blob key"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _compress(self, data: bytes) -> tuple[str, bytes]:
+        if self.compression == "zstd":
+            compressed = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=6)
+
+        # Already-compressed payloads (images, etc.) can grow; keep the smaller form
+        if len(compressed) >= len(data):
+            return "identity", data
+        return self.compression, compressed
+
+    async def put(self, data: bytes) -> str:
+        """Store data if not already present and return its digest"""
+        digest = self.digest(data)
+        # An existing blob is share-locked until the caller commits, so retention
+        # can't delete it before the row that will reference it is written
+        existing = select(Blob.sha256).where(Blob.sha256 == digest).with_for_update(read=True)
+
+        if await self.db.scalar(existing):
+            return digest
+
+        compression, stored = self._compress(data)
+        try:
+            # Savepoint so a concurrent insert of the same blob doesn't abort the caller's transaction
+            async with self.db.begin_nested():
+                self.db.add(Blob(
+                    sha256=digest,
+                    compression=compression,
+                    size=len(data),
+                    stored_size=len(stored),
+                    data=stored
+                ))
+        except IntegrityError:
+            # Someone else stored it first; lock theirs
+            await self.db.scalar(existing)
+
+        return digest
+
+    async def put_headers(self, headers: Dict[str, str]) -> str:
+        """Store a header set in canonical form so equal sets share a blob"""
+        canonical = json.dumps(headers, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return await self.put(canonical.encode("utf-8"))
+
+    async def get(self, digest: str) -> Optional[Blob]:
+        """Load a blob row (still compressed)"""
+        return await self.db.get(Blob, digest)
+
+    async def delete_unreferenced(self, digests: Collection[str]) -> Tuple[int, int]:
+        """Delete those of `digests` that no row references any more; returns (blobs deleted, stored bytes freed)"""
+        if not digests:
+            return 0, 0
+        # Lock the candidates first (in key order, so concurrent compactions can't deadlock):
+        # put() share-locks a blob it reuses, so any reference being written is committed
+        # before the check below runs, and no new one can start until this transaction ends
+        locked = (await self.db.scalars(
+            select(Blob.sha256).where(Blob.sha256.in_(digests)).order_by(Blob.sha256).with_for_update()
+        )).all()
+        if not locked:
+            return 0, 0
+
+        orphaned = select(Blob.sha256, Blob.stored_size).where(Blob.sha256.in_(locked))
+        for reference in BLOB_REFERENCES:
+            # NOT EXISTS rather than NOT IN: seeks the reference's index, and NULLs can't empty the result
+            orphaned = orphaned.where(~exists().where(reference == Blob.sha256))
+        rows = (await self.db.execute(orphaned)).all()
+        if not rows:
+            return 0, 0
+        await self.db.execute(delete(Blob).where(Blob.sha256.in_([row.sha256 for row in rows])))
+        return len(rows), sum(row.stored_size for row in rows)
+
+    @classmethod
+    def iter_decompressed(cls, blob: Blob) -> Iterator[bytes]:
+        """Yield the blob's original bytes chunk by chunk"""
+        data = blob.data
+
+        if blob.compression == "identity":
+            for start in range(0, len(data), cls.CHUNK_SIZE):
+                yield data[start:start + cls.CHUNK_SIZE]
+            return
+
+        if blob.compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard package is required to read zstd blobs")
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        elif blob.compression == "gzip":
+            decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        else:
+            raise ValueError(f"Unknown blob compression: {blob.compression}")
+
+        for start in range(0, len(data), cls.CHUNK_SIZE):
+            chunk = decompressor.decompress(data[start:start + cls.CHUNK_SIZE])
+            if chunk:
+                yield chunk
+        if blob.compression == "gzip":
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+    @classmethod
+    def read(cls, blob: Blob) -> bytes:
+        """Return the blob's full original bytes"""
+        return b"".join(cls.iter_decompressed(blob))
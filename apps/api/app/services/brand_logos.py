@@ -0,0 +1,66 @@
+"""
+Brand logo decoding.
+
+Logos arrive as base64 (optionally a data: URI) and are stored decoded in
+the content-addressed blob store, so identical logos are kept once and
+brand rows stay small. GET /brands/{id}/logo serves them with an ETag.
+"""
+import base64
+import binascii
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.blob_store import BlobStore
+
+LOGO_MAX_BYTES = 2 * 1024 * 1024  # same limit the branding settings page enforces
+
+_DATA_URI = re.compile(r"^data:(?P<type>[\w.+-]+/[\w.+-]+)(;[\w=-]+)*;base64,", re.IGNORECASE)
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Image media type from the file's magic bytes"""
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if b"<svg" in data[:1024].lower():
+        return "image/svg+xml"
+    return None
+
+
+def decode_logo(value: str) -> Tuple[bytes, str]:
+    """Decode a base64 logo (raw or data: URI) into bytes and media type; ValueError if it isn't a usable image"""
+    declared = None
+    match = _DATA_URI.match(value)
+    if match:
+        declared = match.group("type").lower()
+        value = value[match.end():]
+
+    try:
+        data = base64.b64decode("".join(value.split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Logo is not valid base64")
+    if not data:
+        raise ValueError("Logo is empty")
+    if len(data) > LOGO_MAX_BYTES:
+        raise ValueError(f"Logo must be {LOGO_MAX_BYTES // (1024 * 1024)}MB or smaller")
+
+    content_type = sniff_image_type(data) or declared
+    if not content_type or not content_type.startswith("image/"):
+        raise ValueError("Logo must be a PNG, JPEG, GIF, WebP or SVG image")
+    return data, content_type
+
+
+async def store_logo(db: AsyncSession, value: str) -> Tuple[str, str]:
+    """Decode and store a logo; returns (blob digest, media type)"""
+    data, content_type = decode_logo(value)
+    return await BlobStore(db).put(data), content_type
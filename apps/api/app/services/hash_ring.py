@@ -0,0 +1,83 @@
+"""
+Consistent hash ring used to shard scan work across workers by host.
+
+Hosts and worker virtual nodes are placed on a 32-bit ring; a host belongs
+to the first virtual node at or after its position. When a worker joins or
+leaves, only the hosts adjacent to its virtual nodes move, so most hosts
+keep landing on the same worker (and its warm connection pool).
+"""
+import bisect
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+RING_SIZE = 2 ** 32
+
+
+def ring_position(key: str) -> int:
+    """Stable 32-bit position for a key"""
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:4], "big")
+
+
+def host_hash(host: str) -> int:
+    """Ring position of a host (lowercased, without a www. prefix)"""
+    host = host.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return ring_position(host)
+
+
+class HashRing:
+    """Ring of worker virtual nodes"""
+
+    def __init__(self, nodes: List[str], vnodes: int = 64):
+        self.nodes = sorted(nodes)
+        self.vnodes = vnodes
+        points = sorted((ring_position(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._positions = [position for position, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, position: int) -> Optional[str]:
+        """Worker owning a ring position"""
+        if not self._positions:
+            return None
+        index = bisect.bisect_left(self._positions, position)
+        return self._owners[index % len(self._owners)]
+
+    def ranges_for(self, node: str) -> List[Tuple[int, int]]:
+        """
+        Inclusive (low, high) position ranges owned by a node.
+
+        Adjacent ranges are merged so the claim query stays short.
+        """
+        if node not in self.nodes:
+            return []
+        if len(self.nodes) == 1:
+            return [(0, RING_SIZE - 1)]
+
+        ranges: List[Tuple[int, int]] = []
+        for index, (position, owner) in enumerate(zip(self._positions, self._owners)):
+            if owner != node:
+                continue
+            if index == 0:
+                # First point also owns the wrap-around arc after the last point
+                if self._positions[-1] < RING_SIZE - 1:
+                    ranges.append((self._positions[-1] + 1, RING_SIZE - 1))
+                ranges.append((0, position))
+            else:
+                ranges.append((self._positions[index - 1] + 1, position))
+
+        ranges.sort()
+        merged: List[Tuple[int, int]] = []
+        for low, high in ranges:
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+            else:
+                merged.append((low, high))
+        return merged
+
+    def owned_fraction(self, node: str) -> float:
+        """Share of the ring owned by a node"""
+        return sum(high - low + 1 for low, high in self.ranges_for(node)) / RING_SIZE
+
+    def describe(self) -> Dict[str, float]:
+        return {node: round(self.owned_fraction(node), 4) for node in self.nodes}
@@ -6,8 +6,10 @@ This service handles:
 - Comparing scans to detect issues
 - Creating alerts when problems are detected
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import asyncio
+from sqlalchemy import desc, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -15,7 +17,12 @@ from app.models.monitoring_config import MonitoringConfig, MonitoringFrequency
 from app.models.alert import Alert, AlertType
 from app.models.scan import Scan
 from app.models.finding import Finding, FindingSeverity
-from app.services.scanner import ScannerService
+from app.models.site import Site
+from app.models.scan_job import ScanJob, ScanJobStatus
+from app.services.scanner import ScannerService, ScanResult
+from app.services.scan_dispatcher import scan_dispatcher, ScanPriority
+from app.services.scan_ingestion import scan_ingestion
+from app.services.scan_persistence import apply_scan_result, bulk_insert_alerts
 from app.services.email_service import send_alert_email
 
 
@@ -50,69 +57,52 @@ class MonitoringService:
         
         return False
     
-    async def run_scheduled_scan(self, config: MonitoringConfig, db: Session) -> Optional[Scan]:
-        """Run a scheduled scan for a monitoring config"""
+    async def run_scheduled_scan(self, config: MonitoringConfig, db: AsyncSession) -> Optional[Scan]:
+        """Run a scheduled scan for a monitoring config (config.site must be loaded)"""
         if not self.should_run_scan(config):
             return None
         
-        # Get site URL
-        site = config.site
-        url = f"https://{site.domain}"
-        
-        # Create and run scan (similar to scan endpoint)
-        from app.models.scan import Scan, RiskLevel
-        from app.models.finding import Finding
-        import json
-        
-        scan = Scan(url=url, user_id=None, site_id=site.id)
+        url = f"https://{config.site.domain}"
+        scan_result = await self.scan_site(url)
+        return await self.record_scheduled_scan(config, url, scan_result, db)
+    
+    async def scan_site(self, url: str) -> ScanResult:
+        """Scan a monitored site in the monitoring lane so interactive scans keep priority"""
+        scanner = ScannerService()
+        async with scan_dispatcher.slot(ScanPriority.MONITORING):
+            return await scanner.scan_url(url)
+    
+    async def record_scheduled_scan(self, config: MonitoringConfig, url: str, scan_result: ScanResult, db: AsyncSession) -> Scan:
+        """Persist a completed scheduled scan and mark the config as run"""
+        scan = Scan(url=url, user_id=None, site_id=config.site_id)
         db.add(scan)
-        db.flush()
+        await db.flush()
         
-        # Run scan
-        scanner = ScannerService()
-        scan_result = await scanner.scan_url(url)
-        
-        # Update scan with metadata
-        scan.normalized_url = scan_result.normalized_url
-        scan.final_url = scan_result.final_url
-        scan.redirect_chain = json.dumps(scan_result.redirect_chain) if scan_result.redirect_chain else None
-        scan.response_status = scan_result.response_status
-        scan.overall_score = scan_result.overall_score
-        scan.risk_level = RiskLevel(scan_result.risk_level) if scan_result.risk_level else None
-        
-        # Create findings
-        for finding_data in scan_result.findings:
-            finding = Finding(
-                scan_id=scan.id,
-                category=finding_data["category"],
-                severity=finding_data["severity"],
-                title=finding_data["title"],
-                description=finding_data["description"],
-                recommendation=finding_data.get("recommendation")
-            )
-            db.add(finding)
+        # Record metadata, raw response and findings
+        await apply_scan_result(db, scan, scan_result)
         
         # Update monitoring config
         from datetime import timezone
         config.last_run_at = datetime.now(timezone.utc)
         
-        db.commit()
-        db.refresh(scan)
+        await db.commit()
+        await db.refresh(scan)
         
         return scan
     
-    def detect_alerts(self, new_scan: Scan, db: Session) -> list[Alert]:
+    async def detect_alerts(self, new_scan: Scan, db: AsyncSession) -> list[Alert]:
         """Compare new scan with previous scan and create alerts if needed"""
         alerts = []
+        alert_rows = []
         
         if not new_scan.site_id:
             return alerts
         
         # Get previous scan for this site
-        previous_scan = db.query(Scan).filter(
+        previous_scan = await db.scalar(select(Scan).where(
             Scan.site_id == new_scan.site_id,
             Scan.id != new_scan.id
-        ).order_by(desc(Scan.created_at)).first()
+        ).order_by(desc(Scan.created_at)).limit(1))
         
         if not previous_scan:
             return alerts  # No previous scan to compare
@@ -121,66 +111,130 @@ class MonitoringService:
         if new_scan.overall_score is not None and previous_scan.overall_score is not None:
             score_drop = previous_scan.overall_score - new_scan.overall_score
             if score_drop >= self.SCORE_DROP_THRESHOLD:
-                alert = Alert(
+                alert_rows.append(dict(
                     site_id=new_scan.site_id,
                     scan_id=new_scan.id,
                     alert_type=AlertType.SCORE_DROP,
                     message=f"Security score dropped by {score_drop:.1f} points (from {previous_scan.overall_score:.1f} to {new_scan.overall_score:.1f})"
-                )
-                alerts.append(alert)
+                ))
         
         # Check for new critical/high findings
-        previous_critical_high = set()
-        for finding in previous_scan.findings:
-            if finding.severity in [FindingSeverity.CRITICAL, FindingSeverity.HIGH]:
-                previous_critical_high.add(finding.title)
-        
-        new_critical_high = []
-        for finding in new_scan.findings:
-            if finding.severity in [FindingSeverity.CRITICAL, FindingSeverity.HIGH]:
-                if finding.title not in previous_critical_high:
-                    new_critical_high.append(finding)
+        critical_high = [FindingSeverity.CRITICAL, FindingSeverity.HIGH]
+        previous_critical_high = set((await db.scalars(select(Finding.title).where(
+            Finding.scan_id == previous_scan.id,
+            Finding.severity.in_(critical_high)
+        ))).all())
+        
+        new_findings = (await db.scalars(select(Finding).where(
+            Finding.scan_id == new_scan.id,
+            Finding.severity.in_(critical_high)
+        ).order_by(Finding.id))).all()
+        new_critical_high = [f for f in new_findings if f.title not in previous_critical_high]
         
         # Create alerts for new critical/high issues
         for finding in new_critical_high:
             alert_type = AlertType.NEW_CRITICAL if finding.severity == FindingSeverity.CRITICAL else AlertType.NEW_HIGH
-            alert = Alert(
+            alert_rows.append(dict(
                 site_id=new_scan.site_id,
                 scan_id=new_scan.id,
                 alert_type=alert_type,
                 message=f"New {finding.severity.value} issue detected: {finding.title}"
-            )
-            alerts.append(alert)
+            ))
         
-        # Save alerts to database
+        if not alert_rows:
+            return alerts
+        
+        # Save alerts to database in one statement
+        alerts = await bulk_insert_alerts(db, alert_rows)
+        await db.commit()
+        
+        site = await db.get(Site, new_scan.site_id)
         for alert in alerts:
-            db.add(alert)
             # Send email notification (placeholder for now)
-            send_alert_email(alert, new_scan.site)
-        
-        if alerts:
-            db.commit()
+            send_alert_email(alert, site)
         
         return alerts
     
-    async def process_all_monitoring_configs(self, db: Session) -> list[Scan]:
+    async def enqueue_due_scans(self, db: AsyncSession) -> list[ScanJob]:
+        """Queue scans for due configs so scan workers run them (SCAN_WORKERS_ENABLED)"""
+        from app.services.scan_queue import enqueue_scan
+        
+        configs = await self._enabled_configs(db)
+        
+        # Don't queue a config twice while its previous job is still outstanding
+        outstanding = {
+            config_id for config_id in await db.scalars(select(ScanJob.monitoring_config_id).where(
+                ScanJob.monitoring_config_id.isnot(None),
+                ScanJob.status.in_([ScanJobStatus.PENDING, ScanJobStatus.RUNNING])
+            ))
+        }
+        
+        jobs = []
+        for config in configs:
+            if config.id in outstanding or not self.should_run_scan(config):
+                continue
+            jobs.append(enqueue_scan(
+                db,
+                f"https://{config.site.domain}",
+                priority=ScanPriority.MONITORING,
+                site_id=config.site_id,
+                monitoring_config_id=config.id
+            ))
+        
+        await db.commit()
+        return jobs
+    
+    async def _enabled_configs(self, db: AsyncSession) -> list[MonitoringConfig]:
+        result = await db.scalars(select(MonitoringConfig).options(
+            selectinload(MonitoringConfig.site)
+        ).where(MonitoringConfig.enabled == True))
+        return list(result.all())
+    
+    async def process_all_monitoring_configs(self, db: AsyncSession) -> list[Scan]:
         """Process all enabled monitoring configs and run scans as needed"""
-        configs = db.query(MonitoringConfig).filter(
-            MonitoringConfig.enabled == True
-        ).all()
+        configs = await self._enabled_configs(db)
+        
+        due = [(config, f"https://{config.site.domain}") for config in configs if self.should_run_scan(config)]
+        
+        async def scan_config(config: MonitoringConfig, url: str):
+            try:
+                return config, url, await self.scan_site(url), None
+            except Exception as e:
+                return config, url, None, e
+        
+        # Scans run concurrently within the monitoring lane budget; results go
+        # to the ingestion buffer as they finish and are committed in batches
+        submitted = []
+        for completed in asyncio.as_completed([scan_config(config, url) for config, url in due]):
+            config, url, scan_result, error = await completed
+            if error:
+                print(f"Error processing monitoring config {config.id}: {error}")
+                continue
+            submitted.append((config, await scan_ingestion.submit(
+                url, scan_result, site_id=config.site_id, after_write=self._mark_run(config.id)
+            )))
         
         scans_run = []
-        for config in configs:
+        for config, stored in submitted:
             try:
-                scan = await self.run_scheduled_scan(config, db)
-                if scan:
-                    scans_run.append(scan)
-                    # Detect alerts after scan completes
-                    self.detect_alerts(scan, db)
+                scan = await stored
+                scans_run.append(scan)
+                # Detect alerts once the scan is committed
+                await self.detect_alerts(scan, db)
             except Exception as e:
+                await db.rollback()
                 print(f"Error processing monitoring config {config.id}: {e}")
                 # Continue with other configs even if one fails
                 continue
         
         return scans_run
-
+    
+    @staticmethod
+    def _mark_run(config_id: int):
+        """Ingestion hook recording the config's run in the same transaction as its scan"""
+        async def mark(db: AsyncSession, scan: Scan) -> None:
+            from datetime import timezone
+            await db.execute(update(MonitoringConfig).where(
+                MonitoringConfig.id == config_id
+            ).values(last_run_at=datetime.now(timezone.utc)))
+        return mark
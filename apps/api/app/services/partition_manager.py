@@ -0,0 +1,137 @@
+"""
+Monthly partition maintenance for scans, findings and alerts.
+
+On Postgres these tables are range-partitioned by created_at (migration
+013), one partition per UTC calendar month named `<table>_yYYYYmMM`, plus
+a `<table>_default` catch-all. Maintenance keeps a few months of empty
+partitions ready ahead of time, so inserts never land in the default
+partition, and can detach partitions older than PARTITION_RETENTION_MONTHS
+so the live tables (and their indexes) only cover recent data. Detached
+partitions stay around as ordinary tables for archiving or dropping.
+
+Detaching is off by default (0). When enabled, a partition is still kept
+while it holds any row the scan retention policies protect (a site's
+latest scan, a shared report's scan, unlimited or not-yet-expired
+history; see RetentionEngine.retained_scans), so it waits until
+retention has compacted it.
+
+Other databases don't partition; maintenance is a no-op there.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, exists, select, table as table_clause, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.retention import RetentionEngine
+
+PARTITIONED_TABLES = ("scans", "findings", "alerts")
+PARTITION_NAME = re.compile(r"^(?P<table>[a-z_]+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+# Column of each partitioned table that identifies its scan
+SCAN_ID_COLUMNS = {"scans": "id", "findings": "scan_id", "alerts": "scan_id"}
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after `month` (negative goes back)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def month_bound(month: date) -> str:
+    """Partition bound literal for midnight UTC on the first of `month`"""
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+class PartitionManager:
+    """Create upcoming monthly partitions and detach expired ones"""
+
+    def __init__(self, months_ahead: Optional[int] = None, retention_months: Optional[int] = None):
+        self.months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        # 0 keeps every partition attached
+        self.retention_months = settings.PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+
+    async def partitions(self, db: AsyncSession, table: str) -> List[str]:
+        """Names of the partitions currently attached to `table`"""
+        result = await db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ), {"table": table})
+        return sorted(result.scalars().all())
+
+    async def is_partitioned(self, db: AsyncSession, table: str) -> bool:
+        return bool(await db.scalar(text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+            "WHERE pg_class.relname = :table"
+        ), {"table": table}))
+
+    async def create_future_partitions(self, db: AsyncSession, table: str, today: date) -> List[str]:
+        """Make sure partitions exist from the current month through months_ahead"""
+        existing = set(await self.partitions(db, table))
+        created = []
+        current = today.replace(day=1)
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month_bound(month)}') TO ('{month_bound(add_months(month, 1))}')"
+            ))
+            created.append(name)
+        return created
+
+    async def holds_retained_rows(self, db: AsyncSession, table: str, partition: str, now: datetime) -> bool:
+        """Whether `partition` of `table` has rows belonging to a scan retention still keeps"""
+        scan_id = column(SCAN_ID_COLUMNS[table])
+        rows = table_clause(partition, scan_id)
+        return bool(await db.scalar(select(exists().where(
+            scan_id.in_(RetentionEngine().retained_scans(now))
+        ).select_from(rows))))
+
+    async def detach_expired_partitions(self, db: AsyncSession, table: str, today: date) -> List[str]:
+        """Detach monthly partitions that end before the retention window starts and hold nothing retained"""
+        if self.retention_months <= 0:
+            return []
+        cutoff = add_months(today.replace(day=1), -self.retention_months)
+        now = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+        detached = []
+        for name in await self.partitions(db, table):
+            match = PARTITION_NAME.match(name)
+            if not match or match.group("table") != table:
+                continue  # the default partition, or something created by hand
+            month = date(int(match.group("year")), int(match.group("month")), 1)
+            if add_months(month, 1) > cutoff:
+                continue
+            if await self.holds_retained_rows(db, table, name, now):
+                print(f"Keeping expired partition {name}: it still holds retained scans")
+                continue
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            detached.append(name)
+        return detached
+
+    async def maintain(self, db: AsyncSession, today: Optional[date] = None) -> Dict:
+        """Run maintenance for every partitioned table and commit"""
+        if db.get_bind().dialect.name != "postgresql":
+            return {"skipped": "partitioning requires PostgreSQL"}
+
+        today = today or datetime.now(timezone.utc).date()
+        summary: Dict[str, Dict[str, List[str]]] = {}
+        for table in PARTITIONED_TABLES:
+            if not await self.is_partitioned(db, table):
+                continue  # migration 013 hasn't run yet
+            summary[table] = {
+                "created": await self.create_future_partitions(db, table, today),
+                "detached": await self.detach_expired_partitions(db, table, today),
+            }
+        await db.commit()
+        return {"tables": summary}
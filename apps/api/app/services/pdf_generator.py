@@ -1,3 +1,4 @@
+import base64
 from typing import Optional, List, Dict
 from io import BytesIO
 from datetime import datetime
@@ -8,6 +9,7 @@ from weasyprint.text.fonts import FontConfiguration
 
 from app.models.scan import Scan
 from app.models.brand_profile import BrandProfile
+from app.services.blob_store import BlobStore
 from app.models.finding import Finding, FindingCategory, FindingSeverity
 
 
@@ -492,13 +494,12 @@ class PDFGenerator:
     @staticmethod
     def _get_logo_html(brand: Optional[BrandProfile]) -> str:
         """Get logo HTML for brand"""
-        if not brand or not brand.logo_base64:
+        if not brand or not brand.logo:
             return ""
         
-        # Handle base64 logo
-        logo_data = brand.logo_base64
-        if not logo_data.startswith('data:'):
-            logo_data = f"data:image/png;base64,{logo_data}"
+        # Inline the stored image (the caller loads brand.logo from the blob store)
+        encoded = base64.b64encode(BlobStore.read(brand.logo)).decode("ascii")
+        logo_data = f"data:{brand.logo_content_type or 'image/png'};base64,{encoded}"
         
         return f'<img src="{logo_data}" class="cover-logo" alt="{brand.name}" />'
     
@@ -610,17 +611,8 @@ class PDFGenerator:
     
     @staticmethod
     def _parse_redirect_chain(redirect_chain) -> List[str]:
-        """Parse redirect chain from JSON string or list"""
-        if not redirect_chain:
-            return []
-        
-        try:
-            import json
-            if isinstance(redirect_chain, str):
-                return json.loads(redirect_chain)
-            return redirect_chain if isinstance(redirect_chain, list) else []
-        except:
-            return []
+        """Redirect chain as a list of URLs (the column is JSON, so it already is one)"""
+        return redirect_chain if isinstance(redirect_chain, list) else []
     
     @staticmethod
     def _build_cover_page(scan: Scan, brand: Optional[BrandProfile], logo_html: str,
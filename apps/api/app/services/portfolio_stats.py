@@ -0,0 +1,170 @@
+"""
+Portfolio-wide aggregates behind GET /portfolio/stats.
+
+The average score, the risk-level distribution and the most common findings
+across all sites are precomputed into two aggregate views instead of being
+computed per request:
+
+- portfolio_risk_stats: one row per latest-scan risk level ('unscanned' for
+  sites without a scan) with its site count and score sum
+- portfolio_top_findings: one row per (title, severity, category) found on
+  a site's latest scan, with the number of sites and findings
+
+Both read only each site's latest scan (the denormalized sites.latest_scan_*
+columns and the findings of sites.latest_scan_id), never scan history. On
+Postgres they are materialized views refreshed CONCURRENTLY, so readers
+keep seeing the previous contents while a refresh runs; SQLite has no
+materialized views, so there they are plain tables rebuilt in one
+transaction. Monitoring runs refresh them when they finish, and a read of
+data older than PORTFOLIO_STATS_MAX_AGE schedules a refresh. Each
+refresh's time and duration goes into materialized_view_refreshes.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.finding import FindingCategory, FindingSeverity
+from app.models.materialized_view_refresh import MaterializedViewRefresh
+from app.models.scan import RiskLevel
+
+REFRESH_NAME = "portfolio_stats"
+UNSCANNED = "unscanned"
+
+# name -> (query, unique key; REFRESH ... CONCURRENTLY needs a unique index covering every row)
+VIEWS = {
+    "portfolio_risk_stats": (
+        f"SELECT COALESCE(CAST(latest_scan_risk_level AS VARCHAR), '{UNSCANNED}') AS risk_level, "
+        "COUNT(*) AS site_count, "
+        "COUNT(latest_scan_score) AS scored_count, "
+        "COALESCE(SUM(latest_scan_score), 0) AS score_sum "
+        "FROM sites GROUP BY 1",
+        ("risk_level",),
+    ),
+    "portfolio_top_findings": (
+        "SELECT findings.title AS title, "
+        "CAST(findings.severity AS VARCHAR) AS severity, "
+        "CAST(findings.category AS VARCHAR) AS category, "
+        "COUNT(DISTINCT sites.id) AS site_count, "
+        "COUNT(*) AS finding_count "
+        "FROM sites JOIN findings ON findings.scan_id = sites.latest_scan_id "
+        "GROUP BY findings.title, findings.severity, findings.category",
+        ("title", "severity", "category"),
+    ),
+}
+
+
+def _enum_value(enum_cls, stored: str) -> str:
+    """Enum columns store member names; the API speaks values"""
+    return enum_cls[stored].value if stored in enum_cls.__members__ else stored
+
+
+@dataclass
+class PortfolioSnapshot:
+    total_sites: int = 0
+    scanned_sites: int = 0
+    average_score: Optional[float] = None
+    sites_by_risk_level: Dict[str, int] = field(default_factory=dict)
+    top_findings: List[Dict] = field(default_factory=list)
+    refreshed_at: Optional[datetime] = None
+    refresh_duration_ms: Optional[float] = None
+    staleness_seconds: Optional[float] = None
+    refresh_scheduled: bool = False
+
+
+class PortfolioStats:
+    """Maintains and reads the portfolio aggregate views"""
+
+    def __init__(self, max_age: Optional[int] = None):
+        self.max_age = settings.PORTFOLIO_STATS_MAX_AGE if max_age is None else max_age
+        self.refreshing = False  # one refresh per process at a time; stale reads don't pile up more
+
+    @staticmethod
+    def _is_postgres(db: AsyncSession) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    async def ensure_views(self, db: AsyncSession) -> None:
+        """Create the views (populated) if they don't exist yet"""
+        kind = "MATERIALIZED VIEW" if self._is_postgres(db) else "TABLE"
+        for name, (query, key) in VIEWS.items():
+            await db.execute(text(f"CREATE {kind} IF NOT EXISTS {name} AS {query}"))
+            await db.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name} ON {name} ({', '.join(key)})"))
+        await db.commit()
+
+    async def refresh(self, db: AsyncSession) -> Optional[float]:
+        """Recompute the views; returns the duration in ms, or None if a refresh is already running"""
+        if self.refreshing:
+            return None
+        self.refreshing = True
+        try:
+            await self.ensure_views(db)
+            started = time.perf_counter()
+            for name, (query, _) in VIEWS.items():
+                if self._is_postgres(db):
+                    await db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+                else:
+                    await db.execute(text(f"DELETE FROM {name}"))
+                    await db.execute(text(f"INSERT INTO {name} {query}"))
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            await db.merge(MaterializedViewRefresh(
+                name=REFRESH_NAME,
+                refreshed_at=datetime.now(timezone.utc),
+                duration_ms=duration_ms
+            ))
+            await db.commit()
+            return duration_ms
+        finally:
+            self.refreshing = False
+
+    async def read(self, db: AsyncSession, top_findings: int = 10) -> PortfolioSnapshot:
+        """Current aggregates plus how old they are"""
+        snapshot = PortfolioSnapshot()
+        refresh = await db.get(MaterializedViewRefresh, REFRESH_NAME)
+        if refresh is None:
+            return snapshot  # never refreshed: nothing to serve yet
+
+        score_sum = 0.0
+        scored = 0
+        for risk_level, site_count, scored_count, level_score_sum in await db.execute(text(
+            "SELECT risk_level, site_count, scored_count, score_sum FROM portfolio_risk_stats"
+        )):
+            level = risk_level if risk_level == UNSCANNED else _enum_value(RiskLevel, risk_level)
+            snapshot.sites_by_risk_level[level] = site_count
+            snapshot.total_sites += site_count
+            if level != UNSCANNED:
+                snapshot.scanned_sites += site_count
+            scored += scored_count
+            score_sum += level_score_sum or 0.0
+        snapshot.average_score = round(score_sum / scored, 1) if scored else None
+
+        snapshot.top_findings = [
+            {
+                "title": title,
+                "severity": _enum_value(FindingSeverity, severity),
+                "category": _enum_value(FindingCategory, category),
+                "site_count": site_count,
+                "finding_count": finding_count,
+            }
+            for title, severity, category, site_count, finding_count in await db.execute(text(
+                "SELECT title, severity, category, site_count, finding_count FROM portfolio_top_findings "
+                "ORDER BY site_count DESC, finding_count DESC, title LIMIT :limit"
+            ), {"limit": top_findings})
+        ]
+
+        refreshed_at = refresh.refreshed_at
+        if refreshed_at.tzinfo is None:
+            refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+        snapshot.refreshed_at = refreshed_at
+        snapshot.refresh_duration_ms = refresh.duration_ms
+        snapshot.staleness_seconds = round((datetime.now(timezone.utc) - refreshed_at).total_seconds(), 1)
+        return snapshot
+
+    def is_stale(self, snapshot: PortfolioSnapshot) -> bool:
+        return snapshot.refreshed_at is None or snapshot.staleness_seconds > self.max_age
+
+
+portfolio_stats = PortfolioStats()
@@ -0,0 +1,207 @@
+"""
+Scan history retention.
+
+Full scans and findings are only kept for recent history. Score trends
+don't need them: every site scan is already counted in its daily, weekly
+and monthly ScanRollup rows when it is written (app.services.rollups).
+Past a site's policy window the engine deletes the scan with its
+findings and alerts; later still it deletes the daily rollups, leaving
+weekly and monthly ones.
+
+Work happens in batches of RETENTION_BATCH_SIZE, each in its own
+transaction. A batch only ever selects rows that haven't been compacted
+yet, so an interrupted pass simply resumes where it left off the next
+time it runs.
+
+A site's latest scan and scans behind a shared report link are never
+compacted. Scans without a site have no rollups and are left alone.
+Response blobs of compacted scans are deleted in the same transaction
+once no other scan (or brand logo) references them.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import String, cast, delete, func, literal_column, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.finding import Finding
+from app.models.scan import Scan
+from app.models.scan_job import ScanJob
+from app.models.scan_rollup import RollupGranularity, ScanRollup
+from app.models.shared_report_link import SharedReportLink
+from app.models.site import Site
+from app.services.blob_store import BlobStore
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    name: str
+    full_detail_days: Optional[int]  # keep scans and findings this long; None keeps them forever
+    daily_rollup_days: Optional[int]  # keep daily rollups this long (weekly/monthly stay); None keeps them
+
+
+RETENTION_POLICIES: Dict[str, RetentionPolicy] = {
+    policy.name: policy
+    for policy in (
+        RetentionPolicy("standard", full_detail_days=90, daily_rollup_days=365),
+        RetentionPolicy("extended", full_detail_days=365, daily_rollup_days=730),
+        RetentionPolicy("unlimited", full_detail_days=None, daily_rollup_days=None),
+    )
+}
+
+
+@dataclass
+class RetentionReport:
+    batches: int = 0
+    scans_compacted: int = 0
+    findings_deleted: int = 0
+    alerts_deleted: int = 0
+    blobs_deleted: int = 0
+    daily_rollups_deleted: int = 0
+    bytes_reclaimed: int = 0  # estimated row and blob data freed; disk space returns after VACUUM
+    complete: bool = True  # False when max_batches stopped the pass (work may be left)
+    policies: Dict[str, int] = field(default_factory=dict)  # batches run per policy
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class RetentionEngine:
+    """Compacts scan history according to each site's retention policy"""
+
+    def __init__(self, batch_size: Optional[int] = None, default_policy: Optional[str] = None):
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.default_policy = default_policy or settings.RETENTION_DEFAULT_POLICY
+        if self.default_policy not in RETENTION_POLICIES:
+            raise ValueError(f"Unknown retention policy: {self.default_policy}")
+
+    def _sites_under(self, policy: RetentionPolicy):
+        """Sites governed by `policy`; unset or unknown policy names fall back to the default"""
+        if policy.name != self.default_policy:
+            return select(Site.id).where(Site.retention_policy == policy.name)
+        others = [name for name in RETENTION_POLICIES if name != policy.name]
+        return select(Site.id).where(or_(Site.retention_policy.is_(None), Site.retention_policy.notin_(others)))
+
+    def retained_scans(self, now: datetime):
+        """
+        Ids of scans compaction keeps: every site's latest scan, scans behind
+        a shared report link, scans without a site, and scans still inside
+        their site's policy window (all of them under "unlimited")
+        """
+        kept = [
+            Scan.site_id.is_(None),
+            Scan.id.in_(select(Site.latest_scan_id).where(Site.latest_scan_id.is_not(None))),
+            Scan.id.in_(select(SharedReportLink.scan_id)),
+        ]
+        for policy in RETENTION_POLICIES.values():
+            condition = Scan.site_id.in_(self._sites_under(policy))
+            if policy.full_detail_days is not None:
+                condition = condition & (Scan.created_at >= now - timedelta(days=policy.full_detail_days))
+            kept.append(condition)
+        return select(Scan.id).where(or_(*kept))
+
+    @staticmethod
+    async def _estimate_bytes(db: AsyncSession, table, condition) -> int:
+        """Approximate size of the matching rows"""
+        if db.get_bind().dialect.name == "postgresql":
+            size = func.pg_column_size(literal_column(table.name))
+        else:
+            size = sum(func.coalesce(func.length(cast(column, String)), 0) for column in table.columns)
+        return int(await db.scalar(select(func.coalesce(func.sum(size), 0)).where(condition)) or 0)
+
+    async def compact_scans(self, db: AsyncSession, policy: RetentionPolicy, now: datetime, report: RetentionReport) -> bool:
+        """Delete one batch of expired scans (already counted in rollups); False when nothing was left"""
+        cutoff = now - timedelta(days=policy.full_detail_days)
+        scan_ids = (await db.scalars(
+            select(Scan.id)
+            .where(
+                Scan.site_id.in_(self._sites_under(policy)),
+                Scan.created_at < cutoff,
+                Scan.id.notin_(select(Site.latest_scan_id).where(Site.latest_scan_id.is_not(None))),
+                Scan.id.notin_(select(SharedReportLink.scan_id))
+            )
+            .order_by(Scan.id)
+            .limit(self.batch_size)
+        )).all()
+        if not scan_ids:
+            return False
+
+        reclaimed = (
+            await self._estimate_bytes(db, Scan.__table__, Scan.id.in_(scan_ids))
+            + await self._estimate_bytes(db, Finding.__table__, Finding.scan_id.in_(scan_ids))
+            + await self._estimate_bytes(db, Alert.__table__, Alert.scan_id.in_(scan_ids))
+        )
+        digests = set()
+        for headers, body in await db.execute(
+            select(Scan.response_headers_sha256, Scan.response_body_sha256).where(Scan.id.in_(scan_ids))
+        ):
+            digests.update(digest for digest in (headers, body) if digest)
+
+        findings = await db.execute(delete(Finding).where(Finding.scan_id.in_(scan_ids)))
+        alerts = await db.execute(delete(Alert).where(Alert.scan_id.in_(scan_ids)))
+        await db.execute(update(ScanJob).where(ScanJob.scan_id.in_(scan_ids)).values(scan_id=None))
+        await db.execute(delete(Scan).where(Scan.id.in_(scan_ids)))
+        blobs, blob_bytes = await BlobStore(db).delete_unreferenced(digests)
+        await db.commit()
+
+        report.scans_compacted += len(scan_ids)
+        report.findings_deleted += findings.rowcount
+        report.alerts_deleted += alerts.rowcount
+        report.blobs_deleted += blobs
+        report.bytes_reclaimed += reclaimed + blob_bytes
+        return True
+
+    async def compact_daily_rollups(self, db: AsyncSession, policy: RetentionPolicy, now: datetime, report: RetentionReport) -> bool:
+        """Delete one batch of expired daily rollups (weekly/monthly rows cover them); False when nothing was left"""
+        cutoff = now - timedelta(days=policy.daily_rollup_days)
+        daily_ids = (await db.scalars(
+            select(ScanRollup.id)
+            .where(
+                ScanRollup.granularity == RollupGranularity.DAILY,
+                ScanRollup.site_id.in_(self._sites_under(policy)),
+                ScanRollup.period_start < cutoff
+            )
+            .order_by(ScanRollup.id)
+            .limit(self.batch_size)
+        )).all()
+        if not daily_ids:
+            return False
+
+        reclaimed = await self._estimate_bytes(db, ScanRollup.__table__, ScanRollup.id.in_(daily_ids))
+        await db.execute(delete(ScanRollup).where(ScanRollup.id.in_(daily_ids)))
+        await db.commit()
+
+        report.daily_rollups_deleted += len(daily_ids)
+        report.bytes_reclaimed += reclaimed
+        return True
+
+    async def run(self, db: AsyncSession, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> RetentionReport:
+        """
+        Run compaction for every policy until no work is left or max_batches is reached.
+
+        Call again (e.g. from a daily cron) to continue an incomplete pass.
+        """
+        now = now or datetime.now(timezone.utc)
+        report = RetentionReport()
+
+        for policy in RETENTION_POLICIES.values():
+            steps = []
+            if policy.full_detail_days is not None:
+                steps.append(self.compact_scans)
+            if policy.daily_rollup_days is not None:
+                steps.append(self.compact_daily_rollups)
+
+            for step in steps:
+                while True:
+                    if max_batches is not None and report.batches >= max_batches:
+                        report.complete = False
+                        return report
+                    if not await step(db, policy, now, report):
+                        break
+                    report.batches += 1
+                    report.policies[policy.name] = report.policies.get(policy.name, 0) + 1
+
+        return report
@@ -0,0 +1,82 @@
+"""
+Per-site score time series.
+
+Every scan stored for a site is added to that site's daily, weekly and
+monthly ScanRollup rows in the same transaction (one INSERT ... ON
+CONFLICT DO UPDATE), so score history reads a handful of indexed rows
+instead of scanning full scan rows. Rollups hold sums and extremes, which
+makes the upsert a simple addition and keeps concurrent writers safe.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable
+
+from sqlalchemy import case, inspect, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finding import FindingSeverity
+from app.models.scan import Scan
+from app.models.scan_rollup import RollupGranularity, ScanRollup
+
+SEVERITY_COLUMNS = {severity: f"{severity.value}_count" for severity in FindingSeverity}
+ADDITIVE_COLUMNS = ["scan_count", "scored_count", "score_sum", *SEVERITY_COLUMNS.values()]
+
+
+def period_start(moment: datetime, granularity: RollupGranularity) -> datetime:
+    """Midnight UTC on the first day of the day, week (Monday) or month containing `moment`"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+    day = moment.astimezone(timezone.utc).date()
+    if granularity == RollupGranularity.WEEKLY:
+        day -= timedelta(days=day.weekday())
+    elif granularity == RollupGranularity.MONTHLY:
+        day = day.replace(day=1)
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def scan_totals(overall_score, severities: Iterable[FindingSeverity]) -> Dict:
+    """Rollup column values contributed by a single scan"""
+    counts = Counter(FindingSeverity(severity) for severity in severities)
+    return {
+        "scan_count": 1,
+        "scored_count": 1 if overall_score is not None else 0,
+        "score_sum": overall_score if overall_score is not None else 0.0,
+        "score_min": overall_score,
+        "score_max": overall_score,
+        **{column: counts[severity] for severity, column in SEVERITY_COLUMNS.items()},
+    }
+
+
+def _keep_extreme(current, incoming, pick_incoming):
+    """min/max that ignores NULLs on either side (SQLite's min() doesn't)"""
+    return case(
+        (current.is_(None), incoming),
+        (incoming.is_(None), current),
+        (pick_incoming, incoming),
+        else_=current
+    )
+
+
+async def record_scan_rollups(db: AsyncSession, scan: Scan, severities: Iterable[FindingSeverity]) -> None:
+    """Add a flushed site scan to its daily, weekly and monthly rollups"""
+    if "created_at" in inspect(scan).unloaded:
+        await db.refresh(scan, ["created_at"])  # server default, not loaded after flush
+    totals = scan_totals(scan.overall_score, severities)
+    rows = [
+        {"site_id": scan.site_id, "granularity": granularity, "period_start": period_start(scan.created_at, granularity), **totals}
+        for granularity in RollupGranularity
+    ]
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(ScanRollup).values(rows)
+    table, new = ScanRollup.__table__.c, stmt.excluded
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["site_id", "granularity", "period_start"],
+        set_={
+            **{column: table[column] + new[column] for column in ADDITIVE_COLUMNS},
+            "score_min": _keep_extreme(table.score_min, new.score_min, new.score_min < table.score_min),
+            "score_max": _keep_extreme(table.score_max, new.score_max, new.score_max > table.score_max),
+            "updated_at": func.now(),
+        }
+    ))
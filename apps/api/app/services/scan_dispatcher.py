@@ -0,0 +1,151 @@
+"""
+Priority lanes for scan execution.
+
+Interactive scans (POST /scan), scheduled monitoring and bulk/backfill work
+share one event loop and one pool of outbound capacity. The dispatcher
+gives each class its own concurrency budget inside a global limit, and when
+slots are contended it hands them out by smooth weighted round-robin so
+lower lanes still make progress without starving interactive requests.
+
+With the default budgets, monitoring + bulk can never hold more than
+SCAN_MAX_CONCURRENCY - SCAN_INTERACTIVE_CONCURRENCY slots, so interactive
+scans always find capacity even during a large monitoring run.
+"""
+import asyncio
+import enum
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from app.core.config import settings
+
+
+class ScanPriority(str, enum.Enum):
+    INTERACTIVE = "interactive"
+    MONITORING = "monitoring"
+    BULK = "bulk"
+
+
+DEFAULT_WEIGHTS = {
+    ScanPriority.INTERACTIVE: 8,
+    ScanPriority.MONITORING: 3,
+    ScanPriority.BULK: 1,
+}
+
+
+class ScanDispatcher:
+    """Concurrency budgets per priority lane with weighted-fair dispatch"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        lane_limits: Dict[ScanPriority, int],
+        weights: Optional[Dict[ScanPriority, int]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.lane_limits = lane_limits
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.in_flight = 0
+        self._lane_in_flight: Dict[ScanPriority, int] = {lane: 0 for lane in ScanPriority}
+        self._waiters: Dict[ScanPriority, Deque[asyncio.Future]] = {lane: deque() for lane in ScanPriority}
+        self._credit: Dict[ScanPriority, int] = {lane: 0 for lane in ScanPriority}
+        self._completed: Dict[ScanPriority, int] = {lane: 0 for lane in ScanPriority}
+
+    @classmethod
+    def from_settings(cls) -> "ScanDispatcher":
+        return cls(
+            max_concurrency=settings.SCAN_MAX_CONCURRENCY,
+            lane_limits={
+                ScanPriority.INTERACTIVE: settings.SCAN_INTERACTIVE_CONCURRENCY,
+                ScanPriority.MONITORING: settings.SCAN_MONITORING_CONCURRENCY,
+                ScanPriority.BULK: settings.SCAN_BULK_CONCURRENCY,
+            }
+        )
+
+    def _can_start(self, lane: ScanPriority) -> bool:
+        return (
+            self.in_flight < self.max_concurrency
+            and self._lane_in_flight[lane] < self.lane_limits[lane]
+        )
+
+    def _grant(self, lane: ScanPriority) -> None:
+        self.in_flight += 1
+        self._lane_in_flight[lane] += 1
+
+    def _pick_lane(self) -> Optional[ScanPriority]:
+        """Smooth weighted round-robin over lanes that have waiters and budget"""
+        eligible = [
+            lane for lane in ScanPriority
+            if self._waiters[lane] and self._lane_in_flight[lane] < self.lane_limits[lane]
+        ]
+        if not eligible:
+            return None
+
+        total_weight = 0
+        for lane in eligible:
+            self._credit[lane] += self.weights[lane]
+            total_weight += self.weights[lane]
+        chosen = max(eligible, key=lambda lane: self._credit[lane])
+        self._credit[chosen] -= total_weight
+        return chosen
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_concurrency:
+            lane = self._pick_lane()
+            if lane is None:
+                return
+            waiter = self._waiters[lane].popleft()
+            if waiter.done():
+                continue  # Cancelled while queued
+            self._grant(lane)
+            waiter.set_result(None)
+
+    async def acquire(self, priority: ScanPriority) -> None:
+        """Wait for a slot in the given lane"""
+        if not self._waiters[priority] and self._can_start(priority):
+            self._grant(priority)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just before cancellation; hand it back
+                self.release(priority)
+            raise
+
+    def release(self, priority: ScanPriority) -> None:
+        self.in_flight -= 1
+        self._lane_in_flight[priority] -= 1
+        self._completed[priority] += 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: ScanPriority):
+        """Hold a scan slot in the given lane for the duration of the block"""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "lanes": {
+                lane.value: {
+                    "limit": self.lane_limits[lane],
+                    "weight": self.weights[lane],
+                    "in_flight": self._lane_in_flight[lane],
+                    "queued": sum(1 for waiter in self._waiters[lane] if not waiter.done()),
+                    "completed": self._completed[lane],
+                }
+                for lane in ScanPriority
+            },
+        }
+
+
+scan_dispatcher = ScanDispatcher.from_settings()
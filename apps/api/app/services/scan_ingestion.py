@@ -0,0 +1,179 @@
+"""
+Write-behind ingestion of finished scans.
+
+Batch producers (monitoring runs, scan workers) hand completed ScanResults
+to a ScanIngestionBuffer instead of committing each scan on its own. The
+buffer writes them in grouped transactions, flushed once INGEST_BATCH_SIZE
+results are waiting or INGEST_FLUSH_INTERVAL seconds after the first one
+arrived, so a large run commits (and fsyncs) once per batch rather than
+once per scan.
+
+submit() returns as soon as a result is accepted. The future it returns
+resolves to the stored Scan once that batch has committed, or raises the
+error for that item. Each item is written in its own savepoint, so a bad
+result fails alone and doesn't take its batch with it. At most
+INGEST_MAX_PENDING results wait in memory; beyond that submit() waits for
+room. close() stops intake and flushes everything already accepted, so a
+clean shutdown loses nothing (main.py calls it from the lifespan hook).
+
+Interactive scans don't go through the buffer: the client is waiting for
+that one scan, so there is nothing to batch.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.scan import Scan
+from app.services.scan_persistence import apply_scan_result
+from app.services.scanner import ScanResult
+
+# Extra writes that must commit atomically with the scan, e.g. closing out its job
+AfterWrite = Callable[[AsyncSession, Scan], Awaitable[None]]
+
+
+class IngestionClosed(RuntimeError):
+    """The buffer is shutting down and no longer accepts results"""
+
+
+@dataclass
+class PendingScan:
+    url: str
+    site_id: Optional[int]
+    result: ScanResult
+    after_write: Optional[AfterWrite]
+    future: "asyncio.Future[Scan]"
+
+
+class ScanIngestionBuffer:
+    """Bounded buffer that stores finished scans in grouped transactions"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.flush_interval = settings.INGEST_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_pending = max_pending or settings.INGEST_MAX_PENDING
+        self.closed = False
+        self.batches = 0
+        self.scans_written = 0
+        self.scans_failed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _session(self) -> AsyncSession:
+        # Resolved at call time so the module-level buffer follows AsyncSessionLocal
+        return (self.session_factory or AsyncSessionLocal)()
+
+    async def submit(
+        self,
+        url: str,
+        result: ScanResult,
+        site_id: Optional[int] = None,
+        after_write: Optional[AfterWrite] = None
+    ) -> "asyncio.Future[Scan]":
+        """Accept a finished scan for writing; await the returned future for the stored Scan"""
+        if self.closed:
+            raise IngestionClosed("scan ingestion is shut down")
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues belong to one event loop (tests run several)
+            self._loop, self._queue, self._task = loop, asyncio.Queue(self.max_pending), None
+
+        item = PendingScan(url, site_id, result, after_write, loop.create_future())
+        await self._queue.put(item)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return item.future
+
+    async def write(self, url: str, result: ScanResult, site_id: Optional[int] = None,
+                    after_write: Optional[AfterWrite] = None) -> Scan:
+        """submit() and wait for the scan's batch to commit"""
+        return await (await self.submit(url, result, site_id, after_write))
+
+    async def close(self) -> None:
+        """Stop accepting results and wait until everything accepted is written"""
+        self.closed = True
+        if self._task is None or self._task.done() or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.put(None)  # wakes a runner waiting out the flush interval
+        await self._task
+
+    async def _run(self) -> None:
+        """Flush batches until the queue is empty, then exit (submit() restarts it)"""
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = []
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if self.closed or remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is None:
+                    break  # closing: flush what's here without waiting for more
+                batch.append(item)
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[PendingScan]) -> None:
+        written = []
+        try:
+            async with self._session() as db:
+                for item in batch:
+                    try:
+                        async with db.begin_nested():
+                            scan = Scan(url=item.url, user_id=None, site_id=item.site_id)
+                            db.add(scan)
+                            await db.flush()
+                            await apply_scan_result(db, scan, item.result)
+                            if item.after_write:
+                                await item.after_write(db, scan)
+                        written.append((item, scan))
+                    except Exception as e:
+                        self._fail(item, e)
+                await db.commit()
+        except Exception as e:
+            # The commit itself failed: nothing from this batch was stored
+            print(f"Scan ingestion batch of {len(batch)} failed: {e}")
+            for item, _ in written:
+                self._fail(item, e)
+            return
+
+        self.batches += 1
+        self.scans_written += len(written)
+        for item, scan in written:
+            if not item.future.done():
+                item.future.set_result(scan)
+
+    def _fail(self, item: PendingScan, error: Exception) -> None:
+        self.scans_failed += 1
+        if not item.future.done():
+            item.future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "scans_written": self.scans_written,
+            "scans_failed": self.scans_failed,
+            "closed": self.closed,
+        }
+
+
+scan_ingestion = ScanIngestionBuffer()
@@ -0,0 +1,135 @@
+"""
+Persistence helpers shared by every code path that records a scan.
+
+Both the interactive scan endpoint and scheduled monitoring turn a
+ScanResult into Scan/Finding rows; keeping that in one place means new
+columns only need wiring up once.
+"""
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.scan import Scan, RiskLevel
+from app.models.finding import Finding
+from app.models.alert import Alert
+from app.models.site import Site
+from app.services.blob_store import BlobStore
+from app.services.rollups import record_scan_rollups
+from app.services.scanner import ScanResult
+
+
+async def apply_scan_result(db: AsyncSession, scan: Scan, scan_result: ScanResult) -> None:
+    """Copy metadata, raw response blobs and findings from a ScanResult onto a flushed Scan"""
+    scan.normalized_url = scan_result.normalized_url
+    scan.final_url = scan_result.final_url
+    scan.redirect_chain = scan_result.redirect_chain or None
+    scan.response_status = scan_result.response_status
+    scan.scan_metadata = scan_metadata(scan_result)
+    scan.overall_score = scan_result.overall_score
+    scan.risk_level = RiskLevel(scan_result.risk_level) if scan_result.risk_level else None
+
+    # Keep what we saw so support can inspect it later; identical payloads dedupe
+    if scan_result.response_status is not None:
+        blob_store = BlobStore(db)
+        scan.response_headers_sha256 = await blob_store.put_headers(scan_result.response_headers)
+        scan.response_body_sha256 = await blob_store.put(scan_result.response_body.encode("utf-8"))
+
+    await bulk_insert_findings(db, finding_rows(scan.id, scan_result.findings))
+
+    if scan.site_id:
+        await record_latest_scan(db, scan)
+        await record_scan_rollups(db, scan, (finding["severity"] for finding in scan_result.findings))
+
+
+def scan_metadata(scan_result: ScanResult) -> Optional[Dict]:
+    """Queryable per-scan metadata: where the scan ended up, how it got there and how long it took"""
+    if not scan_result.final_url:
+        return {"timings": scan_result.timings} if scan_result.timings else None
+    return {
+        "final_host": urlparse(scan_result.final_url).hostname,
+        "hop_count": max(len(scan_result.hops) - 1, 0),
+        "hops": scan_result.hops,
+        "timings": scan_result.timings,
+    }
+
+
+async def record_latest_scan(db: AsyncSession, scan: Scan) -> None:
+    """Point the site's latest-scan summary at a flushed scan, unless a newer scan already has"""
+    await db.execute(
+        update(Site)
+        .where(
+            Site.id == scan.site_id,
+            # Concurrent scans of one site may commit out of order; ids follow creation order
+            or_(Site.latest_scan_id.is_(None), Site.latest_scan_id < scan.id)
+        )
+        .values(
+            latest_scan_id=scan.id,
+            latest_scan_score=scan.overall_score,
+            latest_scan_risk_level=scan.risk_level,
+            latest_scan_at=select(Scan.created_at).where(Scan.id == scan.id).scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finding_rows(scan_id: int, findings: Iterable[Dict]) -> List[Dict]:
+    """Column dicts for a scan's findings, ready for bulk_insert_findings"""
+    return [
+        {
+            "scan_id": scan_id,
+            "category": finding_data["category"],
+            "severity": finding_data["severity"],
+            "title": finding_data["title"],
+            "description": finding_data["description"],
+            "recommendation": finding_data.get("recommendation"),
+        }
+        for finding_data in findings
+    ]
+
+
+async def bulk_insert_findings(db: AsyncSession, rows: List[Dict]) -> List[int]:
+    """
+    Insert findings for one or many scans as multi-row INSERT ... RETURNING id.
+    
+    Goes through Core rather than the ORM: no per-object unit-of-work
+    bookkeeping, and SQLAlchemy batches rows into a few large statements.
+    Returned ids are not guaranteed to follow the order of `rows`, and the
+    new rows aren't loaded into the session (query Scan.findings afresh).
+    """
+    if not rows:
+        return []
+    table = Finding.__table__
+    result = await db.execute(insert(table).returning(table.c.id), rows)
+    return list(result.scalars())
+
+
+async def bulk_insert_alerts(db: AsyncSession, rows: List[Dict]) -> List[Alert]:
+    """Bulk-insert alerts and return them as persistent objects (ids and created_at loaded)"""
+    if not rows:
+        return []
+    result = await db.scalars(insert(Alert).returning(Alert, sort_by_parameter_order=True), rows)
+    return list(result.all())
+
+
+async def load_scan(db: AsyncSession, scan_id: int) -> Optional[Scan]:
+    """
+    Load a scan with its findings eagerly (lazy loads aren't available on AsyncSession).
+
+    The scan itself is looked up by id alone, which probes every scans
+    partition on Postgres. Its findings are never written before the scan,
+    so bounding them by the scan's created_at prunes the findings
+    partitions of earlier months.
+    """
+    scan = await db.scalar(select(Scan).where(Scan.id == scan_id))
+    if scan is None:
+        return None
+
+    stmt = select(Finding).where(Finding.scan_id == scan.id).order_by(Finding.id)
+    if db.get_bind().dialect.name == "postgresql":
+        # Only partitioned there; elsewhere findings from before migration 013 have no created_at
+        stmt = stmt.where(Finding.created_at >= scan.created_at)
+    set_committed_value(scan, "findings", list((await db.scalars(stmt)).all()))
+    return scan
@@ -0,0 +1,39 @@
+"""
+Postgres-backed scan job queue consumed by scan workers.
+
+Jobs carry the host's position on the worker hash ring so each worker
+claims only hosts it owns; see app/services/scan_worker.py.
+"""
+from typing import Optional
+from urllib.parse import urlparse
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.scan_job import ScanJob, ScanJobStatus
+from app.services.hash_ring import host_hash
+from app.services.scan_dispatcher import ScanPriority
+from app.services.scanner import ScannerService
+
+
+def enqueue_scan(
+    db: AsyncSession,
+    url: str,
+    priority: ScanPriority = ScanPriority.BULK,
+    site_id: Optional[int] = None,
+    monitoring_config_id: Optional[int] = None
+) -> ScanJob:
+    """Add a scan job to the queue (caller commits)"""
+    normalized_url = ScannerService().normalize_url(url)
+    host = urlparse(normalized_url).netloc.lower()
+
+    job = ScanJob(
+        url=normalized_url,
+        host=host,
+        host_hash=host_hash(host),
+        priority=priority.value,
+        status=ScanJobStatus.PENDING,
+        site_id=site_id,
+        monitoring_config_id=monitoring_config_id
+    )
+    db.add(job)
+    return job
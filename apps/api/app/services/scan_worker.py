@@ -0,0 +1,293 @@
+"""
+Distributed scan worker.
+
+Workers register themselves in the scan_workers table and heartbeat every
+few seconds. Each worker builds the same consistent hash ring from the set
+of live workers and only claims pending jobs whose host falls in its own
+shard, so repeat scans of a host land on the worker whose connection pool
+(and DNS/robots caches) is already warm. Membership changes are picked up
+on the next heartbeat, which rebalances the ring automatically; jobs held
+by a worker that stopped heartbeating are returned to the queue.
+
+Coordination happens entirely through Postgres (FOR UPDATE SKIP LOCKED),
+so no external broker is needed. Worker clocks are assumed to be in sync.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, List, Optional
+
+import httpx
+from sqlalchemy import case, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import AsyncSessionLocal
+from app.models.monitoring_config import MonitoringConfig
+from app.models.scan import Scan
+from app.models.scan_job import ScanJob, ScanJobStatus
+from app.models.scan_worker import ScanWorker
+from app.services.hash_ring import HashRing
+from app.services.monitoring_service import MonitoringService
+from app.services.scan_dispatcher import ScanDispatcher, ScanPriority
+from app.services.scan_ingestion import ScanIngestionBuffer
+from app.services.scanner import ScannerService, ScanResult
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    url: str
+    priority: str
+    site_id: Optional[int]
+    monitoring_config_id: Optional[int]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ScanWorkerService:
+    """Claims jobs from its shard of the host-hash ring and runs them"""
+
+    HEARTBEAT_INTERVAL = 5.0  # seconds
+    WORKER_TTL = 20.0  # a worker without a heartbeat this long is considered gone
+    MAX_ATTEMPTS = 3
+    VNODES = 64
+
+    def __init__(
+        self,
+        concurrency: int = 20,
+        poll_interval: float = 1.0,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        # One buffer per worker so concurrent jobs' results share commits
+        self.ingestion = ScanIngestionBuffer(session_factory=session_factory)
+        # The worker's own lanes, sized from its concurrency rather than the API process's budgets,
+        # so no lane caps it below --concurrency; claimed jobs still start in priority order
+        self.dispatcher = ScanDispatcher(
+            max_concurrency=concurrency,
+            lane_limits={lane: concurrency for lane in ScanPriority}
+        )
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ring = HashRing([self.worker_id], vnodes=self.VNODES)
+        self.scans_completed = 0
+        self.scans_failed = 0
+        self._recent: Deque[datetime] = deque()
+
+    # Membership
+
+    async def register(self) -> None:
+        async with self.session_factory() as db:
+            db.add(ScanWorker(
+                id=self.worker_id,
+                hostname=socket.gethostname(),
+                pid=os.getpid(),
+                heartbeat_at=_now()
+            ))
+            await db.commit()
+            await self.refresh_ring(db)
+
+    async def deregister(self) -> None:
+        async with self.session_factory() as db:
+            # Hand back anything still claimed so the new owner picks it up immediately
+            await db.execute(update(ScanJob).where(
+                ScanJob.worker_id == self.worker_id,
+                ScanJob.status == ScanJobStatus.RUNNING
+            ).values(status=ScanJobStatus.PENDING, worker_id=None))
+            await db.execute(delete(ScanWorker).where(ScanWorker.id == self.worker_id))
+            await db.commit()
+
+    async def live_worker_ids(self, db: AsyncSession) -> List[str]:
+        cutoff = _now() - timedelta(seconds=self.WORKER_TTL)
+        return list((await db.scalars(select(ScanWorker.id).where(ScanWorker.heartbeat_at >= cutoff))).all())
+
+    async def refresh_ring(self, db: AsyncSession) -> HashRing:
+        """Rebuild the ring if workers joined or left"""
+        live = await self.live_worker_ids(db)
+        if self.worker_id not in live:
+            live.append(self.worker_id)
+        if sorted(live) != self.ring.nodes:
+            self.ring = HashRing(live, vnodes=self.VNODES)
+        return self.ring
+
+    def scans_per_minute(self) -> float:
+        window = timedelta(seconds=60)
+        cutoff = _now() - window
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+        return float(len(self._recent))
+
+    async def heartbeat(self) -> None:
+        async with self.session_factory() as db:
+            await self.refresh_ring(db)
+            await db.execute(update(ScanWorker).where(ScanWorker.id == self.worker_id).values(
+                heartbeat_at=_now(),
+                scans_completed=self.scans_completed,
+                scans_failed=self.scans_failed,
+                scans_per_minute=self.scans_per_minute(),
+                owned_fraction=self.ring.owned_fraction(self.worker_id),
+            ))
+            await self.requeue_orphaned_jobs(db)
+            await db.commit()
+
+    async def requeue_orphaned_jobs(self, db: AsyncSession) -> int:
+        """
+        Return jobs claimed by workers that stopped heartbeating to the queue.
+
+        A job that has already used up MAX_ATTEMPTS (e.g. one that keeps
+        crashing its worker) is marked failed instead.
+        """
+        cutoff = _now() - timedelta(seconds=self.WORKER_TTL)
+        live = await self.live_worker_ids(db) or [self.worker_id]
+        orphaned = (
+            ScanJob.status == ScanJobStatus.RUNNING,
+            ScanJob.claimed_at < cutoff,
+            ScanJob.worker_id.notin_(live)
+        )
+        await db.execute(update(ScanJob).where(*orphaned, ScanJob.attempts >= self.MAX_ATTEMPTS).values(
+            status=ScanJobStatus.FAILED,
+            worker_id=None,
+            error="Worker stopped while running the job",
+            finished_at=_now()
+        ))
+        result = await db.execute(update(ScanJob).where(*orphaned).values(
+            status=ScanJobStatus.PENDING, worker_id=None
+        ))
+        return result.rowcount
+
+    # Work
+
+    async def claim_jobs(self, limit: int) -> List[ClaimedJob]:
+        """Atomically claim up to `limit` pending jobs from this worker's shard"""
+        ranges = self.ring.ranges_for(self.worker_id)
+        if not ranges or limit <= 0:
+            return []
+
+        priority_order = case(
+            (ScanJob.priority == ScanPriority.INTERACTIVE.value, 0),
+            (ScanJob.priority == ScanPriority.MONITORING.value, 1),
+            else_=2
+        )
+        async with self.session_factory() as db:
+            jobs = (await db.scalars(select(ScanJob).where(
+                ScanJob.status == ScanJobStatus.PENDING,
+                or_(*(ScanJob.host_hash.between(low, high) for low, high in ranges))
+            ).order_by(priority_order, ScanJob.id).limit(limit).with_for_update(skip_locked=True))).all()
+
+            claimed = []
+            now = _now()
+            for job in jobs:
+                job.status = ScanJobStatus.RUNNING
+                job.worker_id = self.worker_id
+                job.claimed_at = now
+                job.attempts += 1
+                claimed.append(ClaimedJob(job.id, job.url, job.priority, job.site_id, job.monitoring_config_id))
+            await db.commit()
+            return claimed
+
+    async def record_result(self, job: ClaimedJob, scan_result: ScanResult) -> Scan:
+        """Persist a finished scan (batched with other jobs' results), close out the job and run monitoring alerts"""
+        async def close_job(db: AsyncSession, scan: Scan) -> None:
+            await db.execute(update(ScanJob).where(ScanJob.id == job.id).values(
+                status=ScanJobStatus.DONE,
+                scan_id=scan.id,
+                finished_at=_now(),
+                error=None,
+            ))
+            if job.monitoring_config_id:
+                await db.execute(update(MonitoringConfig).where(
+                    MonitoringConfig.id == job.monitoring_config_id
+                ).values(last_run_at=_now()))
+
+        scan = await self.ingestion.write(job.url, scan_result, site_id=job.site_id, after_write=close_job)
+
+        if job.monitoring_config_id:
+            # The job is already committed as done; a failure here must not requeue it
+            try:
+                async with self.session_factory() as db:
+                    await MonitoringService().detect_alerts(scan, db)
+            except Exception as e:
+                print(f"Alert detection for scan {scan.id} (job {job.id}) failed: {e}")
+        return scan
+
+    async def record_failure(self, job: ClaimedJob, error: Exception) -> None:
+        async with self.session_factory() as db:
+            row = await db.get(ScanJob, job.id)
+            # Only a job this worker still holds; one already closed out stays closed
+            if row and row.status == ScanJobStatus.RUNNING and row.worker_id == self.worker_id:
+                retry = row.attempts < self.MAX_ATTEMPTS
+                row.status = ScanJobStatus.PENDING if retry else ScanJobStatus.FAILED
+                row.worker_id = None
+                row.error = str(error)
+                row.finished_at = None if retry else _now()
+                await db.commit()
+
+    async def execute(self, scanner: ScannerService, job: ClaimedJob) -> None:
+        try:
+            async with self.dispatcher.slot(ScanPriority(job.priority)):
+                scan_result = await scanner.scan_url(job.url)
+            await self.record_result(job, scan_result)
+            self.scans_completed += 1
+            self._recent.append(_now())
+        except Exception as e:
+            self.scans_failed += 1
+            print(f"Scan job {job.id} failed: {e}")
+            await self.record_failure(job, e)
+
+    async def _heartbeat_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                print(f"Worker heartbeat failed: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Claim and execute jobs until `stop` is set, then drain and deregister"""
+        await self.register()
+        print(f"Scan worker {self.worker_id} started (concurrency={self.concurrency})")
+
+        in_flight: set = set()
+        limits = httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency)
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop(stop))
+        try:
+            async with httpx.AsyncClient(limits=limits) as client:
+                scanner = ScannerService(client=client)
+                while not stop.is_set():
+                    jobs = []
+                    try:
+                        jobs = await self.claim_jobs(self.concurrency - len(in_flight))
+                    except Exception as e:
+                        print(f"Claiming scan jobs failed: {e}")
+
+                    for job in jobs:
+                        task = asyncio.create_task(self.execute(scanner, job))
+                        in_flight.add(task)
+                        task.add_done_callback(in_flight.discard)
+
+                    if not jobs:
+                        try:
+                            await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                        except asyncio.TimeoutError:
+                            pass
+                    elif len(in_flight) >= self.concurrency:
+                        await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+                if in_flight:
+                    await asyncio.gather(*in_flight)
+        finally:
+            stop.set()
+            await self.ingestion.close()
+            await heartbeat_task
+            await self.deregister()
+            print(f"Scan worker {self.worker_id} stopped ({self.scans_completed} scans, {self.scans_failed} failed)")
@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional, Tuple
 import httpx
 import re
+import time
 from urllib.parse import urlparse, urljoin
 from bs4 import BeautifulSoup
 from app.models.finding import FindingCategory, FindingSeverity
@@ -12,6 +13,8 @@ class ScanResult:
         self.normalized_url: str = ""
         self.final_url: str = ""
         self.redirect_chain: List[str] = []
+        self.hops: List[Dict] = []  # {"url", "status"} per response, redirects first
+        self.timings: Dict[str, float] = {}  # milliseconds
         self.response_status: Optional[int] = None
         self.response_headers: Dict[str, str] = {}
         self.response_body: str = ""
@@ -28,6 +31,28 @@ class ScannerService:
     ROBOTS_TIMEOUT = 5.0
     MAX_REDIRECTS = 10
     
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Optionally reuse a caller-owned AsyncClient.
+        
+        Bulk callers (CLI, workers) pass a shared client so connections are
+        pooled across scans; the API creates a short-lived client per request.
+        """
+        self.client = client
+    
+    async def _get(self, url: str, timeout: float, follow_redirects: bool = False) -> httpx.Response:
+        """GET a URL with the shared client if one was provided"""
+        headers = {"User-Agent": self.USER_AGENT}
+        if self.client is not None:
+            return await self.client.get(url, timeout=timeout, follow_redirects=follow_redirects, headers=headers)
+        
+        async with httpx.AsyncClient(
+            follow_redirects=follow_redirects,
+            timeout=timeout,
+            headers=headers
+        ) as client:
+            return await client.get(url)
+    
     def normalize_url(self, url: str) -> str:
         """Normalize URL: add https:// if no scheme, validate domain"""
         url = url.strip()
@@ -53,28 +78,23 @@ class ScannerService:
         """Perform HTTP request and track redirect chain"""
         redirect_chain = [url]
         
-        async with httpx.AsyncClient(
-            follow_redirects=follow_redirects,
-            timeout=self.REQUEST_TIMEOUT,
-            headers={"User-Agent": self.USER_AGENT}
-        ) as client:
-            try:
-                response = await client.get(url)
-                
-                # httpx automatically follows redirects, so we get the final URL
-                # For redirect chain, we'll use the history if available
-                if hasattr(response, 'history') and response.history:
-                    redirect_chain = [str(r.url) for r in response.history] + [str(response.url)]
-                else:
-                    redirect_chain = [url, str(response.url)]
-                
-                return response, redirect_chain
-            except httpx.TimeoutException:
-                raise Exception("Request timeout")
-            except httpx.ConnectError:
-                raise Exception("Connection failed")
-            except Exception as e:
-                raise Exception(f"Request failed: {e}")
+        try:
+            response = await self._get(url, self.REQUEST_TIMEOUT, follow_redirects=follow_redirects)
+            
+            # httpx automatically follows redirects, so we get the final URL
+            # For redirect chain, we'll use the history if available
+            if hasattr(response, 'history') and response.history:
+                redirect_chain = [str(r.url) for r in response.history] + [str(response.url)]
+            else:
+                redirect_chain = [url, str(response.url)]
+            
+            return response, redirect_chain
+        except httpx.TimeoutException:
+            raise Exception("Request timeout")
+        except httpx.ConnectError:
+            raise Exception("Connection failed")
+        except Exception as e:
+            raise Exception(f"Request failed: {e}")
     
     def check_https_tls(self, final_url: str, response: Optional[httpx.Response] = None) -> List[Dict]:
         """Check HTTPS/TLS configuration"""
@@ -196,30 +216,26 @@ class ScannerService:
             parsed = urlparse(base_url)
             robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
             
-            async with httpx.AsyncClient(
-                timeout=self.ROBOTS_TIMEOUT,
-                headers={"User-Agent": self.USER_AGENT}
-            ) as client:
-                response = await client.get(robots_url)
-                
-                if response.status_code == 404:
+            response = await self._get(robots_url, self.ROBOTS_TIMEOUT)
+            
+            if response.status_code == 404:
+                findings.append({
+                    "category": FindingCategory.SEO,
+                    "severity": FindingSeverity.INFO,
+                    "title": "robots.txt not found",
+                    "description": "The website does not have a robots.txt file.",
+                    "recommendation": "Consider adding a robots.txt file to control search engine crawling behavior."
+                })
+            elif response.status_code == 200:
+                content = response.text.lower()
+                if "user-agent: *" in content and "disallow: /" in content:
                     findings.append({
                         "category": FindingCategory.SEO,
-                        "severity": FindingSeverity.INFO,
-                        "title": "robots.txt not found",
-                        "description": "The website does not have a robots.txt file.",
-                        "recommendation": "Consider adding a robots.txt file to control search engine crawling behavior."
+                        "severity": FindingSeverity.LOW,
+                        "title": "Robots blocking indexing",
+                        "description": "The robots.txt file disallows all search engines from indexing the site.",
+                        "recommendation": "Review your robots.txt file. If you want your site indexed, remove or modify the 'Disallow: /' directive."
                     })
-                elif response.status_code == 200:
-                    content = response.text.lower()
-                    if "user-agent: *" in content and "disallow: /" in content:
-                        findings.append({
-                            "category": FindingCategory.SEO,
-                            "severity": FindingSeverity.LOW,
-                            "title": "Robots blocking indexing",
-                            "description": "The robots.txt file disallows all search engines from indexing the site.",
-                            "recommendation": "Review your robots.txt file. If you want your site indexed, remove or modify the 'Disallow: /' directive."
-                        })
         except httpx.TimeoutException:
             # Timeout is not critical, skip
             pass
@@ -280,15 +296,22 @@ class ScannerService:
     async def scan_url(self, url: str) -> ScanResult:
         """Perform a comprehensive light scan of the URL"""
         result = ScanResult()
+        started = time.perf_counter()
         
         try:
             # 1. Normalize URL
             result.normalized_url = self.normalize_url(url)
             
             # 2. Perform request with redirects
+            request_started = time.perf_counter()
             response, redirect_chain = await self.perform_request(result.normalized_url)
+            result.timings["request_ms"] = round((time.perf_counter() - request_started) * 1000, 1)
             result.final_url = str(response.url)
             result.redirect_chain = redirect_chain
+            result.hops = [
+                {"url": str(r.url), "status": r.status_code}
+                for r in [*getattr(response, "history", []), response]
+            ]
             result.response_status = response.status_code
             result.response_headers = {k.lower(): v for k, v in response.headers.items()}
             result.response_body = response.text[:50000]  # Limit body size
@@ -323,4 +346,5 @@ class ScannerService:
             result.overall_score = 0.0
             result.risk_level = "high"
         
+        result.timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
         return result
@@ -9,23 +9,70 @@ For production scale, consider migrating to:
 """
 import asyncio
 from fastapi import BackgroundTasks
-from sqlalchemy.orm import Session
-
-from app.db.database import SessionLocal
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
 from app.services.monitoring_service import MonitoringService
+from app.services.partition_manager import PartitionManager
+from app.services.portfolio_stats import portfolio_stats
+from app.services.retention import RetentionEngine
 
 
 async def run_monitoring_task():
     """Background task to run all scheduled monitoring scans"""
-    db = SessionLocal()
-    try:
-        service = MonitoringService()
-        scans_run = await service.process_all_monitoring_configs(db)
-        print(f"Monitoring task completed: {len(scans_run)} scans run")
-    except Exception as e:
-        print(f"Error in monitoring task: {e}")
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            service = MonitoringService()
+            if settings.SCAN_WORKERS_ENABLED:
+                jobs = await service.enqueue_due_scans(db)
+                print(f"Monitoring task completed: {len(jobs)} scans queued for workers")
+            else:
+                scans_run = await service.process_all_monitoring_configs(db)
+                print(f"Monitoring task completed: {len(scans_run)} scans run")
+                if scans_run:
+                    await refresh_portfolio_stats()
+        except Exception as e:
+            print(f"Error in monitoring task: {e}")
+
+
+async def run_partition_maintenance() -> dict:
+    """Create upcoming monthly partitions and detach expired ones (daily cron / startup)"""
+    async with AsyncSessionLocal() as db:
+        try:
+            summary = await PartitionManager().maintain(db)
+            print(f"Partition maintenance completed: {summary}")
+            return summary
+        except Exception as e:
+            await db.rollback()
+            print(f"Error in partition maintenance: {e}")
+            return {"error": str(e)}
+
+
+async def run_retention_pass(max_batches: int = None) -> dict:
+    """Compact expired scan history (daily cron); an incomplete pass continues on the next run"""
+    async with AsyncSessionLocal() as db:
+        try:
+            report = await RetentionEngine().run(db, max_batches=max_batches)
+            print(f"Retention pass completed: {report.to_dict()}")
+            return report.to_dict()
+        except Exception as e:
+            await db.rollback()
+            print(f"Error in retention pass: {e}")
+            return {"error": str(e)}
+
+
+async def refresh_portfolio_stats() -> dict:
+    """Recompute the portfolio aggregate views (after monitoring runs, or when reads find them stale)"""
+    async with AsyncSessionLocal() as db:
+        try:
+            duration_ms = await portfolio_stats.refresh(db)
+            if duration_ms is None:
+                return {"skipped": "refresh already running"}
+            print(f"Portfolio stats refreshed in {duration_ms}ms")
+            return {"duration_ms": duration_ms}
+        except Exception as e:
+            await db.rollback()
+            print(f"Error refreshing portfolio stats: {e}")
+            return {"error": str(e)}
 
 
 def schedule_monitoring_task(background_tasks: BackgroundTasks):
@@ -0,0 +1,117 @@
+"""
+Ranked full-text search over findings and sites (GET /search).
+
+Both are matched through their full-text indexes (app.db.fulltext), never
+with LIKE: tsvector @@ websearch_to_tsquery ranked by ts_rank on Postgres,
+FTS5 MATCH ranked by bm25 on SQLite. Hits from both tables come back as
+one list ordered by (rank desc, kind, id). That key is unique, so pages
+continue after the last hit's key (keyset pagination) rather than using
+OFFSET.
+
+Findings are searched on each site's latest scan by default, which answers
+"which sites have X" once per site; `history` searches every stored finding.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finding import FindingSeverity
+
+HIT_COLUMNS = "kind, id, rank, site_id, domain, scan_id, title, severity, description"
+
+_WORD = re.compile(r"\w", re.UNICODE)
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """User input as an FTS5 query: every term required, each quoted so operators are literal"""
+    terms = [term.replace('"', '""') for term in q.split() if _WORD.search(term)]
+    return " ".join(f'"{term}"' for term in terms) or None
+
+
+def _finding_source(history: bool, rank: str, match: str, fts_join: str = "") -> str:
+    if history:
+        sites = "LEFT JOIN scans ON scans.id = findings.scan_id LEFT JOIN sites ON sites.id = scans.site_id"
+    else:
+        sites = "JOIN sites ON sites.latest_scan_id = findings.scan_id"
+    return (
+        f"SELECT 'finding' AS kind, findings.id AS id, {rank} AS rank, sites.id AS site_id, "
+        "sites.domain AS domain, findings.scan_id AS scan_id, findings.title AS title, "
+        "CAST(findings.severity AS VARCHAR) AS severity, findings.description AS description "
+        f"FROM {fts_join or 'findings'} {sites} WHERE {match}"
+    )
+
+
+def _site_source(rank: str, match: str, fts_join: str = "") -> str:
+    return (
+        f"SELECT 'site' AS kind, sites.id AS id, {rank} AS rank, sites.id AS site_id, "
+        "sites.domain AS domain, NULL AS scan_id, sites.display_name AS title, "
+        "NULL AS severity, NULL AS description "
+        f"FROM {fts_join or 'sites'} WHERE {match}"
+    )
+
+
+def hits_query(dialect: str, history: bool) -> str:
+    """UNION ALL of finding and site matches for :q, as a subquery named hits"""
+    if dialect == "postgresql":
+        findings = _finding_source(
+            history,
+            rank="ts_rank(findings.search_vector, websearch_to_tsquery('english', :q))",
+            match="findings.search_vector @@ websearch_to_tsquery('english', :q)",
+        )
+        sites = _site_source(
+            rank="ts_rank(sites.search_vector, websearch_to_tsquery('simple', :q))",
+            match="sites.search_vector @@ websearch_to_tsquery('simple', :q)",
+        )
+    else:
+        # bm25() is lower-is-better; negate it so both dialects sort by rank desc
+        findings = _finding_source(
+            history,
+            rank="-bm25(findings_fts)",
+            match="findings_fts MATCH :q",
+            fts_join="findings_fts JOIN findings ON findings.id = findings_fts.rowid",
+        )
+        sites = _site_source(
+            rank="-bm25(sites_fts)",
+            match="sites_fts MATCH :q",
+            fts_join="sites_fts JOIN sites ON sites.id = sites_fts.rowid",
+        )
+    return f"({findings} UNION ALL {sites}) AS hits"
+
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    after: Optional[Tuple[float, str, int]] = None,
+    history: bool = False
+) -> List[Dict]:
+    """Up to limit + 1 hits for `q`, best first, starting after the (rank, kind, id) key `after`"""
+    dialect = db.get_bind().dialect.name
+    params = {"q": q, "limit": limit + 1}
+    if dialect != "postgresql":
+        params["q"] = fts5_query(q)
+        if params["q"] is None:
+            return []
+
+    where = ""
+    if after is not None:
+        where = (
+            "WHERE rank < :after_rank OR (rank = :after_rank AND "
+            "(kind > :after_kind OR (kind = :after_kind AND id > :after_id)))"
+        )
+        params.update(after_rank=after[0], after_kind=after[1], after_id=after[2])
+
+    result = await db.execute(text(
+        f"SELECT {HIT_COLUMNS} FROM {hits_query(dialect, history)} {where} "
+        "ORDER BY rank DESC, kind, id LIMIT :limit"
+    ), params)
+
+    hits = []
+    for row in result.mappings():
+        hit = dict(row)
+        if hit["severity"] in FindingSeverity.__members__:
+            hit["severity"] = FindingSeverity[hit["severity"]].value  # stored as the member name
+        hits.append(hit)
+    return hits
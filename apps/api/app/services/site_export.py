@@ -0,0 +1,171 @@
+"""
+Full scan history export for one site (GET /sites/{id}/export).
+
+Scans and their findings are read in one ordered query through a
+server-side cursor (yield_per) and encoded as they arrive, so memory stays
+flat however long the history is and the first bytes go out before the
+query has finished. Output is chronological (oldest scan first):
+
+- ndjson: one JSON object per scan, with its findings as a list
+- csv: one row per finding with the scan's columns repeated (a scan
+  without findings gets one row with empty finding columns)
+
+Optionally gzip-compressed on the fly; each cursor batch is flushed to
+the client as it is encoded. The stream opens its own session, since it
+runs after the endpoint (and its session dependency) has returned. Only
+scans still inside the site's retention window are exported; compacted
+history lives on in the rollups behind GET /sites/{id}/history.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finding import Finding
+from app.models.scan import Scan
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_BATCH_SIZE = 500  # rows per cursor fetch, and per flushed chunk
+
+SCAN_FIELDS = ["scan_id", "created_at", "url", "final_url", "response_status", "overall_score", "risk_level"]
+FINDING_FIELDS = ["finding_id", "category", "severity", "title", "description", "recommendation"]
+CSV_COLUMNS = SCAN_FIELDS + FINDING_FIELDS
+
+
+def _scan_fields(row) -> Dict:
+    return {
+        "scan_id": row.scan_id,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "url": row.url,
+        "final_url": row.final_url,
+        "response_status": row.response_status,
+        "overall_score": row.overall_score,
+        "risk_level": row.risk_level.value if row.risk_level else None,
+    }
+
+
+def _finding_fields(row) -> Optional[Dict]:
+    if row.finding_id is None:
+        return None
+    return {
+        "finding_id": row.finding_id,
+        "category": row.category.value,
+        "severity": row.severity.value,
+        "title": row.title,
+        "description": row.description,
+        "recommendation": row.recommendation,
+    }
+
+
+class NdjsonEncoder:
+    """One line per scan; a scan's findings are consecutive rows, so only the current scan is held"""
+
+    def __init__(self):
+        self.scan: Optional[Dict] = None
+
+    def header(self) -> str:
+        return ""
+
+    def encode(self, rows: Iterable) -> str:
+        lines = []
+        for row in rows:
+            if self.scan is None or self.scan["scan_id"] != row.scan_id:
+                if self.scan is not None:
+                    lines.append(json.dumps(self.scan))
+                self.scan = {**_scan_fields(row), "findings": []}
+            finding = _finding_fields(row)
+            if finding:
+                self.scan["findings"].append(finding)
+        return "".join(f"{line}\n" for line in lines)
+
+    def finish(self) -> str:
+        line, self.scan = (f"{json.dumps(self.scan)}\n" if self.scan else ""), None
+        return line
+
+
+class CsvEncoder:
+    """One row per finding, scan columns repeated"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.DictWriter(self.buffer, fieldnames=CSV_COLUMNS)
+
+    def _drain(self) -> str:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+    def header(self) -> str:
+        self.writer.writeheader()
+        return self._drain()
+
+    def encode(self, rows: Iterable) -> str:
+        for row in rows:
+            self.writer.writerow({**_scan_fields(row), **(_finding_fields(row) or {})})
+        return self._drain()
+
+    def finish(self) -> str:
+        return ""
+
+
+ENCODERS = {"ndjson": NdjsonEncoder, "csv": CsvEncoder}
+
+
+def export_query(site_id: int):
+    """A site's scans with their findings (outer join), oldest scan first"""
+    return (
+        select(
+            Scan.id.label("scan_id"), Scan.created_at, Scan.url, Scan.final_url, Scan.response_status,
+            Scan.overall_score, Scan.risk_level,
+            Finding.id.label("finding_id"), Finding.category, Finding.severity,
+            Finding.title, Finding.description, Finding.recommendation,
+        )
+        .outerjoin(Finding, Finding.scan_id == Scan.id)
+        .where(Scan.site_id == site_id)
+        .order_by(Scan.created_at, Scan.id, Finding.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+async def stream_site_export(
+    session_factory: Callable[[], AsyncSession],
+    site_id: int,
+    format: str,
+    gzip: bool = False
+) -> AsyncIterator[bytes]:
+    """Encoded export of a site's scan history, chunk by chunk"""
+    encoder = ENCODERS[format]()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits=31: gzip container
+
+    def emit(text: str, flush: bool = False) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        data = compressor.compress(data)
+        return data + compressor.flush(zlib.Z_SYNC_FLUSH) if flush else data
+
+    # Headers/column names go out before the query runs
+    first = emit(encoder.header(), flush=True)
+    if first:
+        yield first
+
+    async with session_factory() as db:
+        result = await db.stream(export_query(site_id))
+        try:
+            async for rows in result.partitions():
+                chunk = emit(encoder.encode(rows), flush=True)
+                if chunk:
+                    yield chunk
+        finally:
+            await result.close()  # also when the client goes away mid-export
+
+    tail = emit(encoder.finish())
+    if compressor is not None:
+        tail += compressor.flush()
+    if tail:
+        yield tail
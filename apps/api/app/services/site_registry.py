@@ -0,0 +1,89 @@
+"""
+Domain -> site id resolution for scan creation.
+
+Scans of an unknown domain create its site on the fly. A single
+INSERT ... ON CONFLICT (domain) DO UPDATE ... RETURNING id does the lookup
+and the creation in one round trip, and concurrent first scans of the same
+domain both get the one row instead of racing on the unique index. The
+no-op update on conflict is what makes RETURNING yield an existing row.
+
+Resolved ids are kept in a bounded LRU cache, so scans of known domains
+don't query sites at all. An id only enters the cache once the
+transaction that resolved it commits; one from a rolled-back insert would
+point at a site that doesn't exist. Sites are never deleted, so cached ids
+don't go stale.
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.site import Site
+
+PENDING_KEY = "site_registry_pending"
+
+
+class SiteRegistry:
+    """Bounded LRU cache of domain -> site id in front of the sites upsert"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.SITE_ID_CACHE_SIZE
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, domain: str) -> Optional[int]:
+        with self._lock:
+            site_id = self._ids.get(domain)
+            if site_id is None:
+                self.misses += 1
+                return None
+            self._ids.move_to_end(domain)
+            self.hits += 1
+            return site_id
+
+    def remember(self, domain: str, site_id: int) -> None:
+        with self._lock:
+            self._ids[domain] = site_id
+            self._ids.move_to_end(domain)
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+    async def site_id_for(self, db: AsyncSession, domain: str) -> int:
+        """Id of the site for `domain`, creating it if needed (cached once the transaction commits)"""
+        site_id = self.cached(domain)
+        if site_id is not None:
+            return site_id
+
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(Site).values(domain=domain, display_name=domain)  # domain doubles as display name
+        site_id = await db.scalar(
+            stmt.on_conflict_do_update(index_elements=["domain"], set_={"domain": stmt.excluded.domain})
+            .returning(Site.id)
+        )
+        db.info.setdefault(PENDING_KEY, []).append((self, domain, site_id))
+        return site_id
+
+
+site_registry = SiteRegistry()
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_sites(session):
+    for registry, domain, site_id in session.info.pop(PENDING_KEY, []):
+        registry.remember(domain, site_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_sites(session):
+    session.info.pop(PENDING_KEY, None)
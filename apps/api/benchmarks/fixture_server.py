@@ -0,0 +1,215 @@
+"""
+Local asyncio HTTP fixture server simulating thousands of virtual hosts.
+
+Each virtual host gets a deterministic profile (body size, redirect chain
+length, header profile, robots.txt) derived from its index and the seed,
+so runs are reproducible across commits.
+
+Virtual hosts are addressed in one of two ways:
+
+- "loopback": host N is the loopback address 127.0.1.0 + N (Linux routes
+  the whole /8 to lo; on macOS add aliases with `ifconfig lo0 alias`).
+  Every host gets its own connections, like real sites.
+- "proxy": host N is http://vhost-N.bench.test and the client is pointed
+  at the server as an HTTP proxy. Works everywhere, but connections are
+  shared across hosts.
+"""
+import asyncio
+import ipaddress
+import random
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
+
+LOOPBACK_BASE = int(ipaddress.IPv4Address("127.0.1.0"))
+
+HEADER_PROFILES: Dict[str, List[Tuple[str, str]]] = {
+    "hardened": [
+        ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+        ("Content-Security-Policy", "default-src 'self'"),
+        ("X-Frame-Options", "DENY"),
+        ("X-Content-Type-Options", "nosniff"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Permissions-Policy", "geolocation=()"),
+        ("Server", "nginx"),
+    ],
+    "typical": [
+        ("X-Frame-Options", "SAMEORIGIN"),
+        ("Server", "nginx/1.18.0"),
+        ("Set-Cookie", "session=abc123; Path=/; HttpOnly"),
+    ],
+    "bare": [
+        ("Server", "Apache/2.4.41 (Ubuntu)"),
+    ],
+}
+
+BODY_FILLER = (
+    "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    "We use cookies to improve your experience; manage consent in preferences.</p>\n"
+)
+
+REASONS = {200: "OK", 301: "Moved Permanently", 302: "Found", 404: "Not Found", 503: "Service Unavailable"}
+
+
+@dataclass
+class FixtureConfig:
+    hosts: int = 2000
+    latency_ms: float = 20.0
+    latency_jitter_ms: float = 10.0
+    min_body_bytes: int = 2_000
+    max_body_bytes: int = 100_000
+    max_redirects: int = 3
+    failure_rate: float = 0.02
+    header_profiles: List[str] = field(default_factory=lambda: list(HEADER_PROFILES))
+    addressing: str = "loopback"  # "loopback" or "proxy"
+    seed: int = 1
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class HostProfile:
+    body_bytes: int
+    redirects: int
+    headers: List[Tuple[str, str]]
+    has_robots: bool
+
+
+class FixtureServer:
+    """Minimal HTTP/1.1 keep-alive server serving simulated virtual hosts"""
+
+    def __init__(self, config: FixtureConfig, bind_host: Optional[str] = None):
+        self.config = config
+        # Loopback addressing needs the wildcard address to accept 127.x.y.z
+        self.bind_host = bind_host or ("0.0.0.0" if config.addressing == "loopback" else "127.0.0.1")
+        self.port: Optional[int] = None
+        self.requests_served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._profiles: Dict[int, HostProfile] = {}
+        self._random = random.Random(config.seed)
+        self._body_template = (BODY_FILLER * (config.max_body_bytes // len(BODY_FILLER) + 1)).encode()
+
+    async def start(self, port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, self.bind_host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    def host_url(self, index: int) -> str:
+        """Base URL the scanner should be given for virtual host `index`"""
+        if self.config.addressing == "proxy":
+            return f"http://vhost-{index}.bench.test"
+        return f"http://{ipaddress.IPv4Address(LOOPBACK_BASE + index)}:{self.port}"
+
+    def proxy_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def profile(self, index: int) -> HostProfile:
+        profile = self._profiles.get(index)
+        if profile is None:
+            rng = random.Random(self.config.seed * 1_000_003 + index)
+            profile = HostProfile(
+                body_bytes=rng.randint(self.config.min_body_bytes, self.config.max_body_bytes),
+                redirects=rng.randint(0, self.config.max_redirects),
+                headers=HEADER_PROFILES[rng.choice(self.config.header_profiles)],
+                has_robots=rng.random() < 0.7,
+            )
+            self._profiles[index] = profile
+        return profile
+
+    def _host_index(self, host_header: str, target: str) -> int:
+        if target.startswith("http://"):
+            host_header = target[len("http://"):].split("/", 1)[0]
+        host = host_header.split(":", 1)[0]
+        if host.startswith("vhost-"):
+            return int(host[len("vhost-"):].split(".", 1)[0]) % self.config.hosts
+        try:
+            return (int(ipaddress.IPv4Address(host)) - LOOPBACK_BASE) % self.config.hosts
+        except ValueError:
+            return 0
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                delay = self.config.latency_ms + self._random.uniform(-1, 1) * self.config.latency_jitter_ms
+                await asyncio.sleep(max(0.0, delay) / 1000)
+
+                if self._random.random() < self.config.failure_rate:
+                    if self._random.random() < 0.5:
+                        # Abrupt connection reset
+                        writer.transport.abort()
+                        return
+                    self._write(writer, 503, [], b"unavailable")
+                else:
+                    index = self._host_index(headers.get("host", ""), target)
+                    self._respond(writer, self.profile(index), self._path(target))
+
+                self.requests_served += 1
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _path(target: str) -> str:
+        """Path from an origin-form or (proxy) absolute-form request target"""
+        if "://" in target:
+            rest = target.split("://", 1)[1]
+            slash = rest.find("/")
+            target = rest[slash:] if slash != -1 else "/"
+        return target.split("?", 1)[0]
+
+    def _respond(self, writer: asyncio.StreamWriter, profile: HostProfile, path: str) -> None:
+        if path == "/robots.txt":
+            if profile.has_robots:
+                self._write(writer, 200, [], b"User-agent: *\nAllow: /\n", "text/plain")
+            else:
+                self._write(writer, 404, [], b"not found", "text/plain")
+            return
+
+        # Redirect chain: / -> /hop/1 -> ... -> /hop/N (final page)
+        hop = int(path.rsplit("/", 1)[1]) if path.startswith("/hop/") else 0
+        if hop < profile.redirects:
+            self._write(writer, 301, [("Location", f"/hop/{hop + 1}")], b"")
+            return
+
+        self._write(writer, 200, profile.headers, self._body_template[:profile.body_bytes])
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, headers: List[Tuple[str, str]], body: bytes,
+               content_type: str = "text/html; charset=utf-8") -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}"]
+        head.append(f"Content-Type: {content_type}")
+        head.append(f"Content-Length: {len(body)}")
+        head.extend(f"{name}: {value}" for name, value in headers)
+        head.append("Connection: keep-alive")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+def run_in_subprocess(config: FixtureConfig, port_queue) -> None:
+    """multiprocessing target: serve until terminated, reporting the bound port"""
+    async def _serve():
+        server = FixtureServer(config)
+        port_queue.put(await server.start())
+        await server.serve_forever()
+
+    asyncio.run(_serve())
@@ -0,0 +1,226 @@
+"""
+Scanner throughput benchmark against the local fixture server.
+
+Runs ScannerService against simulated virtual hosts at several
+concurrency levels and reports scans/sec, latency percentiles, peak RSS
+and peak open sockets. Results are written as JSON (tagged with the git
+commit) so runs can be compared across commits.
+
+Usage (from apps/api):
+    python -m benchmarks.scanner_throughput --scans 2000 --concurrency 1,10,50,100
+    python -m benchmarks.scanner_throughput --compare benchmarks/results/previous.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.metrics import LatencyReservoir
+from app.services.scanner import ScannerService
+from benchmarks.fixture_server import FixtureConfig, FixtureServer, run_in_subprocess
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def peak_rss_mb() -> float:
+    """Process high-water RSS (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(maxrss / divisor, 1)
+
+
+def open_socket_count() -> Optional[int]:
+    """Sockets currently open by this process (Linux /proc only)"""
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        return None
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_level(server: FixtureServer, concurrency: int, scans: int, shared_client: bool) -> Dict:
+    """Run `scans` scans at the given concurrency and collect metrics"""
+    latencies = LatencyReservoir()
+    errors = 0
+    peak_sockets = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    client = None
+    if shared_client:
+        limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+        if server.config.addressing == "proxy":
+            transport = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(server.proxy_url()), limits=limits)
+            client = httpx.AsyncClient(mounts={"http://": transport})
+        else:
+            client = httpx.AsyncClient(limits=limits)
+    scanner = ScannerService(client=client)
+
+    async def sample_sockets():
+        nonlocal peak_sockets
+        while not done.is_set():
+            count = open_socket_count()
+            if count is not None:
+                peak_sockets = max(peak_sockets, count)
+            await asyncio.sleep(0.05)
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            result = await scanner.scan_url(server.host_url(index % server.config.hosts))
+            latencies.record((time.perf_counter() - started) * 1000)
+            if result.response_status is None or result.response_status >= 500:
+                errors += 1
+
+    sampler = asyncio.create_task(sample_sockets())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(scans)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    if client is not None:
+        await client.aclose()
+
+    return {
+        "concurrency": concurrency,
+        "scans": scans,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "scans_per_second": round(scans / elapsed, 2),
+        "latency_ms": latencies.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_open_sockets": peak_sockets if open_socket_count() is not None else None,
+    }
+
+
+async def run_benchmark(config: FixtureConfig, port: int, levels: List[int], scans: int, shared_client: bool) -> List[Dict]:
+    # The server runs in its own process; this instance only builds URLs
+    server = FixtureServer(config)
+    server.port = port
+
+    results = []
+    for concurrency in levels:
+        result = await run_level(server, concurrency, scans, shared_client)
+        results.append(result)
+        latency = result["latency_ms"]
+        print(
+            f"c={concurrency:>4}  {result['scans_per_second']:>8} scans/s  "
+            f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms  "
+            f"errors={result['errors']}  rss={result['peak_rss_mb']}MB  sockets={result['peak_open_sockets']}"
+        )
+    return results
+
+
+def compare(current: Dict, previous_path: str) -> None:
+    """Print scans/sec and p95 deltas against a previous results file"""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    by_level = {r["concurrency"]: r for r in previous["results"]}
+    print(f"\nCompared with {previous.get('commit')} ({previous_path}):")
+    for result in current["results"]:
+        before = by_level.get(result["concurrency"])
+        if not before:
+            continue
+        throughput = (result["scans_per_second"] / before["scans_per_second"] - 1) * 100
+        p95_before, p95_now = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        p95 = (p95_now / p95_before - 1) * 100 if p95_before else 0.0
+        print(f"c={result['concurrency']:>4}  throughput {throughput:+.1f}%  p95 {p95:+.1f}%")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ScannerService throughput against a local fixture server")
+    parser.add_argument("--scans", type=int, default=2000, help="Scans per concurrency level")
+    parser.add_argument("--concurrency", default="1,10,50,100", help="Comma-separated concurrency levels")
+    parser.add_argument("--hosts", type=int, default=2000, help="Number of simulated virtual hosts")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--min-body-kb", type=int, default=2)
+    parser.add_argument("--max-body-kb", type=int, default=100)
+    parser.add_argument("--max-redirects", type=int, default=3)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--addressing", choices=["loopback", "proxy"],
+                        default="loopback" if sys.platform.startswith("linux") else "proxy")
+    parser.add_argument("--shared-client", action="store_true",
+                        help="Reuse one pooled AsyncClient (as the bulk CLI does); required for proxy addressing")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    if args.addressing == "proxy":
+        args.shared_client = True
+
+    config = FixtureConfig(
+        hosts=args.hosts,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        min_body_bytes=args.min_body_kb * 1024,
+        max_body_bytes=args.max_body_kb * 1024,
+        max_redirects=args.max_redirects,
+        failure_rate=args.failure_rate,
+        addressing=args.addressing,
+    )
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    # Separate process so server sockets and memory don't skew client metrics
+    port_queue = multiprocessing.Queue()
+    server_process = multiprocessing.Process(target=run_in_subprocess, args=(config, port_queue), daemon=True)
+    server_process.start()
+    try:
+        port = port_queue.get(timeout=10)
+        results = asyncio.run(run_benchmark(config, port, levels, args.scans, args.shared_client))
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+    commit = git_commit()
+    report = {
+        "benchmark": "scanner_throughput",
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "shared_client": args.shared_client,
+        "fixture": config.to_dict(),
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"scanner-{stamp}-{commit or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
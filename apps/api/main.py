@@ -3,21 +3,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.api.routes import health, scan, stripe, brands, shared, sites, monitoring, internal
-from app.db.database import engine, Base
+from app.api.routes import health, scan, stripe, brands, shared, sites, monitoring, internal, portfolio, search
+from app.db.database import async_engine, Base
+from app.db.query_stats import QueryStatsMiddleware
+from app.services.scan_ingestion import scan_ingestion
+from app.services.scheduler import run_partition_maintenance
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     try:
-        Base.metadata.create_all(bind=engine)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
     except Exception as e:
         print(f"⚠️  Database connection failed (Docker may not be running): {e}")
         print("   Backend will start but database operations will fail.")
+    else:
+        # Don't wait for the daily cron to have this month's partitions
+        await run_partition_maintenance()
     yield
-    # Shutdown
-    pass
+    # Shutdown: write out buffered scan results before the pool goes away
+    await scan_ingestion.close()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -27,6 +35,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Statement count and DB time per request (X-DB-Queries / X-DB-Time)
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS - Must be added before routes
 app.add_middleware(
     CORSMiddleware,
@@ -44,6 +55,8 @@ app.include_router(stripe.router, prefix="/stripe", tags=["stripe"])
 app.include_router(brands.router, prefix="/brands", tags=["brands"])
 app.include_router(shared.router, prefix="/shared", tags=["shared"])
 app.include_router(sites.router, prefix="/sites", tags=["sites"])
+app.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"])
+app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(monitoring.router, prefix="", tags=["monitoring"])
 app.include_router(internal.router, prefix="", tags=["internal"])
 
@@ -0,0 +1,27 @@
+"""
+Shared fixtures.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.db.query_stats import capture_queries
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail if a block runs more SQL statements than allowed:
+
+        with query_budget(1):
+            client.get("/sites")
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries() as queries:
+            yield queries
+        assert queries.count <= max_queries, (
+            f"{queries.count} queries, budget {max_queries}:\n" + "\n".join(queries.statements)
+        )
+
+    return budget
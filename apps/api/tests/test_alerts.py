@@ -0,0 +1,104 @@
+"""
+Tests for the grouped alerts feed.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import monitoring as monitoring_routes
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.database import Base, get_db, get_read_db
+from app.models.alert import Alert, AlertType
+from app.models.blob import Blob
+from app.models.scan import Scan
+from app.models.site import Site
+from app.models.user import User
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Alert.__table__]
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(monitoring_routes.router)
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def _seed_alerts(db, site_count: int, per_site: int):
+    sites = [Site(domain=f"site-{i}.example.com", display_name=f"Site {i}") for i in range(site_count)]
+    db.add_all(sites)
+    await db.flush()
+    scans = [Scan(url=f"https://{site.domain}", site_id=site.id) for site in sites]
+    db.add_all(scans)
+    await db.flush()
+    # Explicit timestamps: SQLite's CURRENT_TIMESTAMP has no sub-second part
+    db.add_all([
+        Alert(
+            site_id=scan.site_id,
+            scan_id=scan.id,
+            alert_type=AlertType.SCORE_DROP,
+            message=f"Score dropped ({i})",
+            created_at=BASE_TIME + timedelta(minutes=n * per_site + i)
+        )
+        for n, scan in enumerate(scans)
+        for i in range(per_site)
+    ])
+    await db.commit()
+    return sites
+
+
+async def test_alerts_feed_is_a_single_query(db, query_budget):
+    """Alerts and their site fields load together however many sites there are"""
+    await _seed_alerts(db, site_count=20, per_site=2)
+
+    with query_budget(1):
+        response = client.get("/alerts", params={"limit": 500})
+
+    assert response.status_code == 200
+    groups = response.json()
+    assert len(groups) == 20
+    assert groups[0]["site_domain"] == "site-19.example.com"  # newest alert first
+    assert all(len(group["alerts"]) == 2 for group in groups)
+    assert groups[0]["alerts"][0]["site_display_name"] == "Site 19"
+
+
+async def test_alerts_since_returns_only_newer_alerts(db):
+    """`since` is an exclusive watermark on created_at"""
+    await _seed_alerts(db, site_count=3, per_site=2)
+    watermark = BASE_TIME + timedelta(minutes=3)
+
+    response = client.get("/alerts", params={"since": watermark.isoformat()})
+
+    messages = [(group["site_domain"], alert["message"]) for group in response.json() for alert in group["alerts"]]
+    assert messages == [
+        ("site-2.example.com", "Score dropped (1)"),
+        ("site-2.example.com", "Score dropped (0)"),
+    ]
+    assert NEXT_CURSOR_HEADER not in response.headers
@@ -0,0 +1,113 @@
+"""
+Tests for the incremental Parquet/Arrow analytics export.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pyarrow.dataset as ds
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanRollup
+from app.models.site import Site
+from app.models.user import User
+from app.services.analytics_export import AnalyticsExporter
+from app.services.scan_persistence import apply_scan_result
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, ScanRollup.__table__]
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def _record_scan(db, created_at: datetime, findings: list) -> Scan:
+    result = ScanResult()
+    result.overall_score = 75.0
+    result.risk_level = "low"
+    result.findings = findings
+    scan = Scan(url="https://example.com", created_at=created_at)
+    db.add(scan)
+    await db.flush()
+    await apply_scan_result(db, scan, result)
+    await db.commit()
+    return scan
+
+
+def _finding(category: str, title: str) -> dict:
+    return {"category": category, "severity": "medium", "title": title, "description": title}
+
+
+def _dataset(path):
+    return ds.dataset(str(path), format="parquet", partitioning="hive").to_table()
+
+
+def exporter(path, **kwargs) -> AnalyticsExporter:
+    return AnalyticsExporter(str(path), session_factory=TestingSessionLocal, **kwargs)
+
+
+async def test_export_partitions_by_month_and_category(db, tmp_path):
+    september = await _record_scan(db, NOW - timedelta(days=40), [_finding("gdpr", "No cookie banner")])
+    for _ in range(3):
+        await _record_scan(db, NOW - timedelta(days=2), [_finding("security", "Missing HSTS"), _finding("seo", "No title")])
+
+    report = await exporter(tmp_path, batch_size=2).run(now=NOW)
+
+    assert (report.scans, report.findings) == (4, 7)
+    assert report.to_scan_id == september.id + 3
+    assert os.path.isdir(tmp_path / "scans" / "month=2026-09")
+    assert os.path.isdir(tmp_path / "findings" / "month=2026-10" / "category=security")
+    assert not any(name.endswith(".tmp") for _, _, files in os.walk(tmp_path) for name in files)
+
+    scans = _dataset(tmp_path / "scans")
+    assert sorted(scans.column("id").to_pylist()) == list(range(september.id, september.id + 4))
+    assert set(scans.column("risk_level").to_pylist()) == {"low"}
+    findings = _dataset(tmp_path / "findings").to_pylist()
+    assert {(f["category"], f["month"]) for f in findings} == {
+        ("gdpr", "2026-09"), ("security", "2026-10"), ("seo", "2026-10"),
+    }
+
+
+async def test_later_runs_export_only_new_settled_scans(db, tmp_path):
+    first = await _record_scan(db, NOW - timedelta(hours=2), [_finding("security", "Missing HSTS")])
+    assert (await exporter(tmp_path).run(now=NOW)).scans == 1
+
+    again = await exporter(tmp_path).run(now=NOW)
+    assert (again.scans, again.findings, again.files) == (0, 0, [])
+
+    second = await _record_scan(db, NOW - timedelta(hours=1), [_finding("security", "No CSP")])
+    await _record_scan(db, NOW - timedelta(seconds=30), [_finding("security", "Too fresh")])
+    report = await exporter(tmp_path, settle_seconds=300).run(now=NOW)
+    assert (report.from_scan_id, report.to_scan_id) == (first.id, second.id)
+    assert (report.scans, report.findings) == (1, 1)
+
+    titles = _dataset(tmp_path / "findings").column("title").to_pylist()
+    assert sorted(titles) == ["Missing HSTS", "No CSP"]
+
+    # The fresh scan goes out once it has settled
+    assert (await exporter(tmp_path).run(now=NOW + timedelta(minutes=10))).scans == 1
+
+
+async def test_arrow_format(db, tmp_path):
+    await _record_scan(db, NOW - timedelta(days=1), [_finding("security", "Missing HSTS")])
+    report = await exporter(tmp_path, file_format="arrow").run(now=NOW)
+    assert report.files and all(path.endswith(".arrow") for path in report.files)
+    table = ds.dataset(str(tmp_path / "findings"), format="ipc", partitioning="hive").to_table()
+    assert table.column("title").to_pylist() == ["Missing HSTS"]
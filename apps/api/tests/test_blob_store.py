@@ -0,0 +1,137 @@
+"""
+Tests for content-addressed raw response storage.
+"""
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.blob import Blob
+from app.models.scan import Scan
+from app.models.finding import Finding, FindingCategory, FindingSeverity
+from app.models.site import Site
+from app.models.user import User
+from app.services.blob_store import BlobStore
+from app.services.scan_persistence import apply_scan_result
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__]
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def _count(db: AsyncSession, model) -> int:
+    return await db.scalar(select(func.count()).select_from(model))
+
+
+def _scan_result(body: str) -> ScanResult:
+    result = ScanResult()
+    result.normalized_url = "https://example.com"
+    result.final_url = "https://example.com"
+    result.redirect_chain = ["https://example.com"]
+    result.response_status = 200
+    result.response_headers = {"server": "nginx", "content-type": "text/html"}
+    result.response_body = body
+    result.findings = [{
+        "category": FindingCategory.SECURITY,
+        "severity": FindingSeverity.LOW,
+        "title": "Missing Referrer-Policy",
+        "description": "No Referrer-Policy header",
+    }]
+    result.overall_score = 97.0
+    result.risk_level = "low"
+    return result
+
+
+async def test_put_roundtrip_and_dedup(db: AsyncSession):
+    """Identical payloads are stored once and read back unchanged"""
+    store = BlobStore(db)
+    payload = b"<html>" + b"cookie consent " * 5000 + b"</html>"
+
+    first = await store.put(payload)
+    second = await store.put(payload)
+    await db.commit()
+
+    assert first == second == BlobStore.digest(payload)
+    assert await _count(db, Blob) == 1
+
+    blob = await store.get(first)
+    assert blob.compression == "gzip"
+    assert blob.stored_size < blob.size == len(payload)
+    assert BlobStore.read(blob) == payload
+
+
+async def test_incompressible_data_stored_as_identity(db: AsyncSession):
+    """Payloads that don't shrink are kept uncompressed"""
+    store = BlobStore(db)
+    digest = await store.put(b"x")
+    await db.commit()
+
+    blob = await store.get(digest)
+    assert blob.compression == "identity"
+    assert BlobStore.read(blob) == b"x"
+
+
+async def test_header_sets_are_canonicalized(db: AsyncSession):
+    """Header order does not affect the blob key"""
+    store = BlobStore(db)
+    a = await store.put_headers({"server": "nginx", "content-type": "text/html"})
+    b = await store.put_headers({"content-type": "text/html", "server": "nginx"})
+    assert a == b
+
+
+async def test_rescans_share_blobs(db: AsyncSession):
+    """Two scans with the same response reference the same blobs"""
+    scans = []
+    for _ in range(2):
+        scan = Scan(url="https://example.com")
+        db.add(scan)
+        await db.flush()
+        await apply_scan_result(db, scan, _scan_result("<html>same body</html>"))
+        await db.commit()
+        scans.append(scan)
+
+    assert scans[0].response_body_sha256 == scans[1].response_body_sha256
+    assert scans[0].response_headers_sha256 == scans[1].response_headers_sha256
+    assert await _count(db, Blob) == 2
+    assert await _count(db, Finding) == 2
+    blob = await BlobStore(db).get(scans[0].response_body_sha256)
+    assert BlobStore.read(blob) == b"<html>same body</html>"
+
+
+async def test_blob_referenced_during_compaction_is_kept(db: AsyncSession, monkeypatch):
+    """A blob that gains a reference after compaction picked its candidates is not deleted"""
+    store = BlobStore(db)
+    reused = await store.put(b"<html>reused body</html>")
+    orphan = await store.put(b"<html>orphaned body</html>")
+    await db.commit()
+    orphan_size = (await store.get(orphan)).stored_size
+
+    lock_candidates = db.scalars
+
+    async def scalars_then_reuse(statement, *args, **kwargs):
+        result = await lock_candidates(statement, *args, **kwargs)
+        # Another scan reuses a candidate between compaction's select and its delete
+        db.add(Scan(url="https://example.com", response_body_sha256=reused))
+        await db.flush()
+        return result
+
+    monkeypatch.setattr(db, "scalars", scalars_then_reuse)
+    assert await store.delete_unreferenced([reused, orphan]) == (1, orphan_size)
+    monkeypatch.undo()
+    await db.commit()
+
+    stored = (await db.scalars(select(Blob.sha256))).all()
+    assert stored == [reused]
@@ -0,0 +1,90 @@
+"""
+Tests for brand logos stored in the blob store and served with ETags.
+"""
+import base64
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import brands as brand_routes
+from app.db.database import Base, get_db
+from app.models.blob import Blob
+from app.models.brand_profile import BrandProfile
+from app.services.brand_logos import decode_logo
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [Blob.__table__, BrandProfile.__table__]
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+PNG_BASE64 = base64.b64encode(PNG).decode("ascii")
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(brand_routes.router, prefix="/brands")
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def test_decode_logo_accepts_raw_base64_and_data_uris():
+    assert decode_logo(PNG_BASE64) == (PNG, "image/png")
+    assert decode_logo(f"data:image/png;base64,{PNG_BASE64}") == (PNG, "image/png")
+    with pytest.raises(ValueError):
+        decode_logo("not base64!")
+    with pytest.raises(ValueError):
+        decode_logo(base64.b64encode(b"plain text, not an image").decode())
+
+
+async def test_logos_are_deduplicated_and_kept_out_of_listings(db, query_budget):
+    for name, logo in (("Agency A", PNG_BASE64), ("Agency B", f"data:image/png;base64,{PNG_BASE64}")):
+        response = client.post("/brands", json={"name": name, "logo_base64": logo})
+        assert response.status_code == 201
+        assert response.json()["logo_url"].startswith(f"/brands/{response.json()['id']}/logo?v=")
+        assert "logo_base64" not in response.json()
+
+    assert await db.scalar(select(func.count()).select_from(Blob)) == 1
+
+    with query_budget(1) as queries:
+        listing = client.get("/brands").json()
+    assert len(listing) == 2
+    assert "blobs" not in queries.statements[0]
+
+
+async def test_logo_endpoint_serves_bytes_with_etag(db):
+    brand_id = client.post("/brands", json={"name": "Agency", "logo_base64": PNG_BASE64}).json()["id"]
+
+    response = client.get(f"/brands/{brand_id}/logo")
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    etag = response.headers["etag"]
+
+    revalidated = client.get(f"/brands/{brand_id}/logo", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    no_logo = client.post("/brands", json={"name": "Plain"}).json()["id"]
+    assert client.get(f"/brands/{no_logo}/logo").status_code == 404
+    assert client.post("/brands", json={"name": "Bad", "logo_base64": "%%%"}).status_code == 400
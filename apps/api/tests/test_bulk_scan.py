@@ -0,0 +1,81 @@
+"""
+Tests for the bulk NDJSON scanning CLI.
+"""
+import io
+import json
+import pytest
+import respx
+import httpx
+
+from app.cli.bulk_scan import Checkpoint, run_bulk_scan
+
+
+def _mock_site(domain: str):
+    respx.get(f"https://{domain}").mock(return_value=httpx.Response(
+        200,
+        text="<html></html>",
+        headers={"Strict-Transport-Security": "max-age=31536000"}
+    ))
+    respx.get(f"https://{domain}/robots.txt").mock(return_value=httpx.Response(404))
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_bulk_scan_writes_ndjson():
+    """Each input domain produces one NDJSON record; comment and blank lines don't stall the checkpoint"""
+    for domain in ("a.example.com", "b.example.com", "c.example.com"):
+        _mock_site(domain)
+
+    input_file = io.StringIO("a.example.com\n# comment\n\nb.example.com\nc.example.com\n")
+    output_file = io.StringIO()
+    checkpoint = Checkpoint(None)
+
+    summary = await run_bulk_scan(input_file, output_file, concurrency=2, per_host=1, checkpoint=checkpoint)
+
+    records = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert sorted(r["input"] for r in records) == ["a.example.com", "b.example.com", "c.example.com"]
+    assert all(r["status"] == 200 and r["error"] is None for r in records)
+    assert summary["scanned"] == 3
+    assert summary["failed"] == 0
+    assert summary["latency_ms"]["p95"] is not None
+    assert checkpoint.watermark == 3
+    assert checkpoint.done == set()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_bulk_scan_resumes_from_checkpoint(tmp_path):
+    """Lines recorded in the checkpoint are skipped on resume"""
+    _mock_site("a.example.com")
+    _mock_site("b.example.com")
+    respx.get("https://down.example.com").mock(side_effect=httpx.ConnectError("refused"))
+
+    checkpoint_path = str(tmp_path / "scan.ckpt")
+    checkpoint = Checkpoint(checkpoint_path)
+    checkpoint.mark_done(0)
+    checkpoint.save()
+
+    input_file = io.StringIO("a.example.com\nb.example.com\ndown.example.com\n")
+    output_file = io.StringIO()
+    summary = await run_bulk_scan(input_file, output_file, concurrency=4, checkpoint=Checkpoint(checkpoint_path))
+
+    records = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert sorted(r["input"] for r in records) == ["b.example.com", "down.example.com"]
+    assert summary["skipped"] == 1
+    assert summary["failed"] == 1
+
+    resumed = Checkpoint(checkpoint_path)
+    assert resumed.watermark == 3
+    assert resumed.done == set()
+
+
+def test_checkpoint_watermark_advances_over_gaps():
+    """Out-of-order completions only advance the watermark once contiguous"""
+    checkpoint = Checkpoint(None)
+    checkpoint.mark_done(1)
+    checkpoint.mark_done(2)
+    assert checkpoint.watermark == 0
+    assert checkpoint.is_done(2)
+    checkpoint.mark_done(0)
+    assert checkpoint.watermark == 3
+    assert checkpoint.done == set()
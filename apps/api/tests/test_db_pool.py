@@ -0,0 +1,68 @@
+"""
+Tests for connection pool instrumentation.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.metrics import Histogram
+from app.db.pool import InstrumentedQueuePool, PoolMetrics, instrument_engine
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1
+    )
+    metrics = instrument_engine(engine, PoolMetrics("test", warn_threshold_ms=50))
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram([1, 10, 100])
+    for value in (0.5, 5, 5, 50, 500):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"1": 1, "10": 3, "100": 4, "+Inf": 5}
+    assert snapshot["count"] == 5
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts(pool_engine, capsys):
+    """Exhausting the pool shows up as overflow, a timeout and a slow-checkout warning"""
+    engine, metrics = pool_engine
+
+    first = engine.connect()
+    second = engine.connect()  # beyond pool_size: an overflow connection
+    first.execute(text("SELECT 1"))
+    assert metrics.checked_out == 2
+    assert metrics.overflow_events == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert metrics.checkout_timeouts == 1
+    assert metrics.slow_checkouts == 1
+    assert "DB pool checkout waited" in capsys.readouterr().out
+
+    first.close()
+    second.close()
+    snapshot = metrics.snapshot()
+    assert snapshot["checked_out"] == 0
+    assert snapshot["peak_checked_out"] == 2
+    assert snapshot["wait_ms"]["count"] == 3
+    assert snapshot["max_overflow"] == 1
+
+
+def test_metrics_survive_dispose(pool_engine):
+    """engine.dispose() replaces the pool but keeps reporting into the same metrics"""
+    engine, metrics = pool_engine
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert engine.pool.metrics is metrics
+    assert metrics.pool is engine.pool
+    assert metrics.wait_ms.count == 1
@@ -3,22 +3,22 @@ import respx
 import httpx
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from main import app
-from app.db.database import Base, get_db
+from app.db.database import Base, get_db, get_scan_read_db
 
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture(scope="function")
@@ -29,6 +29,7 @@ def test_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_scan_read_db] = override_get_db
 client = TestClient(app)
 
 
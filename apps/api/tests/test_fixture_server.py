@@ -0,0 +1,37 @@
+"""
+Smoke tests for the benchmark fixture server.
+"""
+import pytest
+import httpx
+
+from app.services.scanner import ScannerService
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+
+
+@pytest.mark.asyncio
+async def test_scanner_against_fixture_server():
+    """Virtual hosts serve deterministic profiles the scanner can follow"""
+    config = FixtureConfig(hosts=10, latency_ms=0, latency_jitter_ms=0, failure_rate=0, addressing="proxy")
+    server = FixtureServer(config)
+    await server.start()
+    try:
+        transport = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(server.proxy_url()))
+        async with httpx.AsyncClient(mounts={"http://": transport}) as client:
+            scanner = ScannerService(client=client)
+            for index in range(3):
+                profile = server.profile(index)
+                result = await scanner.scan_url(server.host_url(index))
+
+                assert result.response_status == 200
+                assert len(result.redirect_chain) == max(2, profile.redirects + 1)
+                assert len(result.response_body) == min(profile.body_bytes, 50000)
+                assert result.response_headers["server"] == dict(profile.headers)["Server"]
+    finally:
+        await server.stop()
+
+
+def test_host_profiles_are_deterministic():
+    """The same seed yields the same virtual host profiles"""
+    first = FixtureServer(FixtureConfig(seed=7))
+    second = FixtureServer(FixtureConfig(seed=7))
+    assert [first.profile(i) for i in range(20)] == [second.profile(i) for i in range(20)]
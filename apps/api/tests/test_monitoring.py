@@ -2,55 +2,62 @@
 Tests for monitoring and alerts functionality.
 """
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from datetime import datetime, timezone, timedelta
 
 from app.models.site import Site
 from app.models.scan import Scan, RiskLevel
+from app.models.scan_rollup import ScanRollup
 from app.models.finding import Finding, FindingSeverity
 from app.models.monitoring_config import MonitoringConfig, MonitoringFrequency
 from app.models.alert import Alert, AlertType
+from app.models.blob import Blob
+from app.models.user import User
 from app.services.monitoring_service import MonitoringService
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from app.db.database import Base
 
 # Use same test database setup as test_scan
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Only the tables monitoring touches (some others use Postgres-only column types)
+TABLES = [
+    User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__,
+    MonitoringConfig.__table__, Alert.__table__, ScanRollup.__table__,
+]
 
 
 @pytest.fixture(scope="function")
-def test_db():
+async def test_db():
     """Create test database tables"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
     yield
-    Base.metadata.drop_all(bind=engine)
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
 
 
 @pytest.fixture
-def db(test_db):
+async def db(test_db):
     """Get a database session"""
-    db = TestingSessionLocal()
-    try:
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture
-def test_site(db: Session) -> Site:
+async def test_site(db: AsyncSession) -> Site:
     """Create a test site"""
     site = Site(domain="example.com", display_name="Example Site")
     db.add(site)
-    db.commit()
-    db.refresh(site)
+    await db.commit()
+    await db.refresh(site)
     return site
 
 
 @pytest.fixture
-def monitoring_config(db: Session, test_site: Site) -> MonitoringConfig:
+async def monitoring_config(db: AsyncSession, test_site: Site) -> MonitoringConfig:
     """Create a test monitoring config"""
     config = MonitoringConfig(
         site_id=test_site.id,
@@ -58,12 +65,12 @@ def monitoring_config(db: Session, test_site: Site) -> MonitoringConfig:
         enabled=True
     )
     db.add(config)
-    db.commit()
-    db.refresh(config)
+    await db.commit()
+    await db.refresh(config)
     return config
 
 
-def test_monitoring_config_crud(db: Session, test_site: Site):
+async def test_monitoring_config_crud(db: AsyncSession, test_site: Site):
     """Test creating, reading, and updating monitoring config"""
     # Create
     config = MonitoringConfig(
@@ -72,8 +79,8 @@ def test_monitoring_config_crud(db: Session, test_site: Site):
         enabled=False
     )
     db.add(config)
-    db.commit()
-    db.refresh(config)
+    await db.commit()
+    await db.refresh(config)
     
     assert config.id is not None
     assert config.site_id == test_site.id
@@ -81,15 +88,15 @@ def test_monitoring_config_crud(db: Session, test_site: Site):
     assert config.enabled is False  # Default should be False
     
     # Read
-    found = db.query(MonitoringConfig).filter(MonitoringConfig.site_id == test_site.id).first()
+    found = await db.scalar(select(MonitoringConfig).where(MonitoringConfig.site_id == test_site.id))
     assert found is not None
     assert found.id == config.id
     
     # Update
     found.enabled = True
     found.frequency = MonitoringFrequency.MONTHLY
-    db.commit()
-    db.refresh(found)
+    await db.commit()
+    await db.refresh(found)
     
     assert found.enabled is True
     assert found.frequency == MonitoringFrequency.MONTHLY
@@ -138,7 +145,7 @@ def test_should_run_scan_monthly_due(monitoring_config: MonitoringConfig):
     assert service.should_run_scan(monitoring_config) is True
 
 
-def test_detect_score_drop_alert(db: Session, test_site: Site):
+async def test_detect_score_drop_alert(db: AsyncSession, test_site: Site):
     """Test that score drop alert is created when score drops by >= 10"""
     # Create previous scan with high score
     previous_scan = Scan(
@@ -148,7 +155,7 @@ def test_detect_score_drop_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.LOW
     )
     db.add(previous_scan)
-    db.commit()
+    await db.commit()
     
     # Create new scan with lower score
     new_scan = Scan(
@@ -158,11 +165,11 @@ def test_detect_score_drop_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.MEDIUM
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     assert len(alerts) == 1
     assert alerts[0].alert_type == AlertType.SCORE_DROP
@@ -170,7 +177,7 @@ def test_detect_score_drop_alert(db: Session, test_site: Site):
     assert "15.0" in alerts[0].message or "15" in alerts[0].message
 
 
-def test_detect_score_drop_no_alert_small_drop(db: Session, test_site: Site):
+async def test_detect_score_drop_no_alert_small_drop(db: AsyncSession, test_site: Site):
     """Test that no alert is created for small score drops"""
     # Create previous scan
     previous_scan = Scan(
@@ -180,7 +187,7 @@ def test_detect_score_drop_no_alert_small_drop(db: Session, test_site: Site):
         risk_level=RiskLevel.LOW
     )
     db.add(previous_scan)
-    db.commit()
+    await db.commit()
     
     # Create new scan with small drop
     new_scan = Scan(
@@ -190,16 +197,16 @@ def test_detect_score_drop_no_alert_small_drop(db: Session, test_site: Site):
         risk_level=RiskLevel.LOW
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     assert len(alerts) == 0
 
 
-def test_detect_new_critical_alert(db: Session, test_site: Site):
+async def test_detect_new_critical_alert(db: AsyncSession, test_site: Site):
     """Test that alert is created when new critical finding appears"""
     # Create previous scan with no critical findings
     previous_scan = Scan(
@@ -209,7 +216,7 @@ def test_detect_new_critical_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.LOW
     )
     db.add(previous_scan)
-    db.commit()
+    await db.commit()
     
     # Add a low severity finding to previous scan
     finding1 = Finding(
@@ -220,7 +227,7 @@ def test_detect_new_critical_alert(db: Session, test_site: Site):
         description="A minor issue"
     )
     db.add(finding1)
-    db.commit()
+    await db.commit()
     
     # Create new scan with critical finding
     new_scan = Scan(
@@ -230,7 +237,7 @@ def test_detect_new_critical_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.CRITICAL
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     # Add critical finding
     critical_finding = Finding(
@@ -241,11 +248,11 @@ def test_detect_new_critical_alert(db: Session, test_site: Site):
         description="A critical issue"
     )
     db.add(critical_finding)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     assert len(alerts) >= 1
     critical_alerts = [a for a in alerts if a.alert_type == AlertType.NEW_CRITICAL]
@@ -253,7 +260,7 @@ def test_detect_new_critical_alert(db: Session, test_site: Site):
     assert "critical" in critical_alerts[0].message.lower()
 
 
-def test_detect_new_high_alert(db: Session, test_site: Site):
+async def test_detect_new_high_alert(db: AsyncSession, test_site: Site):
     """Test that alert is created when new high severity finding appears"""
     # Create previous scan
     previous_scan = Scan(
@@ -263,7 +270,7 @@ def test_detect_new_high_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.LOW
     )
     db.add(previous_scan)
-    db.commit()
+    await db.commit()
     
     # Create new scan with high finding
     new_scan = Scan(
@@ -273,7 +280,7 @@ def test_detect_new_high_alert(db: Session, test_site: Site):
         risk_level=RiskLevel.HIGH
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     # Add high finding
     high_finding = Finding(
@@ -284,11 +291,11 @@ def test_detect_new_high_alert(db: Session, test_site: Site):
         description="A high severity issue"
     )
     db.add(high_finding)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     assert len(alerts) >= 1
     high_alerts = [a for a in alerts if a.alert_type == AlertType.NEW_HIGH]
@@ -296,7 +303,7 @@ def test_detect_new_high_alert(db: Session, test_site: Site):
     assert "high" in high_alerts[0].message.lower()
 
 
-def test_detect_no_alert_same_findings(db: Session, test_site: Site):
+async def test_detect_no_alert_same_findings(db: AsyncSession, test_site: Site):
     """Test that no alert is created if same findings exist in both scans"""
     # Create previous scan with critical finding
     previous_scan = Scan(
@@ -306,7 +313,7 @@ def test_detect_no_alert_same_findings(db: Session, test_site: Site):
         risk_level=RiskLevel.CRITICAL
     )
     db.add(previous_scan)
-    db.commit()
+    await db.commit()
     
     finding1 = Finding(
         scan_id=previous_scan.id,
@@ -316,7 +323,7 @@ def test_detect_no_alert_same_findings(db: Session, test_site: Site):
         description="A critical issue"
     )
     db.add(finding1)
-    db.commit()
+    await db.commit()
     
     # Create new scan with same critical finding
     new_scan = Scan(
@@ -326,7 +333,7 @@ def test_detect_no_alert_same_findings(db: Session, test_site: Site):
         risk_level=RiskLevel.CRITICAL
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     finding2 = Finding(
         scan_id=new_scan.id,
@@ -336,18 +343,18 @@ def test_detect_no_alert_same_findings(db: Session, test_site: Site):
         description="A critical issue"
     )
     db.add(finding2)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     # Should not create new_critical alert since it's the same finding
     critical_alerts = [a for a in alerts if a.alert_type == AlertType.NEW_CRITICAL]
     assert len(critical_alerts) == 0
 
 
-def test_detect_alerts_no_previous_scan(db: Session, test_site: Site):
+async def test_detect_alerts_no_previous_scan(db: AsyncSession, test_site: Site):
     """Test that no alerts are created if there's no previous scan"""
     # Create first scan
     new_scan = Scan(
@@ -357,11 +364,11 @@ def test_detect_alerts_no_previous_scan(db: Session, test_site: Site):
         risk_level=RiskLevel.CRITICAL
     )
     db.add(new_scan)
-    db.commit()
+    await db.commit()
     
     # Detect alerts
     service = MonitoringService()
-    alerts = service.detect_alerts(new_scan, db)
+    alerts = await service.detect_alerts(new_scan, db)
     
     # Should not create alerts without previous scan to compare
     assert len(alerts) == 0
@@ -0,0 +1,136 @@
+"""
+Tests for monthly partition maintenance helpers.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.alert import Alert
+from app.models.blob import Blob
+from app.models.finding import Finding, FindingCategory, FindingSeverity
+from app.models.scan import Scan
+from app.models.shared_report_link import SharedReportLink
+from app.models.site import Site
+from app.models.user import User
+from app.services.partition_manager import PartitionManager, add_months, month_bound, partition_name
+
+TABLES = [
+    User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__,
+    Alert.__table__, SharedReportLink.__table__,
+]
+
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    """Stands in for a Postgres session: records the statements maintenance executes"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+
+class FixedPartitionManager(PartitionManager):
+    """Preset partitions and retained-row answers instead of querying the catalog"""
+
+    def __init__(self, partitions, retained, **kwargs):
+        super().__init__(**kwargs)
+        self._partitions = partitions
+        self.retained = retained
+
+    async def partitions(self, db, table):
+        return self._partitions
+
+    async def holds_retained_rows(self, db, table, partition, now):
+        return partition in self.retained
+
+
+def test_month_arithmetic_and_naming():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 1, 1), -24) == date(2024, 1, 1)
+    assert partition_name("findings", date(2026, 3, 1)) == "findings_y2026m03"
+    assert month_bound(date(2026, 3, 1)) == "2026-03-01 00:00:00+00"
+
+
+async def test_maintenance_is_a_no_op_without_postgres(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'partitions.db'}")
+    async with async_sessionmaker(engine)() as db:
+        summary = await PartitionManager(months_ahead=3, retention_months=24).maintain(db)
+    await engine.dispose()
+    assert "skipped" in summary
+
+
+def test_partitions_are_kept_attached_by_default():
+    assert PartitionManager().retention_months == 0
+
+
+async def test_expired_partitions_holding_retained_scans_stay_attached():
+    """Only expired partitions without retained rows are detached"""
+    db = RecordingSession()
+    manager = FixedPartitionManager(
+        ["scans_default", "scans_y2024m01", "scans_y2024m02", "scans_y2026m10"],
+        retained={"scans_y2024m01"},
+        retention_months=24,
+    )
+
+    detached = await manager.detach_expired_partitions(db, "scans", date(2026, 10, 19))
+
+    assert detached == ["scans_y2024m02"]
+    assert db.statements == ["ALTER TABLE scans DETACH PARTITION scans_y2024m02"]
+
+    keep_all = FixedPartitionManager(["scans_y2024m02"], retained=set(), retention_months=0)
+    assert await keep_all.detach_expired_partitions(RecordingSession(), "scans", date(2026, 10, 19)) == []
+
+
+async def test_retained_rows_follow_retention_policies(tmp_path):
+    """Latest, shared, unlimited-policy and in-window scans (and their findings) count as retained"""
+    url = tmp_path / "retained.db"
+    Base.metadata.create_all(bind=create_engine(f"sqlite:///{url}"), tables=TABLES)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    manager = PartitionManager(retention_months=24)
+    old = NOW - timedelta(days=1000)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        standard = Site(domain="example.com", display_name="Example", retention_policy="standard")
+        unlimited = Site(domain="kept.example.com", display_name="Kept", retention_policy="unlimited")
+        db.add_all([standard, unlimited])
+        await db.flush()
+        expired = Scan(url="https://example.com", site_id=standard.id, created_at=old)
+        db.add(expired)
+        await db.flush()
+        db.add(Finding(scan_id=expired.id, category=FindingCategory.SECURITY, severity=FindingSeverity.LOW,
+                       title="Issue", description="Details"))
+        await db.commit()
+
+        assert not await manager.holds_retained_rows(db, "scans", "scans", NOW)
+        assert not await manager.holds_retained_rows(db, "findings", "findings", NOW)
+
+        standard.latest_scan_id = expired.id
+        await db.commit()
+        assert await manager.holds_retained_rows(db, "scans", "scans", NOW)
+        assert await manager.holds_retained_rows(db, "findings", "findings", NOW)
+
+        standard.latest_scan_id = None
+        link = SharedReportLink(scan_id=expired.id)
+        db.add(link)
+        await db.commit()
+        assert await manager.holds_retained_rows(db, "findings", "findings", NOW)
+
+        await db.delete(link)
+        expired.site_id = unlimited.id
+        await db.commit()
+        assert await manager.holds_retained_rows(db, "findings", "findings", NOW)
+
+        expired.site_id = standard.id
+        await db.commit()
+        assert not await manager.holds_retained_rows(db, "scans", "scans", NOW)
+
+        expired.created_at = NOW - timedelta(days=10)
+        await db.commit()
+        assert await manager.holds_retained_rows(db, "scans", "scans", NOW)
+    await engine.dispose()
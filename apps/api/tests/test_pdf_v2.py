@@ -63,7 +63,7 @@ def sample_brand():
     brand.primary_color = "#1E40AF"
     brand.accent_color = "#22C55E"
     brand.footer_text = "Custom footer"
-    brand.logo_base64 = None
+    brand.logo = None
     return brand
 
 
@@ -0,0 +1,163 @@
+"""
+Tests for portfolio aggregates and GET /portfolio/stats.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import portfolio as portfolio_routes
+from app.db.database import Base, get_read_db
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.materialized_view_refresh import MaterializedViewRefresh
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanRollup
+from app.models.site import Site
+from app.models.user import User
+from app.services.portfolio_stats import REFRESH_NAME, VIEWS, portfolio_stats
+from app.services.scan_persistence import apply_scan_result
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [
+    User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__,
+    ScanRollup.__table__, MaterializedViewRefresh.__table__,
+]
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(portfolio_routes.router, prefix="/portfolio")
+app.dependency_overrides[get_read_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+    with engine.begin() as conn:
+        for name in VIEWS:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Background refreshes scheduled by the endpoint"""
+    scheduled = []
+
+    async def record():
+        scheduled.append(True)
+
+    monkeypatch.setattr(portfolio_routes, "refresh_portfolio_stats", record)
+    return scheduled
+
+
+def _finding(title: str, severity: str) -> dict:
+    return {"category": "security", "severity": severity, "title": title, "description": title}
+
+
+async def _record_scan(db, site: Site, score: float, risk_level: str, findings: list) -> Scan:
+    result = ScanResult()
+    result.overall_score = score
+    result.risk_level = risk_level
+    result.findings = findings
+    scan = Scan(url=f"https://{site.domain}", site_id=site.id)
+    db.add(scan)
+    await db.flush()
+    await apply_scan_result(db, scan, result)
+    await db.commit()
+    return scan
+
+
+async def _seed(db):
+    sites = [Site(domain=f"site-{i}.example.com", display_name=f"Site {i}") for i in range(3)]
+    db.add_all(sites)
+    await db.commit()
+    # Only each site's latest scan counts
+    await _record_scan(db, sites[0], 20.0, "critical", [_finding("Old problem", "critical")])
+    await _record_scan(db, sites[0], 60.0, "medium", [_finding("Missing HSTS", "medium"), _finding("No CSP", "high")])
+    await _record_scan(db, sites[1], 80.0, "low", [_finding("Missing HSTS", "medium")])
+    return sites  # site 2 is never scanned
+
+
+async def test_refresh_aggregates_latest_scans(db):
+    await _seed(db)
+    duration_ms = await portfolio_stats.refresh(db)
+    assert duration_ms is not None
+
+    snapshot = await portfolio_stats.read(db)
+    assert snapshot.total_sites == 3
+    assert snapshot.scanned_sites == 2
+    assert snapshot.average_score == 70.0
+    assert snapshot.sites_by_risk_level == {"medium": 1, "low": 1, "unscanned": 1}
+    assert [(f["title"], f["severity"], f["site_count"]) for f in snapshot.top_findings] == [
+        ("Missing HSTS", "medium", 2),
+        ("No CSP", "high", 1),
+    ]
+    assert snapshot.refresh_duration_ms == duration_ms
+    assert 0 <= snapshot.staleness_seconds < 60
+
+
+async def test_reads_serve_last_refresh_until_refreshed_again(db):
+    sites = await _seed(db)
+    await portfolio_stats.refresh(db)
+
+    await _record_scan(db, sites[2], 40.0, "high", [_finding("No CSP", "high")])
+    assert (await portfolio_stats.read(db)).scanned_sites == 2
+
+    await portfolio_stats.refresh(db)
+    snapshot = await portfolio_stats.read(db)
+    assert snapshot.scanned_sites == 3
+    assert snapshot.average_score == 60.0
+    assert {f["title"]: f["site_count"] for f in snapshot.top_findings} == {"Missing HSTS": 2, "No CSP": 2}
+
+
+async def test_stats_endpoint_reports_freshness(db, refreshes, query_budget):
+    await _seed(db)
+    await portfolio_stats.refresh(db)
+
+    with query_budget(3):
+        response = client.get("/portfolio/stats?top_findings=1")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_sites"] == 3
+    assert len(body["top_findings"]) == 1
+    assert body["refreshed_at"] is not None
+    assert body["refresh_scheduled"] is False
+    assert refreshes == []
+
+
+async def test_stale_stats_schedule_a_refresh(db, refreshes):
+    response = client.get("/portfolio/stats")
+    assert response.json()["refreshed_at"] is None
+    assert response.json()["refresh_scheduled"] is True
+
+    await _seed(db)
+    await portfolio_stats.refresh(db)
+    refresh = await db.get(MaterializedViewRefresh, REFRESH_NAME)
+    refresh.refreshed_at = datetime.now(timezone.utc) - timedelta(seconds=portfolio_stats.max_age + 60)
+    await db.commit()
+
+    body = client.get("/portfolio/stats").json()
+    assert body["total_sites"] == 3  # stale data is still served
+    assert body["staleness_seconds"] > portfolio_stats.max_age
+    assert body["refresh_scheduled"] is True
+    assert len(refreshes) == 2
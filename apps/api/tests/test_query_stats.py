@@ -0,0 +1,67 @@
+"""
+Tests for per-request query counting (X-DB-Queries / X-DB-Time).
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import sites as sites_routes
+from app.db.database import Base, get_read_db
+from app.db.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
+from app.models.site import Site
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [Site.__table__]
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+def make_client(**thresholds) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, **thresholds)
+    app.include_router(sites_routes.router, prefix="/sites")
+    app.dependency_overrides[get_read_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def test_responses_report_query_count_and_time(db, capsys):
+    db.add(Site(domain="example.com", display_name="Example"))
+    await db.commit()
+    client = make_client()
+
+    response = client.get("/sites")
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert float(response.headers[QUERY_TIME_HEADER]) >= 0
+
+    response = client.get("/sites/999")  # 404s still report their queries
+    assert response.status_code == 404
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert "ran 1 queries" not in capsys.readouterr().out
+
+
+async def test_requests_over_budget_are_logged(db, capsys):
+    client = make_client(query_warn=0)
+
+    client.get("/sites")
+
+    assert "GET /sites ran 1 queries" in capsys.readouterr().out
@@ -0,0 +1,139 @@
+"""
+Tests for read replica routing: lag-aware replica choice, read-your-writes
+stickiness and primary fallback for rows a replica hasn't replayed yet.
+"""
+import os
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import shared as shared_routes
+from app.db import database
+from app.db.database import Base, get_scan_read_db
+from app.db.replicas import RecentWrites, Replica, ReplicaRouter
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.scan import RiskLevel, Scan
+from app.models.shared_report_link import SharedReportLink
+from app.models.site import Site
+from app.models.user import User
+
+# The primary is test.db; test_replica.db stands in for a replica that is behind
+engine = create_engine("sqlite:///./test.db", connect_args={"check_same_thread": False})
+replica_sync_engine = create_engine("sqlite:///./test_replica.db", connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+replica_engine = create_async_engine("sqlite+aiosqlite:///./test_replica.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, SharedReportLink.__table__]
+
+app = FastAPI()
+app.include_router(shared_routes.router, prefix="/shared")
+client = TestClient(app)
+
+
+class FixedLagRouter(ReplicaRouter):
+    """Reports preset lag values instead of querying the replica"""
+
+    def __init__(self, replicas, lags, max_lag_seconds=5.0):
+        super().__init__(replicas, max_lag_seconds=max_lag_seconds, check_interval=0.0)
+        self.lags = lags
+
+    async def measure_lag(self, replica):
+        return self.lags[replica.name]
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    Base.metadata.create_all(bind=replica_sync_engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    await replica_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+    Base.metadata.drop_all(bind=replica_sync_engine, tables=TABLES)
+    replica_sync_engine.dispose()
+    if os.path.exists("./test_replica.db"):
+        os.remove("./test_replica.db")
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch):
+    """Route reads to the (empty) replica database and primary reads to test.db"""
+    router = ReplicaRouter([Replica.for_engine("replica1", replica_engine)], max_lag_seconds=5.0, check_interval=60.0)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(database, "AsyncSessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(database, "recent_scan_writes", RecentWrites(ttl=30.0))
+    return router
+
+
+async def test_router_skips_lagging_and_unreachable_replicas():
+    unreachable = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/replica.db", poolclass=NullPool)
+    fresh = [Replica.for_engine(name, replica_engine) for name in ("fresh1", "fresh2")]
+    router = FixedLagRouter(
+        [Replica.for_engine("behind", replica_engine), *fresh],
+        lags={"behind": 30.0, "fresh1": 0.5, "fresh2": 1.0}
+    )
+
+    chosen = [(await router.choose()).name for _ in range(4)]
+    assert "behind" not in chosen
+    assert set(chosen) == {"fresh1", "fresh2"}  # round-robin over healthy replicas
+
+    router.lags.update(fresh1=10.0, fresh2=10.0)
+    assert await router.choose() is None  # everything behind: read from the primary
+    assert router.primary_fallbacks == 1
+
+    down = ReplicaRouter([Replica.for_engine("down", unreachable)], max_lag_seconds=5.0, check_interval=60.0)
+    assert await down.choose() is None
+    assert down.stats()["replicas"]["down"]["healthy"] is False
+    assert down.stats()["replicas"]["down"]["error"]
+
+
+def test_recent_writes_expire():
+    now = [100.0]
+    recent = RecentWrites(ttl=30.0, clock=lambda: now[0])
+    recent.mark(7)
+
+    assert 7 in recent
+    assert 8 not in recent
+    now[0] += 31
+    assert 7 not in recent
+
+
+async def test_just_created_scan_is_read_from_primary(db, lagging_replica):
+    database.recent_scan_writes.mark(42)
+
+    sticky = get_scan_read_db(42)
+    session = await sticky.__anext__()
+    assert session.info.get("replica") is None
+    await sticky.aclose()
+
+    other = get_scan_read_db(43)
+    session = await other.__anext__()
+    assert session.info.get("replica") == "replica1"
+    await other.aclose()
+
+
+async def test_shared_report_falls_back_to_primary_when_replica_is_behind(db, lagging_replica):
+    # Written to the primary only; the replica hasn't replayed it
+    scan = Scan(url="https://example.com", overall_score=85.0, risk_level=RiskLevel.LOW)
+    db.add(scan)
+    await db.flush()
+    token = uuid4()
+    db.add(SharedReportLink(scan_id=scan.id, token=token))
+    await db.commit()
+
+    response = client.get(f"/shared/{token}")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == scan.id
+    assert lagging_replica.replica_reads == 1  # tried the replica first
+
+    assert client.get(f"/shared/{uuid4()}").status_code == 404
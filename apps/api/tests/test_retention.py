@@ -0,0 +1,204 @@
+"""
+Tests for scan history retention, write-time rollups and the score history endpoint.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import sites as sites_routes
+from app.db.database import Base, get_db, get_read_db
+from app.models.alert import Alert, AlertType
+from app.models.blob import Blob
+from app.models.brand_profile import BrandProfile
+from app.models.finding import Finding, FindingCategory, FindingSeverity
+from app.models.scan import Scan
+from app.models.scan_job import ScanJob
+from app.models.scan_rollup import RollupGranularity, ScanRollup
+from app.models.shared_report_link import SharedReportLink
+from app.models.site import Site
+from app.models.monitoring_config import MonitoringConfig
+from app.models.user import User
+from app.services.blob_store import BlobStore
+from app.services.retention import RetentionEngine
+from app.services.rollups import record_scan_rollups
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [
+    User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, Alert.__table__,
+    MonitoringConfig.__table__, ScanJob.__table__, SharedReportLink.__table__, ScanRollup.__table__,
+    BrandProfile.__table__,
+]
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(sites_routes.router, prefix="/sites")
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def _add_scan(db, site: Site, created_at: datetime, score: float, severities=()) -> Scan:
+    """Store a scan the way apply_scan_result does: findings plus rollups"""
+    scan = Scan(url=f"https://{site.domain}", site_id=site.id, overall_score=score, created_at=created_at)
+    db.add(scan)
+    await db.flush()
+    db.add_all([
+        Finding(scan_id=scan.id, category=FindingCategory.SECURITY, severity=severity, title="Issue", description="Details")
+        for severity in severities
+    ])
+    await record_scan_rollups(db, scan, severities)
+    return scan
+
+
+async def test_rollups_are_maintained_as_scans_are_written(db, query_budget):
+    """Each scan lands in its day, week and month; the history endpoint reads them back"""
+    site = Site(domain="example.com", display_name="Example")
+    db.add(site)
+    await db.flush()
+    # Wednesday, Thursday, and the following Monday (same month)
+    await _add_scan(db, site, datetime(2026, 3, 4, 9, tzinfo=timezone.utc), 60.0, [FindingSeverity.HIGH, FindingSeverity.LOW])
+    await _add_scan(db, site, datetime(2026, 3, 4, 18, tzinfo=timezone.utc), 80.0, [FindingSeverity.HIGH])
+    await _add_scan(db, site, datetime(2026, 3, 9, 9, tzinfo=timezone.utc), 70.0)
+    await db.commit()
+
+    with query_budget(2):  # site lookup + rollup range
+        days = client.get(f"/sites/{site.id}/history", params={"bucket": "day"}).json()["points"]
+    assert [(p["period_start"][:10], p["scan_count"]) for p in days] == [("2026-03-04", 2), ("2026-03-09", 1)]
+    assert (days[0]["score_min"], days[0]["score_max"], days[0]["score_avg"]) == (60.0, 80.0, 70.0)
+    assert (days[0]["high_count"], days[0]["low_count"]) == (2, 1)
+
+    weeks = client.get(f"/sites/{site.id}/history", params={"bucket": "week"}).json()["points"]
+    assert [(p["period_start"][:10], p["scan_count"]) for p in weeks] == [("2026-03-02", 2), ("2026-03-09", 1)]
+
+    months = client.get(f"/sites/{site.id}/history", params={"bucket": "month"}).json()["points"]
+    assert len(months) == 1
+    assert (months[0]["scan_count"], months[0]["score_min"], months[0]["score_max"]) == (3, 60.0, 80.0)
+
+    # `from` includes the whole bucket it falls in
+    response = client.get(f"/sites/{site.id}/history", params={"bucket": "week", "from": "2026-03-10T00:00:00Z"})
+    assert [p["period_start"][:10] for p in response.json()["points"]] == ["2026-03-09"]
+    assert client.get("/sites/999/history").status_code == 404
+
+
+async def test_old_scans_are_compacted_and_trends_survive(db):
+    """Scans past 90 days are deleted in batches; recent, latest and shared scans stay"""
+    site = Site(domain="example.com", display_name="Example")
+    db.add(site)
+    await db.flush()
+    old = [
+        await _add_scan(db, site, NOW - timedelta(days=200), 60.0, [FindingSeverity.HIGH, FindingSeverity.LOW]),
+        await _add_scan(db, site, NOW - timedelta(days=200, hours=1), 80.0, [FindingSeverity.HIGH]),
+        await _add_scan(db, site, NOW - timedelta(days=150), 70.0),
+    ]
+    shared = await _add_scan(db, site, NOW - timedelta(days=180), 50.0, [FindingSeverity.CRITICAL])
+    recent = await _add_scan(db, site, NOW - timedelta(days=10), 90.0, [FindingSeverity.INFO])
+    site.latest_scan_id = recent.id
+    db.add(SharedReportLink(scan_id=shared.id))
+    db.add(Alert(site_id=site.id, scan_id=old[0].id, alert_type=AlertType.NEW_HIGH, message="New high issue"))
+    await db.commit()
+    rollups_before = await db.scalar(select(func.count()).select_from(ScanRollup))
+
+    report = await RetentionEngine(batch_size=2).run(db, now=NOW)
+
+    assert report.complete
+    assert report.batches == 2  # three expired scans in batches of two
+    assert report.scans_compacted == 3
+    assert report.findings_deleted == 3
+    assert report.alerts_deleted == 1
+    assert report.bytes_reclaimed > 0
+    assert set((await db.scalars(select(Scan.id))).all()) == {shared.id, recent.id}
+    assert await db.scalar(select(func.count()).select_from(Finding)) == 2
+    assert await db.scalar(select(func.count()).select_from(ScanRollup)) == rollups_before
+
+    # Nothing left to do: a second pass is a no-op
+    assert (await RetentionEngine(batch_size=2).run(db, now=NOW)).batches == 0
+
+
+async def test_compaction_deletes_blobs_no_scan_references(db):
+    """Response blobs only compacted scans used are deleted and counted; shared ones stay"""
+    site = Site(domain="example.com", display_name="Example")
+    db.add(site)
+    await db.flush()
+    store = BlobStore(db, compression="gzip")
+    shared_body = await store.put(b"<html>" + b"same homepage " * 200 + b"</html>")
+    old_headers = await store.put_headers({"server": "old"})
+    old_body = await store.put(b"<html>" + b"old homepage " * 200 + b"</html>")
+    old_size = (await store.get(old_headers)).stored_size + (await store.get(old_body)).stored_size
+
+    old = await _add_scan(db, site, NOW - timedelta(days=200), 60.0)
+    old.response_headers_sha256, old.response_body_sha256 = old_headers, old_body
+    older = await _add_scan(db, site, NOW - timedelta(days=300), 60.0)
+    older.response_body_sha256 = shared_body
+    recent = await _add_scan(db, site, NOW - timedelta(days=10), 90.0)
+    recent.response_body_sha256 = shared_body
+    site.latest_scan_id = recent.id
+    await db.commit()
+    rows_only = await RetentionEngine()._estimate_bytes(db, Scan.__table__, Scan.id.in_([old.id, older.id]))
+
+    report = await RetentionEngine().run(db, now=NOW)
+
+    assert report.scans_compacted == 2
+    assert report.blobs_deleted == 2
+    assert report.bytes_reclaimed == rows_only + old_size
+    assert set((await db.scalars(select(Blob.sha256))).all()) == {shared_body}
+
+
+async def test_expired_daily_rollups_are_deleted_in_resumable_batches(db):
+    """Dailies past a year go, weekly/monthly rows stay; max_batches leaves a resumable pass"""
+    site = Site(domain="example.com", display_name="Example", retention_policy="standard")
+    other = Site(domain="other.example.com", display_name="Other", retention_policy="unlimited")
+    db.add_all([site, other])
+    await db.flush()
+    for current in (site, other):
+        for i in range(7):
+            await _add_scan(db, current, datetime(2025, 6, 2 + i, tzinfo=timezone.utc), 50.0 + i)
+        current.latest_scan_id = -1  # keep the test about rollups, not scans
+    await db.commit()
+    await db.execute(Scan.__table__.delete())
+    await db.commit()
+
+    engine = RetentionEngine(batch_size=3)
+    first = await engine.run(db, now=NOW, max_batches=2)
+    assert not first.complete
+    assert first.daily_rollups_deleted == 6
+
+    second = await engine.run(db, now=NOW)
+    assert second.complete
+    assert second.daily_rollups_deleted == 1
+
+    remaining = dict((await db.execute(
+        select(ScanRollup.granularity, func.count())
+        .where(ScanRollup.site_id == site.id)
+        .group_by(ScanRollup.granularity)
+    )).all())
+    assert remaining == {RollupGranularity.WEEKLY: 1, RollupGranularity.MONTHLY: 1}
+    # The unlimited site's dailies are untouched
+    assert await db.scalar(select(func.count()).select_from(ScanRollup).where(
+        ScanRollup.site_id == other.id, ScanRollup.granularity == RollupGranularity.DAILY
+    )) == 7
@@ -0,0 +1,94 @@
+"""
+Tests for scan priority lanes.
+"""
+import asyncio
+import pytest
+
+from app.services.scan_dispatcher import ScanDispatcher, ScanPriority
+
+
+def _dispatcher(max_concurrency=4, interactive=4, monitoring=2, bulk=1) -> ScanDispatcher:
+    return ScanDispatcher(
+        max_concurrency=max_concurrency,
+        lane_limits={
+            ScanPriority.INTERACTIVE: interactive,
+            ScanPriority.MONITORING: monitoring,
+            ScanPriority.BULK: bulk,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_lane_limits_are_enforced():
+    """A lane never exceeds its own budget even with global capacity free"""
+    dispatcher = _dispatcher(max_concurrency=8, monitoring=2)
+    peak = 0
+    
+    async def monitoring_scan():
+        nonlocal peak
+        async with dispatcher.slot(ScanPriority.MONITORING):
+            peak = max(peak, dispatcher.stats()["lanes"]["monitoring"]["in_flight"])
+            await asyncio.sleep(0.01)
+    
+    await asyncio.gather(*(monitoring_scan() for _ in range(10)))
+    assert peak == 2
+    assert dispatcher.in_flight == 0
+    assert dispatcher.stats()["lanes"]["monitoring"]["completed"] == 10
+
+
+@pytest.mark.asyncio
+async def test_interactive_not_blocked_by_saturated_monitoring():
+    """Interactive scans start immediately while monitoring is at its budget"""
+    dispatcher = _dispatcher(max_concurrency=4, interactive=2, monitoring=2)
+    release = asyncio.Event()
+    
+    async def monitoring_scan():
+        async with dispatcher.slot(ScanPriority.MONITORING):
+            await release.wait()
+    
+    background = [asyncio.create_task(monitoring_scan()) for _ in range(20)]
+    await asyncio.sleep(0)
+    assert dispatcher.stats()["lanes"]["monitoring"]["queued"] == 18
+    
+    await asyncio.wait_for(dispatcher.acquire(ScanPriority.INTERACTIVE), timeout=0.1)
+    dispatcher.release(ScanPriority.INTERACTIVE)
+    
+    release.set()
+    await asyncio.gather(*background)
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_dispatch_under_contention():
+    """Queued lanes share freed slots by weight, so lower lanes still progress"""
+    dispatcher = _dispatcher(max_concurrency=1, interactive=1, monitoring=1, bulk=1)
+    await dispatcher.acquire(ScanPriority.BULK)  # Occupy the only slot
+    order = []
+    
+    async def scan(lane: ScanPriority):
+        async with dispatcher.slot(lane):
+            order.append(lane)
+    
+    tasks = [asyncio.create_task(scan(ScanPriority.INTERACTIVE)) for _ in range(16)]
+    tasks += [asyncio.create_task(scan(ScanPriority.MONITORING)) for _ in range(6)]
+    await asyncio.sleep(0)
+    dispatcher.release(ScanPriority.BULK)
+    await asyncio.gather(*tasks)
+    
+    first_twelve = order[:12]
+    assert first_twelve.count(ScanPriority.INTERACTIVE) > first_twelve.count(ScanPriority.MONITORING) > 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    """Cancelling a queued acquire leaves capacity consistent"""
+    dispatcher = _dispatcher(max_concurrency=1)
+    await dispatcher.acquire(ScanPriority.BULK)
+    waiter = asyncio.create_task(dispatcher.acquire(ScanPriority.MONITORING))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    
+    dispatcher.release(ScanPriority.BULK)
+    assert dispatcher.in_flight == 0
+    await asyncio.wait_for(dispatcher.acquire(ScanPriority.INTERACTIVE), timeout=0.1)
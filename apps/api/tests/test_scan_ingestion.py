@@ -0,0 +1,102 @@
+"""
+Tests for write-behind scan ingestion.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanRollup
+from app.models.site import Site
+from app.models.user import User
+from app.services.scan_ingestion import IngestionClosed, ScanIngestionBuffer
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, ScanRollup.__table__]
+
+
+@pytest.fixture
+async def test_db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    yield
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def make_result(score: float = 90.0) -> ScanResult:
+    result = ScanResult()
+    result.response_status = 200
+    result.overall_score = score
+    result.findings = [{"category": "security", "severity": "low", "title": "Missing header", "description": "d"}]
+    return result
+
+
+async def count_scans() -> int:
+    async with TestingSessionLocal() as db:
+        return await db.scalar(select(func.count(Scan.id)))
+
+
+async def test_results_are_committed_in_batches(test_db):
+    """A burst of results is written in ceil(n / batch_size) transactions"""
+    buffer = ScanIngestionBuffer(session_factory=TestingSessionLocal, batch_size=4, flush_interval=5)
+    futures = [await buffer.submit(f"https://site-{i}.example.com", make_result()) for i in range(10)]
+    await buffer.close()
+
+    scans = [await future for future in futures]
+    assert len({scan.id for scan in scans}) == 10
+    assert await count_scans() == 10
+    assert buffer.batches == 3
+    assert buffer.stats()["scans_written"] == 10
+
+    async with TestingSessionLocal() as db:
+        assert await db.scalar(select(func.count(Finding.id))) == 10
+
+
+async def test_failed_item_does_not_fail_its_batch(test_db):
+    """An error writing one result fails only that result's future"""
+    async def explode(db, scan):
+        raise RuntimeError("job row is gone")
+
+    buffer = ScanIngestionBuffer(session_factory=TestingSessionLocal, batch_size=10, flush_interval=5)
+    good = await buffer.submit("https://good.example.com", make_result())
+    bad = await buffer.submit("https://bad.example.com", make_result(), after_write=explode)
+    also_good = await buffer.submit("https://also-good.example.com", make_result())
+    await buffer.close()
+
+    assert (await good).url == "https://good.example.com"
+    assert (await also_good).url == "https://also-good.example.com"
+    with pytest.raises(RuntimeError, match="job row is gone"):
+        await bad
+    assert buffer.batches == 1
+    async with TestingSessionLocal() as db:
+        assert set(await db.scalars(select(Scan.url))) == {"https://good.example.com", "https://also-good.example.com"}
+
+
+async def test_partial_batch_flushes_after_interval(test_db):
+    """A result doesn't wait for a full batch longer than the flush interval"""
+    buffer = ScanIngestionBuffer(session_factory=TestingSessionLocal, batch_size=50, flush_interval=0.05)
+    scan = await asyncio.wait_for(buffer.write("https://example.com", make_result()), timeout=2)
+    assert scan.id is not None
+    assert await count_scans() == 1
+
+
+async def test_close_drains_and_rejects_new_results(test_db):
+    """Shutdown writes everything accepted, then refuses more"""
+    buffer = ScanIngestionBuffer(session_factory=TestingSessionLocal, batch_size=50, flush_interval=60)
+    future = await buffer.submit("https://example.com", make_result())
+    await asyncio.wait_for(buffer.close(), timeout=2)
+
+    assert future.done() and (await future).id is not None
+    assert await count_scans() == 1
+    with pytest.raises(IngestionClosed):
+        await buffer.submit("https://late.example.com", make_result())
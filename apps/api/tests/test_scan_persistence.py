@@ -0,0 +1,115 @@
+"""
+Tests for scan persistence helpers.
+"""
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.db.types import json_contains
+from app.models.alert import Alert, AlertType
+from app.models.blob import Blob
+from app.models.finding import Finding, FindingCategory, FindingSeverity
+from app.models.scan import Scan
+from app.models.site import Site
+from app.models.user import User
+from app.services.scan_persistence import apply_scan_result, bulk_insert_alerts, bulk_insert_findings, finding_rows
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, Alert.__table__]
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def test_bulk_insert_findings_for_many_scans(db):
+    """Findings for several scans go in together and every id comes back"""
+    site = Site(domain="example.com", display_name="example.com")
+    scans = [Scan(url=f"https://example.com/{i}", site=site) for i in range(3)]
+    db.add_all(scans)
+    await db.flush()
+
+    rows = []
+    for scan in scans:
+        rows.extend(finding_rows(scan.id, [
+            {
+                "category": FindingCategory.SECURITY,
+                "severity": FindingSeverity.HIGH,
+                "title": f"Issue {n}",
+                "description": "Something is off",
+            }
+            for n in range(50)
+        ]))
+    ids = await bulk_insert_findings(db, rows)
+    await db.commit()
+
+    assert len(set(ids)) == 150
+    per_scan = dict((await db.execute(
+        select(Finding.scan_id, func.count()).group_by(Finding.scan_id)
+    )).all())
+    assert per_scan == {scan.id: 50 for scan in scans}
+    assert await bulk_insert_findings(db, []) == []
+
+
+async def test_bulk_insert_alerts_returns_loaded_alerts(db):
+    """Inserted alerts come back in order with database defaults populated"""
+    site = Site(domain="example.com", display_name="example.com")
+    scan = Scan(url="https://example.com", site=site)
+    db.add(scan)
+    await db.flush()
+
+    alerts = await bulk_insert_alerts(db, [
+        dict(site_id=site.id, scan_id=scan.id, alert_type=AlertType.SCORE_DROP, message="Score dropped"),
+        dict(site_id=site.id, scan_id=scan.id, alert_type=AlertType.NEW_HIGH, message="New high issue"),
+    ])
+    await db.commit()
+
+    assert [alert.alert_type for alert in alerts] == [AlertType.SCORE_DROP, AlertType.NEW_HIGH]
+    assert all(alert.id and alert.created_at for alert in alerts)
+
+
+async def test_redirect_chain_and_metadata_round_trip_as_json(db):
+    """redirect_chain reads back as a list and scans can be found by metadata"""
+    result = ScanResult()
+    result.normalized_url = "http://example.com"
+    result.final_url = "https://www.example.com/"
+    result.redirect_chain = ["http://example.com", "https://example.com/", "https://www.example.com/"]
+    result.hops = [
+        {"url": "http://example.com", "status": 301},
+        {"url": "https://example.com/", "status": 301},
+        {"url": "https://www.example.com/", "status": 200},
+    ]
+    result.timings = {"request_ms": 12.5, "total_ms": 40.0}
+    scan = Scan(url="http://example.com")
+    other = Scan(url="https://other.example.com", scan_metadata={"final_host": "other.example.com", "hop_count": 0})
+    db.add_all([scan, other])
+    await db.flush()
+    await apply_scan_result(db, scan, result)
+    await db.commit()
+    db.expunge_all()
+
+    stored = await db.get(Scan, scan.id)
+    assert stored.redirect_chain == result.redirect_chain
+    assert stored.scan_metadata["hops"][0] == {"url": "http://example.com", "status": 301}
+    assert stored.scan_metadata["timings"]["request_ms"] == 12.5
+
+    dialect = async_engine.dialect.name
+    by_host = await db.scalars(select(Scan.id).where(
+        json_contains(Scan.scan_metadata, {"final_host": "www.example.com"}, dialect)
+    ))
+    assert by_host.all() == [scan.id]
+    by_hops = await db.scalars(select(Scan.id).where(
+        json_contains(Scan.scan_metadata, {"hop_count": 2}, dialect)
+    ))
+    assert by_hops.all() == [scan.id]
@@ -0,0 +1,194 @@
+"""
+Tests for host-hash sharded scan workers.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import respx
+import httpx
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.alert import Alert
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.monitoring_config import MonitoringConfig
+from app.models.scan import Scan
+from app.models.scan_job import ScanJob, ScanJobStatus
+from app.models.scan_rollup import ScanRollup
+from app.models.scan_worker import ScanWorker
+from app.models.site import Site
+from app.models.user import User
+from app.services.hash_ring import HashRing, host_hash, RING_SIZE
+from app.services.monitoring_service import MonitoringService
+from app.services.scan_dispatcher import ScanPriority
+from app.services.scan_queue import enqueue_scan
+from app.services.scan_worker import ScanWorkerService
+from app.services.scanner import ScannerService
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [
+    User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__,
+    MonitoringConfig.__table__, Alert.__table__, ScanJob.__table__, ScanWorker.__table__, ScanRollup.__table__,
+]
+
+
+@pytest.fixture
+async def test_db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    yield
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def test_ring_ranges_match_owner():
+    """Every position falls in exactly the ranges of the node that owns it"""
+    ring = HashRing(["worker-a", "worker-b", "worker-c"], vnodes=16)
+    for host in (f"site-{i}.example.com" for i in range(500)):
+        position = host_hash(host)
+        owner = ring.owner(position)
+        for node in ring.nodes:
+            in_range = any(low <= position <= high for low, high in ring.ranges_for(node))
+            assert in_range == (node == owner)
+    assert sum(ring.describe().values()) == pytest.approx(1.0)
+    assert ring.ranges_for("worker-a")[-1][1] <= RING_SIZE - 1
+
+
+def test_ring_rebalance_moves_few_hosts():
+    """Adding a worker only moves the hosts it takes over"""
+    hosts = [f"site-{i}.example.com" for i in range(2000)]
+    before = HashRing(["worker-a", "worker-b", "worker-c"])
+    after = HashRing(["worker-a", "worker-b", "worker-c", "worker-d"])
+    moved = [h for h in hosts if before.owner(host_hash(h)) != after.owner(host_hash(h))]
+    assert all(after.owner(host_hash(h)) == "worker-d" for h in moved)
+    assert len(moved) < len(hosts) / 2
+
+
+async def test_workers_claim_only_their_shard(test_db):
+    """Two live workers split the queue by host without overlap"""
+    async with TestingSessionLocal() as db:
+        for i in range(40):
+            enqueue_scan(db, f"site-{i}.example.com")
+        await db.commit()
+
+    first = ScanWorkerService(session_factory=TestingSessionLocal)
+    second = ScanWorkerService(session_factory=TestingSessionLocal)
+    await first.register()
+    await second.register()
+    await first.heartbeat()
+    await second.heartbeat()
+    assert first.ring.nodes == second.ring.nodes
+
+    claimed_first = await first.claim_jobs(100)
+    claimed_second = await second.claim_jobs(100)
+    assert len(claimed_first) + len(claimed_second) == 40
+    assert not {job.id for job in claimed_first} & {job.id for job in claimed_second}
+    for job in claimed_first:
+        assert first.ring.owner(host_hash(job.url.split("://", 1)[1])) == first.worker_id
+
+    # When a worker leaves, its jobs return to the queue and the survivor owns everything
+    await second.deregister()
+    await first.heartbeat()
+    assert first.ring.nodes == [first.worker_id]
+    assert len(await first.claim_jobs(100)) == len(claimed_second)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_worker_executes_job(test_db):
+    """A claimed job is scanned, persisted and marked done"""
+    respx.get("https://example.com").mock(return_value=httpx.Response(200, text="<html></html>"))
+    respx.get("https://example.com/robots.txt").mock(return_value=httpx.Response(404))
+
+    async with TestingSessionLocal() as db:
+        job = enqueue_scan(db, "example.com")
+        await db.commit()
+        job_id = job.id
+
+    worker = ScanWorkerService(session_factory=TestingSessionLocal)
+    await worker.register()
+    [claimed] = await worker.claim_jobs(10)
+    await worker.execute(ScannerService(), claimed)
+
+    async with TestingSessionLocal() as db:
+        job = await db.get(ScanJob, job_id)
+        assert job.status == ScanJobStatus.DONE
+        assert (await db.get(Scan, job.scan_id)).response_status == 200
+    assert worker.scans_completed == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_alert_detection_failure_keeps_job_done(test_db, monkeypatch):
+    """A monitoring job whose scan was committed is not requeued when alert detection fails"""
+    respx.get("https://example.com").mock(return_value=httpx.Response(200, text="<html></html>"))
+    respx.get("https://example.com/robots.txt").mock(return_value=httpx.Response(404))
+
+    async def failing_detect_alerts(self, scan, db):
+        raise RuntimeError("alerts unavailable")
+
+    monkeypatch.setattr(MonitoringService, "detect_alerts", failing_detect_alerts)
+
+    async with TestingSessionLocal() as db:
+        job = enqueue_scan(db, "example.com", priority=ScanPriority.MONITORING, monitoring_config_id=1)
+        await db.commit()
+        job_id = job.id
+
+    worker = ScanWorkerService(session_factory=TestingSessionLocal)
+    await worker.register()
+    [claimed] = await worker.claim_jobs(10)
+    await worker.execute(ScannerService(), claimed)
+
+    async with TestingSessionLocal() as db:
+        job = await db.get(ScanJob, job_id)
+        assert job.status == ScanJobStatus.DONE
+        assert job.scan_id is not None
+        assert await db.scalar(select(func.count()).select_from(Scan)) == 1
+    assert worker.scans_completed == 1
+    assert worker.scans_failed == 0
+    assert await worker.claim_jobs(10) == []
+
+    # A late failure report for a job that is already closed doesn't reopen it
+    await worker.record_failure(claimed, RuntimeError("late"))
+    async with TestingSessionLocal() as db:
+        assert (await db.get(ScanJob, job_id)).status == ScanJobStatus.DONE
+
+
+async def test_orphaned_jobs_fail_after_max_attempts(test_db):
+    """Jobs held by a dead worker are requeued until they run out of attempts"""
+    claimed_at = datetime.now(timezone.utc) - timedelta(seconds=ScanWorkerService.WORKER_TTL * 2)
+    async with TestingSessionLocal() as db:
+        retried = enqueue_scan(db, "retried.example.com")
+        exhausted = enqueue_scan(db, "exhausted.example.com")
+        await db.flush()
+        for job, attempts in ((retried, 1), (exhausted, ScanWorkerService.MAX_ATTEMPTS)):
+            job.status = ScanJobStatus.RUNNING
+            job.worker_id = "gone:1:dead"
+            job.claimed_at = claimed_at
+            job.attempts = attempts
+        await db.commit()
+        retried_id, exhausted_id = retried.id, exhausted.id
+
+    worker = ScanWorkerService(session_factory=TestingSessionLocal)
+    await worker.register()
+    async with TestingSessionLocal() as db:
+        assert await worker.requeue_orphaned_jobs(db) == 1
+        await db.commit()
+
+    async with TestingSessionLocal() as db:
+        assert (await db.get(ScanJob, retried_id)).status == ScanJobStatus.PENDING
+        exhausted = await db.get(ScanJob, exhausted_id)
+        assert exhausted.status == ScanJobStatus.FAILED
+        assert exhausted.worker_id is None
+
+
+def test_worker_lanes_follow_its_concurrency():
+    """No lane holds a worker below its own concurrency"""
+    worker = ScanWorkerService(concurrency=20, session_factory=TestingSessionLocal)
+    assert worker.dispatcher.max_concurrency == 20
+    assert worker.dispatcher.lane_limits[ScanPriority.BULK] == 20
@@ -0,0 +1,139 @@
+"""
+Tests for full-text search over findings and sites.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import search as search_routes
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.database import Base, get_read_db
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanRollup
+from app.models.site import Site
+from app.models.user import User
+from app.services.scan_persistence import apply_scan_result
+from app.services.scanner import ScanResult
+from app.services.search import fts5_query
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, ScanRollup.__table__]
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(search_routes.router, prefix="/search")
+app.dependency_overrides[get_read_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def _finding(title: str, description: str, severity: str = "low") -> dict:
+    return {"category": "security", "severity": severity, "title": title, "description": description}
+
+
+async def _record_scan(db, site: Site, findings: list) -> Scan:
+    result = ScanResult()
+    result.findings = findings
+    scan = Scan(url=f"https://{site.domain}", site_id=site.id)
+    db.add(scan)
+    await db.flush()
+    await apply_scan_result(db, scan, result)
+    await db.commit()
+    return scan
+
+
+SERVER_HEADER = _finding("Server header discloses version", "The Server header reveals nginx/1.14.0", "medium")
+
+
+async def _seed(db):
+    shop = Site(domain="shop.example.com", display_name="Example Shop")
+    blog = Site(domain="blog.other.org", display_name="Other Blog")
+    db.add_all([shop, blog])
+    await db.commit()
+    await _record_scan(db, shop, [_finding("Old server header", "The Server header reveals nginx/1.14.0")])
+    await _record_scan(db, shop, [SERVER_HEADER, _finding("Missing HSTS", "No Strict-Transport-Security header")])
+    await _record_scan(db, blog, [_finding("Missing CSP", "No Content-Security-Policy header")])
+    return shop, blog
+
+
+def test_fts5_query_quotes_terms():
+    assert fts5_query('nginx 1.14 "x" OR -') == '"nginx" "1.14" """x""" "OR"'
+    assert fts5_query("- !") is None
+
+
+async def test_search_ranks_latest_findings(db):
+    shop, _ = await _seed(db)
+
+    response = client.get("/search", params={"q": "Server header revealing nginx 1.14"})
+    assert response.status_code == 200
+    hits = response.json()
+    # Stemmed ("revealing" ~ "reveals"); the older scan's copy isn't a hit
+    assert [(hit["kind"], hit["title"]) for hit in hits] == [("finding", "Server header discloses version")]
+    assert hits[0]["domain"] == "shop.example.com"
+    assert hits[0]["site_id"] == shop.id
+    assert hits[0]["severity"] == "medium"
+
+    history = client.get("/search", params={"q": "nginx 1.14", "history": "true"}).json()
+    assert {hit["title"] for hit in history} == {"Server header discloses version", "Old server header"}
+
+
+async def test_search_matches_site_domains(db):
+    shop, _ = await _seed(db)
+    hits = client.get("/search", params={"q": "example"}).json()
+    assert [(hit["kind"], hit["id"], hit["title"]) for hit in hits] == [("site", shop.id, "Example Shop")]
+
+
+async def test_search_pages_with_cursor(db):
+    await _seed(db)
+    expected = client.get("/search", params={"q": "header", "limit": 100}).json()
+    assert len(expected) == 3
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "header", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/search", params=params)
+        seen.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == expected
+    assert [hit["rank"] for hit in seen] == sorted((hit["rank"] for hit in seen), reverse=True)
+
+    assert client.get("/search", params={"q": "header", "cursor": "nope"}).status_code == 400
+
+
+async def test_index_follows_writes(db):
+    shop, _ = await _seed(db)
+    shop.display_name = "Renamed Storefront"
+    await db.commit()
+    assert [hit["title"] for hit in client.get("/search", params={"q": "storefront"}).json()] == ["Renamed Storefront"]
+
+    await db.execute(delete(Finding).where(Finding.title == "Missing CSP"))
+    await db.commit()
+    assert client.get("/search", params={"q": "Content-Security-Policy"}).json() == []
@@ -0,0 +1,68 @@
+"""
+Tests for domain -> site id resolution during scan creation.
+"""
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models.site import Site
+from app.services.site_registry import SiteRegistry
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [Site.__table__]
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+async def test_known_domains_need_no_query_once_committed(db, query_budget):
+    registry = SiteRegistry(max_size=10)
+
+    with query_budget(1):  # a single upsert creates the site
+        site_id = await registry.site_id_for(db, "example.com")
+    assert registry.cached("example.com") is None  # not cached before commit
+    await db.commit()
+
+    with query_budget(0):
+        assert await registry.site_id_for(db, "example.com") == site_id
+    site = await db.get(Site, site_id)
+    assert (site.domain, site.display_name) == ("example.com", "example.com")
+
+
+async def test_existing_site_is_reused_not_duplicated(db):
+    existing = Site(domain="example.com", display_name="Example Inc")
+    db.add(existing)
+    await db.commit()
+
+    site_id = await SiteRegistry(max_size=10).site_id_for(db, "example.com")
+    await db.commit()
+
+    assert site_id == existing.id
+    assert await db.scalar(select(func.count()).select_from(Site)) == 1
+    await db.refresh(existing)
+    assert existing.display_name == "Example Inc"  # the conflict update doesn't touch other columns
+
+
+async def test_rolled_back_sites_are_not_cached_and_cache_is_bounded(db):
+    registry = SiteRegistry(max_size=2)
+
+    await registry.site_id_for(db, "gone.example.com")
+    await db.rollback()
+    assert registry.cached("gone.example.com") is None
+
+    for domain in ("a.example.com", "b.example.com", "c.example.com"):
+        await registry.site_id_for(db, domain)
+    await db.commit()
+    assert registry.cached("a.example.com") is None  # least recently used went first
+    assert registry.cached("c.example.com") is not None
@@ -0,0 +1,221 @@
+"""
+Tests for site listing and the denormalized latest-scan summary.
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import sites as sites_routes
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.database import Base, get_db, get_read_db, get_read_sessionmaker
+from app.models.blob import Blob
+from app.models.finding import Finding
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanRollup
+from app.models.site import Site
+from app.models.user import User
+from app.services import site_export
+from app.services.scan_persistence import apply_scan_result, record_latest_scan
+from app.services.scanner import ScanResult
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [User.__table__, Site.__table__, Blob.__table__, Scan.__table__, Finding.__table__, ScanRollup.__table__]
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+# Just the sites router, so these tests don't need the PDF stack that main imports
+app = FastAPI()
+app.include_router(sites_routes.router, prefix="/sites")
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_read_sessionmaker] = lambda: TestingSessionLocal
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def _scan_result(score: float, risk_level: str) -> ScanResult:
+    result = ScanResult()
+    result.overall_score = score
+    result.risk_level = risk_level
+    return result
+
+
+async def _record_scan(db, site: Site, score: float, risk_level: str, created_at: datetime = None) -> Scan:
+    scan = Scan(url=f"https://{site.domain}", site_id=site.id, created_at=created_at)
+    db.add(scan)
+    await db.flush()
+    await apply_scan_result(db, scan, _scan_result(score, risk_level))
+    await db.commit()
+    return scan
+
+
+async def test_list_sites_is_a_single_query(db, query_budget):
+    """GET /sites costs one query no matter how many sites there are"""
+    sites = [Site(domain=f"site-{i}.example.com", display_name=f"Site {i}") for i in range(25)]
+    db.add_all(sites)
+    await db.commit()
+    for i, site in enumerate(sites):
+        await _record_scan(db, site, 60.0, "medium")
+        await _record_scan(db, site, 70.0 + i, "low")
+
+    with query_budget(1):
+        response = client.get("/sites")
+
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result) == 25
+    by_domain = {site["domain"]: site for site in result}
+    assert by_domain["site-3.example.com"]["latest_scan_score"] == 73.0
+    assert by_domain["site-3.example.com"]["latest_scan_risk_level"] == "low"
+    assert all(site["latest_scan_date"] is not None for site in result)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+async def test_sites_keyset_pages_cover_every_site_once(db):
+    """Following X-Next-Cursor walks all sites newest first, ties broken by id"""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Pairs of sites share a timestamp so the id tiebreak matters
+    db.add_all([
+        Site(domain=f"site-{i}.example.com", display_name=f"Site {i}", created_at=base + timedelta(minutes=i // 2))
+        for i in range(11)
+    ])
+    await db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/sites", params=params)
+        assert response.status_code == 200
+        seen.extend(site["id"] for site in response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 11
+    assert seen[0] == 11  # newest timestamp, highest id
+    assert client.get("/sites", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+async def test_site_scans_filter_by_risk_level(db, query_budget):
+    """Filters apply across pages of a site's scans"""
+    site = Site(domain="example.com", display_name="Example")
+    db.add(site)
+    await db.commit()
+    # Explicit timestamps: SQLite's CURRENT_TIMESTAMP has no sub-second part to compare cursors against
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i, (score, risk) in enumerate(((90.0, "low"), (40.0, "high"), (85.0, "low"))):
+        await _record_scan(db, site, score, risk, created_at=base + timedelta(hours=i))
+
+    with query_budget(2):  # site lookup + one page of scans
+        response = client.get(f"/sites/{site.id}/scans", params={"risk_level": "low", "limit": 1})
+    assert [scan["overall_score"] for scan in response.json()] == [85.0]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+
+    response = client.get(f"/sites/{site.id}/scans", params={"risk_level": "low", "limit": 1, "cursor": cursor})
+    assert [scan["overall_score"] for scan in response.json()] == [90.0]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+async def test_latest_scan_is_not_overwritten_by_older_scan(db, query_budget):
+    """A scan that finishes after a newer one doesn't roll the summary back"""
+    site = Site(domain="example.com", display_name="Example")
+    db.add(site)
+    await db.commit()
+
+    older = Scan(url="https://example.com", site_id=site.id, overall_score=40.0)
+    db.add(older)
+    await db.flush()
+    newer = await _record_scan(db, site, 90.0, "low")
+
+    await record_latest_scan(db, older)
+    await db.commit()
+
+    db.expunge_all()
+    with query_budget(1):
+        response = client.get(f"/sites/{site.id}")
+    assert response.json()["latest_scan_score"] == 90.0
+    assert (await db.get(Site, site.id)).latest_scan_id == newer.id
+
+
+async def _export_fixture(db) -> Site:
+    site = Site(domain="export.example.com", display_name="Export")
+    db.add(site)
+    await db.commit()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for week in range(3):
+        result = _scan_result(80.0 - week, "low")
+        result.findings = [
+            {"category": "security", "severity": "medium", "title": f"Issue {week}.{n}", "description": "d, with \"quotes\""}
+            for n in range(week)  # the first scan has no findings
+        ]
+        scan = Scan(url=f"https://{site.domain}", site_id=site.id, created_at=base + timedelta(weeks=week))
+        db.add(scan)
+        await db.flush()
+        await apply_scan_result(db, scan, result)
+        await db.commit()
+    return site
+
+
+async def test_export_ndjson_streams_scans_with_findings(db, monkeypatch):
+    """One line per scan, oldest first, findings nested; batches smaller than a scan's findings are fine"""
+    monkeypatch.setattr(site_export, "EXPORT_BATCH_SIZE", 1)
+    site = await _export_fixture(db)
+
+    response = client.get(f"/sites/{site.id}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="export.example.com-scans.ndjson"' in response.headers["content-disposition"]
+
+    scans = [json.loads(line) for line in response.text.splitlines()]
+    assert [scan["overall_score"] for scan in scans] == [80.0, 79.0, 78.0]
+    assert [len(scan["findings"]) for scan in scans] == [0, 1, 2]
+    assert scans[2]["findings"][1]["title"] == "Issue 2.1"
+
+
+async def test_export_csv_flattens_findings_and_gzips(db):
+    site = await _export_fixture(db)
+
+    response = client.get(f"/sites/{site.id}/export", params={"format": "csv", "gzip": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('scans.csv.gz"')
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 4  # a row per finding, plus one for the scan without findings
+    assert rows[0]["finding_id"] == "" and rows[0]["overall_score"] == "80.0"
+    assert [row["title"] for row in rows[1:]] == ["Issue 1.0", "Issue 2.0", "Issue 2.1"]
+    assert rows[1]["description"] == 'd, with "quotes"'
+
+
+async def test_export_unknown_site_or_format(db):
+    assert client.get("/sites/999/export").status_code == 404
+    site = await _export_fixture(db)
+    assert client.get(f"/sites/{site.id}/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,89 @@
+"""
+Tests for statement fingerprints and the in-process slow query log.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import internal as internal_routes
+from app.db.database import Base, get_db
+from app.db.slow_queries import QueryLog, fingerprint, query_log
+from app.models.site import Site
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# NullPool: TestClient may run each request on a fresh event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+TABLES = [Site.__table__]
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(internal_routes.router)
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+
+@pytest.fixture
+async def db():
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async with TestingSessionLocal() as db:
+        yield db
+    await async_engine.dispose()
+    Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def test_fingerprints_strip_literals_and_parameters():
+    assert fingerprint("SELECT * FROM scans WHERE id = 42 AND url = 'https://a.example'") == \
+        "SELECT * FROM scans WHERE id = ? AND url = ?"
+    assert fingerprint("SELECT * FROM scans WHERE id = $1 LIMIT $2") == fingerprint("SELECT * FROM scans WHERE id = %s LIMIT %s")
+    assert fingerprint("SELECT id FROM scans WHERE id IN (?, ?, ?)") == fingerprint("SELECT id FROM scans WHERE id IN (?)")
+    assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?, ?), ..."
+    # Identifiers with digits and casts survive
+    assert fingerprint("SELECT scan_metadata::jsonb FROM scans_y2026m01\n  WHERE x = :x_1") == \
+        "SELECT scan_metadata::jsonb FROM scans_y2026m01 WHERE x = ?"
+
+
+def test_log_aggregates_per_fingerprint_and_stays_bounded(capsys):
+    log = QueryLog(max_fingerprints=2, slow_ms=50)
+    for elapsed in (10.0, 20.0, 90.0):
+        log.record("SELECT * FROM sites WHERE id = ?", (1,), elapsed, "qmark")
+    log.record("UPDATE sites SET display_name = ? WHERE id = ?", ("x", 1), 60.0, "qmark")
+
+    select_stats = log.entries["SELECT * FROM sites WHERE id = ?"]
+    assert (select_stats.count, select_stats.total_ms, select_stats.max_ms, select_stats.slow_count) == (3, 120.0, 90.0, 1)
+    assert select_stats.slowest.parameters == (1,)
+    assert log.entries["UPDATE sites SET display_name = ? WHERE id = ?"].slowest.parameters is None  # never EXPLAINed
+    assert "slow query (90ms" in capsys.readouterr().out
+
+    log.record("DELETE FROM sites WHERE id = ?", (1,), 1.0, "qmark")
+    assert len(log.entries) == 2
+    assert "UPDATE sites SET display_name = ? WHERE id = ?" not in log.entries  # least total time went first
+    assert log.evicted == 1
+    assert [entry.count for entry in log.top("count")] == [3, 1]
+
+
+async def test_endpoint_reports_statements_with_plans(db, monkeypatch):
+    monkeypatch.setattr(query_log, "slow_ms", 0.0)  # keep a sample of everything
+    query_log.reset()
+    await db.scalars(select(Site).where(Site.domain == "example.com"))
+    await db.scalars(select(Site).where(Site.domain == "other.example.com"))
+
+    response = client.get("/internal/query-log", params={"sort": "count", "explain": 1})
+
+    assert response.status_code == 200
+    top = response.json()["statements"][0]
+    assert top["fingerprint"].startswith("SELECT sites.id")
+    assert top["count"] == 2
+    assert top["plan"]  # EXPLAIN QUERY PLAN output on SQLite
+    assert client.get("/internal/query-log", params={"sort": "nope"}).status_code == 400
+    query_log.reset()
@@ -58,12 +58,19 @@ export default function DashboardPage() {
 
   const fetchSites = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/sites`)
-      if (!response.ok) {
-        throw new Error('Failed to fetch sites')
-      }
-      const data = await response.json()
-      setSites(data)
+      // /sites is paginated; follow X-Next-Cursor until every page is loaded
+      const allSites: Site[] = []
+      let cursor: string | null = null
+      do {
+        const query: string = cursor ? `?limit=500&cursor=${encodeURIComponent(cursor)}` : '?limit=500'
+        const response = await fetch(`${API_BASE_URL}/sites${query}`)
+        if (!response.ok) {
+          throw new Error('Failed to fetch sites')
+        }
+        allSites.push(...(await response.json()))
+        cursor = response.headers.get('X-Next-Cursor')
+      } while (cursor)
+      setSites(allSites)
     } catch (err) {
       toast.error('Failed to load sites', {
         description: err instanceof Error ? err.message : 'Unknown error'
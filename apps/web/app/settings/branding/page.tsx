@@ -17,7 +17,7 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_BASE_URL || process.env.NEXT_PU
 interface BrandProfile {
   id: number
   name: string
-  logo_base64: string | null
+  logo_url: string | null
   primary_color: string
   accent_color: string
   footer_text: string | null
@@ -288,9 +288,9 @@ export default function BrandingSettingsPage() {
                       className={`${styles.brandItem} ${activeBrandId === brand.id ? styles.brandItemActive : ''}`}
                     >
                       <div className={styles.brandInfo}>
-                        {brand.logo_base64 && (
+                        {brand.logo_url && (
                           <img
-                            src={`data:image/png;base64,${brand.logo_base64}`}
+                            src={`${API_BASE_URL}${brand.logo_url}`}
                             alt={brand.name}
                             className={styles.brandLogo}
                           />